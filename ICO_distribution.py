@@ -1,7 +1,234 @@
+from collections import Counter
 from dataclasses import dataclass, field
-from typing import List
+from typing import Dict, List, Optional, Sequence
+import numpy as np
 import pandas as pd
 
+# Integer units (micro-tokens) in which ReleaseAggregate accumulates releases.
+TOKEN_UNITS = 10**6
+
+
+@dataclass(frozen=True)
+class VestingSchedule:
+    """TGE + cliff + linear vesting, answered in closed form without a dense plan.
+
+    Periods are months in the app, but any unit works (e.g. days): the TGE
+    tokens are released in period 0, then the remainder in equal parts over
+    periods `cliff_months + 1` to `cliff_months + distribution_months`.
+    """
+
+    total_tokens: float
+    tge_percent: float = 0.0
+    cliff_months: int = 0
+    distribution_months: int = 0
+
+    @property
+    def tge_tokens(self) -> float:
+        return self.total_tokens * (self.tge_percent / 100)
+
+    @property
+    def monthly_tokens(self) -> float:
+        if self.distribution_months <= 0:
+            return 0.0
+        return (self.total_tokens - self.tge_tokens) / self.distribution_months
+
+    @property
+    def horizon(self) -> int:
+        """Number of periods up to and including the last release."""
+        return self.cliff_months + self.distribution_months + 1
+
+    def released_in_month(self, month):
+        """Tokens released in `month` (an int or an array of months)."""
+        month = np.asarray(month)
+        released = np.where(
+            (month > self.cliff_months)
+            & (month <= self.cliff_months + self.distribution_months),
+            self.monthly_tokens,
+            0.0,
+        )
+        released = np.where(month == 0, self.tge_tokens, released)
+        return released if released.ndim else float(released)
+
+    def unlocked_by_month(self, month):
+        """Cumulative tokens unlocked by the end of `month` (an int or an array of months)."""
+        month = np.asarray(month)
+        vested_months = np.clip(month - self.cliff_months, 0, self.distribution_months)
+        unlocked = np.where(
+            month >= 0, self.tge_tokens + self.monthly_tokens * vested_months, 0.0
+        )
+        return unlocked if unlocked.ndim else float(unlocked)
+
+    def to_array(self, horizon: Optional[int] = None) -> np.ndarray:
+        """Dense per-period releases over `horizon` periods (default: `self.horizon`)."""
+        return release_matrix([self], horizon)[:, 0]
+
+
+def release_matrix(
+    schedules: Sequence[VestingSchedule], horizon: Optional[int] = None
+) -> np.ndarray:
+    """Dense (periods, schedules) release matrix, built in one broadcast."""
+    if horizon is None:
+        horizon = max((s.horizon for s in schedules), default=0)
+    month = np.arange(horizon)[:, None]
+    cliff = np.array([s.cliff_months for s in schedules])
+    distribution = np.array([s.distribution_months for s in schedules])
+    tge = np.array([s.tge_tokens for s in schedules], dtype=float)
+    monthly = np.array([s.monthly_tokens for s in schedules], dtype=float)
+    released = np.where((month > cliff) & (month <= cliff + distribution), monthly, 0.0)
+    released[0:1] = tge
+    return released
+
+
+class ReleaseAggregate:
+    """Running sum of vesting schedules, updated in O(1) per schedule.
+
+    Linear releases are kept in a difference array and the aggregate series
+    is its cumulative sum. Amounts are accumulated in integers of
+    1 / TOKEN_UNITS token, so removing a schedule exactly cancels adding it,
+    without rounding drift.
+    """
+
+    def __init__(self):
+        self._deltas = np.zeros(0, dtype=np.int64)
+        self._tge_units = 0
+        self._horizons = Counter()
+
+    def add(self, schedule: VestingSchedule, sign: int = 1):
+        end = schedule.cliff_months + schedule.distribution_months + 1
+        if end + 1 > len(self._deltas):
+            self._deltas = np.pad(self._deltas, (0, end + 1 - len(self._deltas)))
+        monthly_units = sign * round(schedule.monthly_tokens * TOKEN_UNITS)
+        self._tge_units += sign * round(schedule.tge_tokens * TOKEN_UNITS)
+        self._deltas[schedule.cliff_months + 1] += monthly_units
+        self._deltas[end] -= monthly_units
+        self._horizons[schedule.horizon] += sign
+        if self._horizons[schedule.horizon] == 0:
+            del self._horizons[schedule.horizon]
+
+    def remove(self, schedule: VestingSchedule):
+        self.add(schedule, -1)
+
+    @property
+    def horizon(self) -> int:
+        return max(self._horizons, default=0)
+
+    def to_units(self, horizon: Optional[int] = None) -> np.ndarray:
+        """Aggregate releases per period, in integers of 1 / TOKEN_UNITS token."""
+        if horizon is None:
+            horizon = self.horizon
+        deltas = self._deltas[:horizon]
+        released = np.cumsum(np.pad(deltas, (0, horizon - len(deltas))))
+        if horizon:
+            released[0] = self._tge_units
+        return released
+
+    def to_array(self, horizon: Optional[int] = None) -> np.ndarray:
+        """Aggregate releases over `horizon` periods (default: `self.horizon`)."""
+        return self.to_units(horizon) / TOKEN_UNITS
+
+
+@dataclass
+class BeneficiaryRegistry:
+    """Columnar per-wallet vesting: one array entry per beneficiary.
+
+    Each wallet vests like a `VestingSchedule` shifted by `start_months`, and
+    belongs to the round `round_names[round_codes[i]]`. Aggregates per round
+    and month are computed with bincount/cumsum instead of per-wallet objects.
+    """
+
+    round_names: List[str]
+    round_codes: np.ndarray
+    amounts: np.ndarray
+    tge_percent: np.ndarray
+    cliff_months: np.ndarray
+    distribution_months: np.ndarray
+    start_months: np.ndarray
+    price_per_token: np.ndarray
+
+    @classmethod
+    def from_dataframe(cls, df: pd.DataFrame, round_column: str = "round"):
+        """Builds a registry from one row per wallet.
+
+        Expects `amount`, `tge_percent`, `cliff_months` and `distribution_months`
+        columns; `start_month` and `price_per_token` are optional.
+        """
+        codes, names = pd.factorize(df[round_column])
+        n_wallets = len(df)
+        return cls(
+            round_names=list(names),
+            round_codes=codes.astype(np.int64),
+            amounts=df["amount"].to_numpy(dtype=float),
+            tge_percent=df["tge_percent"].to_numpy(dtype=float),
+            cliff_months=df["cliff_months"].to_numpy(dtype=np.int64),
+            distribution_months=df["distribution_months"].to_numpy(dtype=np.int64),
+            start_months=(
+                df["start_month"].to_numpy(dtype=np.int64)
+                if "start_month" in df
+                else np.zeros(n_wallets, dtype=np.int64)
+            ),
+            price_per_token=(
+                df["price_per_token"].to_numpy(dtype=float)
+                if "price_per_token" in df
+                else np.full(n_wallets, np.nan)
+            ),
+        )
+
+    @property
+    def horizon(self) -> int:
+        """Number of months up to and including the last release of any wallet."""
+        if not len(self.amounts):
+            return 0
+        return int(
+            np.max(self.start_months + self.cliff_months + self.distribution_months) + 1
+        )
+
+    def round_totals(self) -> np.ndarray:
+        """Tokens allocated to each round."""
+        return np.bincount(
+            self.round_codes, weights=self.amounts, minlength=len(self.round_names)
+        )
+
+    def round_collected_usd(self) -> np.ndarray:
+        """USD collected by each round; wallets without a price count as zero."""
+        paid = self.amounts * np.nan_to_num(self.price_per_token)
+        return np.bincount(
+            self.round_codes, weights=paid, minlength=len(self.round_names)
+        )
+
+    def release_by_round(self, horizon: Optional[int] = None) -> np.ndarray:
+        """Tokens released per (month, round), padded or truncated to `horizon` months."""
+        n_rounds, n_months = len(self.round_names), self.horizon
+        tge = self.amounts * (self.tge_percent / 100)
+        monthly = np.divide(
+            self.amounts - tge,
+            self.distribution_months,
+            out=np.zeros_like(tge),
+            where=self.distribution_months > 0,
+        )
+        first = self.start_months + self.cliff_months + 1
+        end = first + self.distribution_months
+        row = self.round_codes * (n_months + 1)
+        size = n_rounds * (n_months + 1)
+        linear = np.bincount(row + first, weights=monthly, minlength=size)
+        linear -= np.bincount(row + end, weights=monthly, minlength=size)
+        released = np.cumsum(linear.reshape(n_rounds, n_months + 1), axis=1)
+        released = released[:, :n_months]
+        released += np.bincount(
+            self.round_codes * n_months + self.start_months,
+            weights=tge,
+            minlength=n_rounds * n_months,
+        ).reshape(n_rounds, n_months)
+        if horizon is None:
+            horizon = n_months
+        released = released[:, :horizon]
+        if horizon > n_months:
+            released = np.pad(released, ((0, 0), (0, horizon - n_months)))
+        return released.T
+
+    def unlocked_by_round(self, horizon: Optional[int] = None) -> np.ndarray:
+        """Cumulative tokens unlocked per (month, round)."""
+        return np.cumsum(self.release_by_round(horizon), axis=0)
+
 
 @dataclass
 class ICOParticipant:
@@ -16,7 +243,7 @@ class ICOParticipant:
     valuation: float = field(init=False)
     collected_usd: float = 0.0
     multiplier: float = 0.0
-    distribution_plan: List[float] = field(init=False)
+    schedule: VestingSchedule = field(init=False)
 
     def calculate_financials(self, total_ico_supply: float, listing_price: float):
         self.total_supply = self.percent_of_tot_supply / 100 * total_ico_supply
@@ -26,25 +253,20 @@ class ICOParticipant:
             self.multiplier = (
                 self.valuation / self.collected_usd if self.collected_usd != 0 else 0
             )
-        self.distribution_plan = self.distribute_with_cliff()
-
-    def distribute_with_cliff(self):
-        distribution = [0] * (self.cliff_months + self.distribution_months + 1)
-        tge_tokens = self.total_supply * (self.tge_percent / 100)
-        remaining_tokens = self.total_supply - tge_tokens
-        monthly_distribution = (
-            remaining_tokens / self.distribution_months
-            if self.distribution_months > 0
-            else 0
+        self.schedule = VestingSchedule(
+            self.total_supply,
+            self.tge_percent,
+            self.cliff_months,
+            self.distribution_months,
         )
 
-        distribution[0] = tge_tokens
-        for i in range(
-            self.cliff_months + 1, self.cliff_months + self.distribution_months + 1
-        ):
-            distribution[i] = monthly_distribution
+    @property
+    def distribution_plan(self) -> List[float]:
+        """Dense per-month releases, built from the schedule on each access."""
+        return self.distribute_with_cliff()
 
-        return distribution
+    def distribute_with_cliff(self):
+        return self.schedule.to_array().tolist()
 
     def to_dataframe(self):
         """Convert participant data (excluding distribution plan) to a pandas DataFrame."""
@@ -66,14 +288,101 @@ class ICOOrchestrator:
     total_supply: float
     listing_price: float
     participants: List[ICOParticipant] = field(default_factory=list)
+    beneficiaries: Optional[BeneficiaryRegistry] = None
+    release_totals: ReleaseAggregate = field(
+        default_factory=ReleaseAggregate, init=False, repr=False, compare=False
+    )
+    # Schedules `release_totals` currently sums, in participant order.
+    _release_schedules: List[VestingSchedule] = field(
+        default_factory=list, init=False, repr=False, compare=False
+    )
+
+    def __post_init__(self):
+        for participant in self.participants:
+            if hasattr(participant, "schedule"):
+                self.release_totals.add(participant.schedule)
+                self._release_schedules.append(participant.schedule)
 
     def add_participant(self, participant: ICOParticipant):
         """Ajoute un participant à l'orchestrateur après avoir calculé ses finances."""
         participant.calculate_financials(self.total_supply, self.listing_price)
         self.participants.append(participant)
+        self.release_totals.add(participant.schedule)
+        self._release_schedules.append(participant.schedule)
+
+    def update_participants(self, participants: pd.DataFrame) -> Dict[str, List[str]]:
+        """Aligns the participants with a table of ICOParticipant fields.
+
+        Rows are matched to participants by description (and rank among
+        duplicates); only added or changed participants are recalculated, and
+        the release aggregate is updated accordingly. Returns the added,
+        changed and removed descriptions.
+        """
+        current = dict(zip(_participant_keys(self.participants), self.participants))
+        rows = participants.to_dict("records")
+        changes = {"added": [], "changed": [], "removed": []}
+        updated = []
+        for key, row in zip(_participant_keys(rows), rows):
+            participant = current.pop(key, None)
+            if participant is not None and all(
+                _same_value(getattr(participant, name), value)
+                for name, value in row.items()
+            ):
+                updated.append(participant)
+                continue
+            if participant is not None:
+                self.release_totals.remove(participant.schedule)
+            new_participant = ICOParticipant(**row)
+            new_participant.calculate_financials(self.total_supply, self.listing_price)
+            self.release_totals.add(new_participant.schedule)
+            updated.append(new_participant)
+            changes["added" if participant is None else "changed"].append(key[0])
+        for key, participant in current.items():
+            self.release_totals.remove(participant.schedule)
+            changes["removed"].append(key[0])
+        self.participants = updated
+        self._release_schedules = [p.schedule for p in updated]
+        return changes
+
+    def _synced_release_totals(self) -> ReleaseAggregate:
+        """Returns `release_totals`, rebuilt if `participants` was edited directly."""
+        schedules = [p.schedule for p in self.participants]
+        if schedules != self._release_schedules:
+            self.release_totals = ReleaseAggregate()
+            for schedule in schedules:
+                self.release_totals.add(schedule)
+            self._release_schedules = schedules
+        return self.release_totals
+
+    def monthly_release_totals(self, exclude: Sequence[str] = ()) -> np.ndarray:
+        """Tokens released per month, over all participants and rounds.
+
+        Equal to the sum of the `create_participants_distribution_dataframe`
+        columns not in `exclude`, without building the full matrix.
+        """
+        release_totals = self._synced_release_totals()
+        horizon = release_totals.horizon
+        if self.beneficiaries is not None:
+            horizon = max(horizon, self.beneficiaries.horizon)
+        excluded = ReleaseAggregate()
+        for participant in self.participants:
+            if participant.description in exclude:
+                excluded.add(participant.schedule)
+        # Exact difference in integer units: a month where only excluded
+        # participants release gives exactly zero.
+        totals = (
+            release_totals.to_units(horizon) - excluded.to_units(horizon)
+        ) / TOKEN_UNITS
+        if self.beneficiaries is not None:
+            kept = [name not in exclude for name in self.beneficiaries.round_names]
+            totals += self.beneficiaries.release_by_round(horizon)[:, kept].sum(axis=1)
+        return totals
 
     def create_participants_financial_dataframe(self):
-        """Crée un DataFrame consolidé des informations financières des participants."""
+        """Builds a consolidated DataFrame of the participants' financial information.
+
+        Rounds of the beneficiary registry, if any, follow the participants.
+        """
         data = {
             "Description": [p.description for p in self.participants],
             "Total Supply": [p.total_supply for p in self.participants],
@@ -81,19 +390,71 @@ class ICOOrchestrator:
             "Collected USD": [p.collected_usd for p in self.participants],
             "Multiplier": [p.multiplier for p in self.participants],
         }
+        if self.beneficiaries is not None:
+            totals = self.beneficiaries.round_totals()
+            valuations = self.listing_price * totals
+            collected = self.beneficiaries.round_collected_usd()
+            multipliers = np.divide(
+                valuations, collected, out=np.zeros_like(totals), where=collected != 0
+            )
+            data["Description"] += self.beneficiaries.round_names
+            data["Total Supply"] += totals.tolist()
+            data["Valuation"] += valuations.tolist()
+            data["Collected USD"] += collected.tolist()
+            data["Multiplier"] += multipliers.tolist()
         return pd.DataFrame(data)
 
     def extend_distribution_plan(self, participant: ICOParticipant, max_months: int):
-        """Étend le plan de distribution d'un participant jusqu'à max_months."""
-        if len(participant.distribution_plan) < max_months:
-            participant.distribution_plan += [0] * (
-                max_months - len(participant.distribution_plan)
+        """Returns a participant's distribution plan extended to max_months."""
+        return participant.schedule.to_array(
+            max(max_months, participant.schedule.horizon)
+        ).tolist()
+
+    def create_participants_distribution_matrix(
+        self, max_months: Optional[int] = None
+    ) -> np.ndarray:
+        """Builds the (months, participants) matrix of released tokens, leaving participants unchanged.
+
+        Rounds of the beneficiary registry, if any, follow the participants.
+        """
+        schedules = [p.schedule for p in self.participants]
+        if self.beneficiaries is None:
+            return release_matrix(schedules, max_months)
+        if max_months is None:
+            max_months = max(
+                [s.horizon for s in schedules] + [self.beneficiaries.horizon]
             )
+        return np.hstack(
+            [
+                release_matrix(schedules, max_months),
+                self.beneficiaries.release_by_round(max_months),
+            ]
+        )
 
     def create_participants_distribution_dataframe(self):
         """Crée un DataFrame montrant la distribution de tokens pour chaque participant."""
-        max_months = max(len(p.distribution_plan) for p in self.participants)
-        for participant in self.participants:
-            self.extend_distribution_plan(participant, max_months)
-        data = {p.description: p.distribution_plan for p in self.participants}
-        return pd.DataFrame(data)
+        columns = [p.description for p in self.participants]
+        if self.beneficiaries is not None:
+            columns += self.beneficiaries.round_names
+        return pd.DataFrame(
+            self.create_participants_distribution_matrix(), columns=columns
+        )
+
+
+def _participant_keys(participants) -> List[tuple]:
+    """(description, rank among same-named entries) for participants or rows."""
+    seen = Counter()
+    keys = []
+    for participant in participants:
+        description = (
+            participant["description"]
+            if isinstance(participant, dict)
+            else participant.description
+        )
+        keys.append((description, seen[description]))
+        seen[description] += 1
+    return keys
+
+
+def _same_value(a, b) -> bool:
+    return a == b or (pd.isna(a) and pd.isna(b))
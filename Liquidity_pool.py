@@ -1,6 +1,10 @@
+from bisect import bisect_right, insort
 from dataclasses import dataclass
+from typing import Dict, List
 import math
 
+import numpy as np
+
 
 @dataclass
 class LiquidityPool:
@@ -14,11 +18,13 @@ class LiquidityPool:
         k = self.usdc_reserve * self.token_reserve
         self.token_reserve += tokens_sold
         self.usdc_reserve = k / self.token_reserve
+        return tokens_sold
 
     def buy_tokens(self, usdc_spent):
         k = self.usdc_reserve * self.token_reserve
         self.usdc_reserve += usdc_spent
         self.token_reserve = k / self.usdc_reserve
+        return usdc_spent
 
     def maintain_price(self, old_price, target_threshhold):
         token_reserve = self.token_reserve
@@ -28,3 +34,294 @@ class LiquidityPool:
         new_usdc_reserve = math.sqrt(k * target_price)
         usdc_to_buy = new_usdc_reserve - usdc_reserve
         return usdc_to_buy
+
+
+@dataclass
+class LiquidityPoolArray:
+    """N constant-product pools held as reserve vectors, traded in one call.
+
+    Trading methods take an optional boolean `mask`; pools where it is False
+    keep their reserves untouched. Swaps return the per-pool amounts
+    executed, zero where masked out.
+    """
+
+    usdc_reserve: np.ndarray
+    token_reserve: np.ndarray
+
+    @classmethod
+    def from_pool(cls, pool: LiquidityPool, n_pools: int):
+        """Creates `n_pools` copies of `pool`."""
+        return cls(
+            np.full(n_pools, float(pool.usdc_reserve)),
+            np.full(n_pools, float(pool.token_reserve)),
+        )
+
+    def calculate_price(self):
+        return self.usdc_reserve / self.token_reserve
+
+    def sell_tokens(self, tokens_sold, mask=None):
+        k = self.usdc_reserve * self.token_reserve
+        token_reserve = self.token_reserve + tokens_sold
+        self._update_reserves(k / token_reserve, token_reserve, mask)
+        return self._executed(tokens_sold, mask)
+
+    def buy_tokens(self, usdc_spent, mask=None):
+        k = self.usdc_reserve * self.token_reserve
+        usdc_reserve = self.usdc_reserve + usdc_spent
+        self._update_reserves(usdc_reserve, k / usdc_reserve, mask)
+        return self._executed(usdc_spent, mask)
+
+    def maintain_price(self, old_price, target_threshhold, mask=None):
+        k = self.token_reserve * self.usdc_reserve
+        target_price = old_price * (1 + target_threshhold)
+        usdc_to_buy = np.sqrt(k * target_price) - self.usdc_reserve
+        return usdc_to_buy if mask is None else np.where(mask, usdc_to_buy, 0.0)
+
+    def _executed(self, amount, mask):
+        amount = np.broadcast_to(
+            np.asarray(amount, dtype=float), self.usdc_reserve.shape
+        )
+        return amount.copy() if mask is None else np.where(mask, amount, 0.0)
+
+    def _update_reserves(self, usdc_reserve, token_reserve, mask):
+        if mask is None:
+            self.usdc_reserve, self.token_reserve = usdc_reserve, token_reserve
+        else:
+            self.usdc_reserve = np.where(mask, usdc_reserve, self.usdc_reserve)
+            self.token_reserve = np.where(mask, token_reserve, self.token_reserve)
+
+
+TICK_BASE = 1.0001
+
+
+def price_to_tick(price: float) -> int:
+    return math.floor(math.log(price) / math.log(TICK_BASE))
+
+
+def tick_to_sqrt_price(tick: int) -> float:
+    return TICK_BASE ** (tick / 2)
+
+
+@dataclass
+class RangePosition:
+    tick_lower: int
+    tick_upper: int
+    liquidity: float
+    fee_growth_inside_token_last: float = 0.0
+    fee_growth_inside_usdc_last: float = 0.0
+
+
+class ConcentratedLiquidityPool:
+    """Range-liquidity pool with the same trading interface as `LiquidityPool`.
+
+    Liquidity is provided over price ranges bounded by ticks (price = 1.0001**tick).
+    Initialized ticks are kept in a sorted list searched with bisect, so a swap
+    costs O(log n) per tick it crosses rather than a scan over every position.
+    Swaps pay `fee_rate` on their input, accounted Uniswap v3 style through
+    global and per-tick fee growth so each range can report its earned fees.
+    """
+
+    def __init__(self, price: float, fee_rate: float = 0.003):
+        self.sqrt_price = math.sqrt(price)
+        self.tick = price_to_tick(price)
+        self.liquidity = 0.0
+        self.fee_rate = fee_rate
+        self.fee_growth_global_token = 0.0
+        self.fee_growth_global_usdc = 0.0
+        self.positions: List[RangePosition] = []
+        self._ticks: List[int] = []
+        self._liquidity_net: Dict[int, float] = {}
+        self._fee_growth_outside: Dict[int, List[float]] = {}
+
+    def add_position(
+        self, price_lower: float, price_upper: float, liquidity: float
+    ) -> int:
+        """Adds `liquidity` over [price_lower, price_upper) and returns the position id."""
+        tick_lower, tick_upper = price_to_tick(price_lower), price_to_tick(price_upper)
+        if tick_lower >= tick_upper:
+            raise ValueError("price_lower and price_upper must span at least one tick")
+        for tick, liquidity_net in ((tick_lower, liquidity), (tick_upper, -liquidity)):
+            if tick not in self._liquidity_net:
+                insort(self._ticks, tick)
+                self._liquidity_net[tick] = 0.0
+                self._fee_growth_outside[tick] = (
+                    [self.fee_growth_global_token, self.fee_growth_global_usdc]
+                    if tick <= self.tick
+                    else [0.0, 0.0]
+                )
+            self._liquidity_net[tick] += liquidity_net
+        if tick_lower <= self.tick < tick_upper:
+            self.liquidity += liquidity
+        position = RangePosition(tick_lower, tick_upper, liquidity)
+        (
+            position.fee_growth_inside_token_last,
+            position.fee_growth_inside_usdc_last,
+        ) = self.fee_growth_inside(tick_lower, tick_upper)
+        self.positions.append(position)
+        return len(self.positions) - 1
+
+    def fee_growth_inside(self, tick_lower: int, tick_upper: int):
+        """Returns the (token, usdc) fees earned per unit of liquidity inside a range."""
+        fee_growth_global = (self.fee_growth_global_token, self.fee_growth_global_usdc)
+        lower = self._fee_growth_outside[tick_lower]
+        upper = self._fee_growth_outside[tick_upper]
+        inside = []
+        for i, growth in enumerate(fee_growth_global):
+            below = lower[i] if self.tick >= tick_lower else growth - lower[i]
+            above = upper[i] if self.tick < tick_upper else growth - upper[i]
+            inside.append(growth - below - above)
+        return tuple(inside)
+
+    def position_fees(self, position_id: int):
+        """Returns the (token, usdc) fees a position has earned since it was added."""
+        position = self.positions[position_id]
+        token_growth, usdc_growth = self.fee_growth_inside(
+            position.tick_lower, position.tick_upper
+        )
+        return (
+            position.liquidity * (token_growth - position.fee_growth_inside_token_last),
+            position.liquidity * (usdc_growth - position.fee_growth_inside_usdc_last),
+        )
+
+    def calculate_price(self):
+        return self.sqrt_price**2
+
+    def sell_tokens(self, tokens_sold):
+        """Sells up to `tokens_sold` and returns the tokens actually swapped in.
+
+        Less is swapped when the price reaches the lowest initialized tick.
+        """
+        return self._swap_down(tokens_in=tokens_sold)
+
+    def buy_tokens(self, usdc_spent):
+        """Spends up to `usdc_spent` (negative: takes USDC out) and returns the amount swapped.
+
+        Less is swapped when the price reaches the last initialized tick.
+        """
+        if usdc_spent >= 0:
+            return self._swap_up(usdc_spent)
+        return -self._swap_down(usdc_out=-usdc_spent)
+
+    def maintain_price(self, old_price, target_threshhold):
+        """Returns the USDC to swap in (negative: out) to move the price to the target."""
+        target_sqrt_price = math.sqrt(old_price * (1 + target_threshhold))
+        sqrt_price, tick, liquidity = self.sqrt_price, self.tick, self.liquidity
+        usdc = 0.0
+        if target_sqrt_price >= sqrt_price:
+            while sqrt_price < target_sqrt_price:
+                next_tick = self._next_tick_up(tick)
+                boundary = (
+                    target_sqrt_price
+                    if next_tick is None
+                    else min(target_sqrt_price, tick_to_sqrt_price(next_tick))
+                )
+                usdc += liquidity * (boundary - sqrt_price) / (1 - self.fee_rate)
+                sqrt_price = boundary
+                if next_tick is None or boundary < tick_to_sqrt_price(next_tick):
+                    break
+                liquidity += self._liquidity_net[next_tick]
+                tick = next_tick
+        else:
+            while sqrt_price > target_sqrt_price:
+                next_tick = self._next_tick_down(tick)
+                boundary = (
+                    target_sqrt_price
+                    if next_tick is None
+                    else max(target_sqrt_price, tick_to_sqrt_price(next_tick))
+                )
+                usdc -= liquidity * (sqrt_price - boundary)
+                sqrt_price = boundary
+                if next_tick is None or boundary > tick_to_sqrt_price(next_tick):
+                    break
+                liquidity -= self._liquidity_net[next_tick]
+                tick = next_tick - 1
+        return usdc
+
+    def _next_tick_up(self, tick: int):
+        index = bisect_right(self._ticks, tick)
+        return self._ticks[index] if index < len(self._ticks) else None
+
+    def _next_tick_down(self, tick: int):
+        index = bisect_right(self._ticks, tick) - 1
+        return self._ticks[index] if index >= 0 else None
+
+    def _cross(self, tick: int):
+        outside = self._fee_growth_outside[tick]
+        outside[0] = self.fee_growth_global_token - outside[0]
+        outside[1] = self.fee_growth_global_usdc - outside[1]
+
+    def _swap_up(self, usdc_in: float) -> float:
+        """Swaps USDC in for tokens, moving the price up through the initialized ticks.
+
+        Returns the USDC swapped in, less than `usdc_in` if the ticks run out.
+        """
+        remaining = usdc_in
+        while remaining > 0:
+            next_tick = self._next_tick_up(self.tick)
+            if next_tick is None:
+                return usdc_in - remaining
+            boundary = tick_to_sqrt_price(next_tick)
+            if self.liquidity > 0:
+                needed = self.liquidity * (boundary - self.sqrt_price)
+                net = remaining * (1 - self.fee_rate)
+                if net < needed:
+                    self.sqrt_price += net / self.liquidity
+                    self.fee_growth_global_usdc += (remaining - net) / self.liquidity
+                    self.tick = min(price_to_tick(self.sqrt_price**2), next_tick - 1)
+                    return usdc_in
+                gross = needed / (1 - self.fee_rate)
+                self.fee_growth_global_usdc += (gross - needed) / self.liquidity
+                remaining -= gross
+            self.sqrt_price = boundary
+            self._cross(next_tick)
+            self.liquidity += self._liquidity_net[next_tick]
+            self.tick = next_tick
+        return usdc_in
+
+    def _swap_down(self, tokens_in: float = None, usdc_out: float = None) -> float:
+        """Swaps tokens in for USDC, moving the price down through the initialized ticks.
+
+        The swap is sized either by the tokens paid in or by the USDC taken out,
+        and returns that amount actually swapped, less if the ticks run out.
+        """
+        requested = tokens_in if tokens_in is not None else usdc_out
+        remaining = requested
+        while remaining > 0:
+            next_tick = self._next_tick_down(self.tick)
+            if next_tick is None:
+                return requested - remaining
+            boundary = tick_to_sqrt_price(next_tick)
+            if self.liquidity > 0:
+                if tokens_in is not None:
+                    needed = self.liquidity * (1 / boundary - 1 / self.sqrt_price)
+                    net = remaining * (1 - self.fee_rate)
+                else:
+                    needed = self.liquidity * (self.sqrt_price - boundary)
+                    net = remaining
+                if net < needed:
+                    if tokens_in is not None:
+                        new_sqrt_price = self.liquidity / (
+                            self.liquidity / self.sqrt_price + net
+                        )
+                        fee = remaining - net
+                    else:
+                        new_sqrt_price = self.sqrt_price - net / self.liquidity
+                        token_net = self.liquidity * (
+                            1 / new_sqrt_price - 1 / self.sqrt_price
+                        )
+                        fee = token_net * self.fee_rate / (1 - self.fee_rate)
+                    self.sqrt_price = new_sqrt_price
+                    self.fee_growth_global_token += fee / self.liquidity
+                    self.tick = max(price_to_tick(self.sqrt_price**2), next_tick)
+                    return requested
+                token_net = self.liquidity * (1 / boundary - 1 / self.sqrt_price)
+                fee = token_net * self.fee_rate / (1 - self.fee_rate)
+                self.fee_growth_global_token += fee / self.liquidity
+                remaining -= (
+                    needed / (1 - self.fee_rate) if tokens_in is not None else needed
+                )
+            self.sqrt_price = boundary
+            self._cross(next_tick)
+            self.liquidity -= self._liquidity_net[next_tick]
+            self.tick = next_tick - 1
+        return requested
@@ -0,0 +1,37 @@
+import streamlit as st
+
+# Constants
+initial_listing_price = 0.03
+total_supply = 3_000_000_000
+
+SCENARIO_COLORS = [
+    ("moderate", "Moderate", "blue"),
+    ("optimistic", "Optimistic", "green"),
+    ("pessimistic", "Pessimistic", "red"),
+]
+POOL_COLORS = [("Staking", "blue"), ("Treasury", "green"), ("Minting", "red")]
+
+
+def get_pipeline():
+    """Returns the session's simulation pipeline, synced with the edited tables.
+
+    The default participant and revenue tables, and the model modules behind
+    the pipeline, are only loaded the first time a page asks for it.
+    """
+    if "pipeline" not in st.session_state:
+        import pandas as pd
+
+        from initial_data_ioty import participant_data, revenue_data
+        from simulation_pipeline import build_ioty_pipeline
+
+        if "revenue_df" not in st.session_state:
+            st.session_state.revenue_df = pd.DataFrame(revenue_data)
+        if "df" not in st.session_state:
+            st.session_state.df = pd.DataFrame(participant_data)
+        st.session_state.pipeline = build_ioty_pipeline(
+            total_supply=total_supply,
+            listing_price=initial_listing_price,
+        )
+    pipeline = st.session_state.pipeline
+    pipeline.set(participants=st.session_state.df, revenue=st.session_state.revenue_df)
+    return pipeline
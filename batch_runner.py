@@ -0,0 +1,195 @@
+"""Runs scenario files through the simulation pipeline and writes the results.
+
+Usage:
+    python batch_runner.py scenarios.yaml results/ [--format parquet] [--workers N]
+
+A scenario file (YAML or JSON) holds either a list of scenarios or a mapping
+with optional `defaults` shared by every scenario and a `scenarios` list.
+Each scenario has a `name` and any parameter of `build_ioty_pipeline`, e.g.
+`participants` (records as in `participant_data`), `revenue` (columns as in
+`revenue_data`), `initial_ioty`, `yearly_target_apr`, `ratios` and
+`emission_rate`. Missing participants and revenue default to
+`initial_data_ioty`.
+
+Each result table is written partitioned by scenario, as
+<output>/<table>/scenario=<name>/part-0.<format>.
+"""
+
+import argparse
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional
+
+import pandas as pd
+
+from initial_data_ioty import participant_data, revenue_data
+from simulation_pipeline import build_ioty_pipeline, ioty_stages
+
+PIPELINE_PARAMETERS = {name for stage in ioty_stages() for name in stage.inputs} - {
+    name for stage in ioty_stages() for name in stage.outputs
+}
+OUTPUT_FORMATS = ["parquet", "feather", "csv"]
+
+
+def load_scenarios(path: str) -> List[Dict]:
+    """Reads a YAML or JSON scenario file and merges each scenario with the defaults."""
+    with open(path) as f:
+        if path.endswith((".yaml", ".yml")):
+            try:
+                import yaml
+            except ImportError as e:
+                raise ImportError("Reading YAML scenarios requires PyYAML") from e
+            content = yaml.safe_load(f)
+        else:
+            content = json.load(f)
+
+    if isinstance(content, list):
+        defaults, scenarios = {}, content
+    else:
+        defaults, scenarios = content.get("defaults", {}), content["scenarios"]
+
+    merged = []
+    for scenario in scenarios:
+        scenario = {**defaults, **scenario}
+        name = scenario.get("name")
+        if not isinstance(name, str) or not name or os.sep in name:
+            raise ValueError(f"Invalid scenario name: {name!r}")
+        unknown = set(scenario) - PIPELINE_PARAMETERS - {"name"}
+        if unknown:
+            raise ValueError(
+                f"Unknown parameters in scenario {name}: {sorted(unknown)}"
+            )
+        merged.append(scenario)
+    _check_unique_names(merged)
+    return merged
+
+
+def _check_unique_names(scenarios: List[Dict]):
+    """Raises if two scenarios share a name, since they would write to the same files."""
+    names = [scenario["name"] for scenario in scenarios]
+    duplicates = sorted({name for name in names if names.count(name) > 1})
+    if duplicates:
+        raise ValueError(f"Duplicate scenario names: {duplicates}")
+
+
+def run_scenario(scenario: Dict) -> Dict[str, pd.DataFrame]:
+    """Runs one scenario through the pipeline and returns its result tables."""
+    parameters = dict(scenario)
+    parameters.pop("name")
+    parameters["participants"] = pd.DataFrame(
+        parameters.get("participants", participant_data)
+    )
+    parameters["revenue"] = pd.DataFrame(parameters.get("revenue", revenue_data))
+    pipeline = build_ioty_pipeline(**parameters)
+
+    vesting = pipeline.get("vesting_schedule").rename_axis("month").reset_index()
+    debt = pipeline.get("debt").rename_axis("month").reset_index()
+    staking_data = pipeline.get("staking_data")
+    minting = pipeline.get("minting")
+    scenarios = pipeline.get("scenarios")
+    return {
+        "vesting": vesting.melt(
+            id_vars="month", var_name="participant", value_name="tokens"
+        ),
+        "debt": debt,
+        "staking": pd.concat(
+            [
+                data.rename_axis("month").reset_index().assign(revenue_scenario=name)
+                for name, data in staking_data.items()
+            ],
+            ignore_index=True,
+        ),
+        "sustainable_apr": pd.DataFrame(
+            {
+                "revenue_scenario": scenarios,
+                "sustainable_apr": pipeline.get("sustainable_aprs"),
+            }
+        ),
+        "minting": pd.concat(
+            [
+                minting.pool_history(name)
+                .rename_axis("month")
+                .reset_index()
+                .assign(revenue_scenario=name)
+                for name in scenarios
+            ],
+            ignore_index=True,
+        ),
+    }
+
+
+def write_table(table: pd.DataFrame, path: str, output_format: str):
+    if output_format == "parquet":
+        table.to_parquet(path, index=False)
+    elif output_format == "feather":
+        table.to_feather(path)
+    else:
+        table.to_csv(path, index=False)
+
+
+def _run_and_write(scenario: Dict, output_dir: str, output_format: str) -> Dict:
+    start = time.perf_counter()
+    tables = run_scenario(scenario)
+    for table_name, table in tables.items():
+        directory = os.path.join(output_dir, table_name, f"scenario={scenario['name']}")
+        os.makedirs(directory, exist_ok=True)
+        write_table(
+            table, os.path.join(directory, f"part-0.{output_format}"), output_format
+        )
+    return {
+        "scenario": scenario["name"],
+        "rows": sum(len(table) for table in tables.values()),
+        "seconds": time.perf_counter() - start,
+    }
+
+
+def run_batch(
+    scenarios: List[Dict],
+    output_dir: str,
+    output_format: str = "parquet",
+    max_workers: Optional[int] = None,
+) -> pd.DataFrame:
+    """Runs every scenario on a process pool and writes its tables under `output_dir`.
+
+    Returns one summary row per scenario.
+    """
+    if output_format not in OUTPUT_FORMATS:
+        raise ValueError(f"output_format must be one of {OUTPUT_FORMATS}")
+    if output_format in ("parquet", "feather"):
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError as e:
+            raise ImportError(
+                f"Writing {output_format} files requires pyarrow; use csv otherwise"
+            ) from e
+    _check_unique_names(scenarios)
+
+    arguments = [(scenario, output_dir, output_format) for scenario in scenarios]
+    if max_workers == 1 or not arguments:
+        summaries = [_run_and_write(*args) for args in arguments]
+    else:
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            summaries = list(executor.map(_run_and_write, *zip(*arguments)))
+    return pd.DataFrame(summaries)
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("scenario_file", help="YAML or JSON scenario definitions")
+    parser.add_argument("output_dir", help="directory receiving the result tables")
+    parser.add_argument("--format", choices=OUTPUT_FORMATS, default="parquet")
+    parser.add_argument(
+        "--workers", type=int, default=None, help="processes (default: all cores)"
+    )
+    args = parser.parse_args(argv)
+
+    summary = run_batch(
+        load_scenarios(args.scenario_file), args.output_dir, args.format, args.workers
+    )
+    print(summary.to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,182 @@
+import io
+from typing import List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from result_cache import ResultCache
+
+MAX_POINTS = 2_000
+
+# Rendered PNGs keyed on the content of the plotted data and the layout.
+figure_cache = ResultCache(max_bytes=64 * 2**20)
+
+# (label, series, color); a None label keeps the line out of the legend.
+Line = Tuple[Optional[str], pd.Series, str]
+
+
+def minmax_indices(values, max_points: int = MAX_POINTS) -> np.ndarray:
+    """Indices keeping each bucket's minimum and maximum, plus both end points.
+
+    Series of at most `max_points` values are kept whole; longer ones are cut
+    into max_points // 2 buckets, which preserves the spikes a stride-based
+    decimation would drop.
+    """
+    values = np.asarray(values, dtype=float)
+    n = len(values)
+    if n <= max_points:
+        return np.arange(n)
+    size = -(-n // max(max_points // 2, 1))
+    # Recount so that no bucket lies wholly in the padding.
+    buckets = -(-n // size)
+    low = np.full(buckets * size, np.inf)
+    low[:n] = np.where(np.isnan(values), np.inf, values)
+    high = np.full(buckets * size, -np.inf)
+    high[:n] = np.where(np.isnan(values), -np.inf, values)
+    offsets = np.arange(buckets) * size
+    minima = offsets + low.reshape(buckets, size).argmin(axis=1)
+    maxima = offsets + high.reshape(buckets, size).argmax(axis=1)
+    return np.unique(np.concatenate([[0, n - 1], minima, maxima]))
+
+
+def _downsample(series: pd.Series, max_points: int) -> pd.Series:
+    return series.iloc[minmax_indices(series.to_numpy(), max_points)]
+
+
+def _shared_rows(data: pd.DataFrame, max_points: int) -> np.ndarray:
+    """Rows selected by the min/max decimation of any of `data`'s columns."""
+    if data.columns.empty:
+        return np.arange(len(data))
+    return np.unique(
+        np.concatenate(
+            [minmax_indices(data[column].to_numpy(), max_points) for column in data]
+        )
+    )
+
+
+def _to_png(fig) -> bytes:
+    buffer = io.BytesIO()
+    fig.savefig(buffer, format="png", bbox_inches="tight")
+    return buffer.getvalue()
+
+
+@figure_cache.memoize
+def render_line_chart(
+    lines: List[Line],
+    title: str,
+    xlabel: str,
+    ylabel: str,
+    figsize: Tuple[float, float] = (10, 6),
+    max_points: int = MAX_POINTS,
+) -> bytes:
+    """Renders min/max-downsampled lines to a PNG, cached on the data and layout."""
+    from matplotlib.figure import Figure
+
+    fig = Figure(figsize=figsize)
+    ax = fig.subplots()
+    for label, series, color in lines:
+        series = _downsample(pd.Series(series), max_points)
+        ax.plot(series.index, series.to_numpy(), label=label, color=color)
+    ax.set_title(title)
+    ax.set_xlabel(xlabel)
+    ax.set_ylabel(ylabel)
+    ax.ticklabel_format(style="plain", axis="y")
+    if any(label is not None for label, _, _ in lines):
+        ax.legend()
+    ax.grid(False)
+    return _to_png(fig)
+
+
+@figure_cache.memoize
+def render_stacked_area_chart(
+    data: pd.DataFrame,
+    title: str,
+    xlabel: str,
+    ylabel: str,
+    legend_title: Optional[str] = None,
+    max_points: int = MAX_POINTS,
+) -> bytes:
+    """Renders `data`'s columns as a stacked area PNG, min/max-downsampled per column."""
+    from matplotlib.figure import Figure
+
+    fig = Figure()
+    ax = fig.subplots()
+    data.iloc[_shared_rows(data, max_points)].plot.area(ax=ax, stacked=True, alpha=0.5)
+    ax.set_title(title)
+    ax.set_xlabel(xlabel)
+    ax.set_ylabel(ylabel)
+    ax.legend(title=legend_title)
+    return _to_png(fig)
+
+
+@figure_cache.memoize
+def render_pie_chart(values: pd.Series, title: str) -> bytes:
+    """Renders `values` as a pie chart PNG labelled with its index."""
+    from matplotlib.figure import Figure
+
+    fig = Figure()
+    ax = fig.subplots()
+    ax.pie(values, labels=values.index, autopct="%1.1f%%", startangle=140)
+    ax.axis("equal")  # Equal aspect ratio ensures that pie is drawn as a circle.
+    ax.set_title(title)
+    return _to_png(fig)
+
+
+def line_chart(
+    lines: List[Line],
+    title: str,
+    xlabel: str,
+    ylabel: str,
+    client_side: bool = False,
+    max_points: int = MAX_POINTS,
+):
+    """Shows lines as a cached server-side PNG, or as a browser-rendered chart.
+
+    The client-side chart keeps, for every line, the points any line's min/max
+    decimation selected, so the lines stay aligned on a shared x axis.
+    """
+    if not client_side:
+        st.image(render_line_chart(lines, title, xlabel, ylabel, max_points=max_points))
+        return
+    data = pd.DataFrame(
+        {
+            label or f"line {i}": pd.Series(series)
+            for i, (label, series, _) in enumerate(lines)
+        }
+    )
+    st.markdown(f"**{title}**")
+    st.line_chart(
+        data.iloc[_shared_rows(data, max_points)],
+        x_label=xlabel,
+        y_label=ylabel,
+        color=[color for _, _, color in lines],
+    )
+
+
+def stacked_area_chart(
+    data: pd.DataFrame,
+    title: str,
+    xlabel: str,
+    ylabel: str,
+    legend_title: Optional[str] = None,
+    client_side: bool = False,
+    max_points: int = MAX_POINTS,
+):
+    """Shows a stacked area chart, server-side by default."""
+    if not client_side:
+        st.image(
+            render_stacked_area_chart(
+                data, title, xlabel, ylabel, legend_title, max_points
+            )
+        )
+        return
+    st.markdown(f"**{title}**")
+    st.area_chart(
+        data.iloc[_shared_rows(data, max_points)], x_label=xlabel, y_label=ylabel
+    )
+
+
+def pie_chart(values: pd.Series, title: str):
+    """Shows a cached pie chart; Streamlit has no client-side pie, so it is always a PNG."""
+    st.image(render_pie_chart(values, title))
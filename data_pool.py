@@ -1,11 +1,23 @@
-from typing import Dict
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from pool_ledger import FlowCause, PoolLedger
 
 
 class Pool:
     def __init__(
-        self, name: str, max_tokens: float = float("inf"), initial_tokens: float = 0.0
+        self,
+        name: str,
+        max_tokens: float = float("inf"),
+        initial_tokens: float = 0.0,
+        ledger: Optional[PoolLedger] = None,
     ):
         self.name = name
+        self.ledger = ledger
+        if ledger is not None:
+            self.ledger_id = ledger.register_pool(name, initial_tokens)
         self.tokens_history = [initial_tokens]
         self.inflows = [0.0] * (
             1 if initial_tokens == 0 else 2
@@ -15,15 +27,27 @@ class Pool:
         )  # to match the history length
         self.max_tokens = max_tokens
 
-    def add_tokens(self, amount: float):
+    def add_tokens(self, amount: float, cause: FlowCause = FlowCause.OTHER):
         self.inflows[-1] += amount
+        self._record(amount, cause)
 
-    def subtract_tokens(self, amount: float):
+    def subtract_tokens(self, amount: float, cause: FlowCause = FlowCause.OTHER):
         self.outflows[-1] += amount
+        self._record(-amount, cause)
+
+    def _record(self, amount: float, cause: FlowCause):
+        if self.ledger is not None and amount != 0:
+            self.ledger.record(
+                len(self.tokens_history) - 1, self.ledger_id, amount, cause
+            )
 
     def update_history(self):
-        current_tokens = self.tokens_history[-1] + self.inflows[-1] - self.outflows[-1]
-        current_tokens = min(max(current_tokens, 0), self.max_tokens)
+        unclamped_tokens = (
+            self.tokens_history[-1] + self.inflows[-1] - self.outflows[-1]
+        )
+        current_tokens = min(max(unclamped_tokens, 0), self.max_tokens)
+        if current_tokens != unclamped_tokens:
+            self._record(current_tokens - unclamped_tokens, FlowCause.CLAMP)
         self.tokens_history.append(current_tokens)
         self.inflows.append(0.0)
         self.outflows.append(0.0)
@@ -36,7 +60,9 @@ def distribute_tokens_to_pools(
     monthly_unlocked_tokens: float, pools: Dict[str, Pool], ratios: Dict[str, float]
 ):
     for pool_name, ratio in ratios.items():
-        pools[pool_name].add_tokens(monthly_unlocked_tokens * ratio)
+        pools[pool_name].add_tokens(
+            monthly_unlocked_tokens * ratio, FlowCause.UNLOCK_REDISTRIBUTION
+        )
 
 
 def compute_incentive_emission(
@@ -47,3 +73,194 @@ def compute_incentive_emission(
 ) -> float:
     proportional_emission_rate = pool_tokens / pool_max_tokens
     return total_tokens_locked * emission_rate * proportional_emission_rate
+
+
+class PoolSet:
+    """Several pools stored as preallocated (pools, steps + 1) arrays.
+
+    Column t of `tokens_history` is the balance after t calls to
+    `update_history`; flows are accumulated in column t of `inflows` and
+    `outflows` until then. Balances are clamped to [0, max_tokens].
+
+    With `n_scenarios`, every array gains a leading scenario axis and the
+    scenarios advance together; amounts then hold one value per scenario.
+    """
+
+    def __init__(
+        self,
+        names: List[str],
+        n_steps: int,
+        max_tokens: Optional[Dict[str, float]] = None,
+        initial_tokens: Optional[Dict[str, float]] = None,
+        n_scenarios: Optional[int] = None,
+    ):
+        self.names = list(names)
+        self.index = {name: i for i, name in enumerate(self.names)}
+        self.n_steps = n_steps
+        self.step = 0
+        max_tokens = max_tokens or {}
+        initial_tokens = initial_tokens or {}
+        self.max_tokens = np.array(
+            [max_tokens.get(name, float("inf")) for name in self.names]
+        )
+        scenarios = () if n_scenarios is None else (n_scenarios,)
+        self.tokens_history = np.zeros(scenarios + (len(self.names), n_steps + 1))
+        self.tokens_history[..., 0] = [
+            initial_tokens.get(name, 0.0) for name in self.names
+        ]
+        self.inflows = np.zeros_like(self.tokens_history)
+        self.outflows = np.zeros_like(self.tokens_history)
+
+    def pool_indices(self, pools=None) -> np.ndarray:
+        """Maps pool names (or None, for every pool) to row indices."""
+        if pools is None:
+            return np.arange(len(self.names))
+        if isinstance(pools, str):
+            pools = [pools]
+        return np.array([self.index[name] for name in pools], dtype=int)
+
+    def ratio_vector(self, ratios: Dict[str, float]) -> np.ndarray:
+        """Turns a {pool: ratio} dict into one ratio per pool, 0 for missing pools."""
+        return np.array([ratios.get(name, 0.0) for name in self.names])
+
+    def add_tokens(self, amounts, pools=None):
+        """Adds `amounts` to the given pools (all of them by default) this step."""
+        self._accumulate(self.inflows, amounts, pools)
+
+    def subtract_tokens(self, amounts, pools=None):
+        """Withdraws `amounts` from the given pools (all of them by default) this step."""
+        self._accumulate(self.outflows, amounts, pools)
+
+    def _accumulate(self, flows: np.ndarray, amounts, pools):
+        if pools is None:
+            flows[..., self.step] += amounts
+            return
+        if isinstance(pools, str):
+            flows[..., self.index[pools], self.step] += amounts
+            return
+        np.add.at(flows[..., self.step], (..., self.pool_indices(pools)), amounts)
+
+    def distribute_tokens(self, monthly_unlocked_tokens, ratios):
+        """Adds `monthly_unlocked_tokens` to every pool in proportion to `ratios`.
+
+        `ratios` is a {pool: ratio} dict or a vector from `ratio_vector`.
+        """
+        if isinstance(ratios, dict):
+            ratios = self.ratio_vector(ratios)
+        self.inflows[..., self.step] += (
+            np.asarray(monthly_unlocked_tokens)[..., None] * ratios
+        )
+
+    def update_history(self):
+        if self.step == self.n_steps:
+            raise IndexError(f"PoolSet was preallocated for {self.n_steps} steps")
+        step = self.step
+        balances = (
+            self.tokens_history[..., step]
+            + self.inflows[..., step]
+            - self.outflows[..., step]
+        )
+        # minimum/maximum rather than np.clip, which is slower on small arrays.
+        self.tokens_history[..., step + 1] = np.minimum(
+            np.maximum(balances, 0), self.max_tokens
+        )
+        self.step += 1
+
+    def get_current_tokens(self, pools=None) -> np.ndarray:
+        return self.tokens_history[..., self.pool_indices(pools), self.step]
+
+    def to_dataframe(self, scenario: Optional[int] = None) -> pd.DataFrame:
+        """Returns the balances recorded so far, one column per pool.
+
+        A PoolSet with scenarios needs the index of the `scenario` to return.
+        """
+        history = self.tokens_history
+        if scenario is not None:
+            history = history[scenario]
+        return pd.DataFrame(history[:, : self.step + 1].T, columns=self.names)
+
+
+class MintingEmissionSolver:
+    """Solves the minting pool recurrence driven by `compute_incentive_emission`.
+
+    With no inflows, each month the pool loses
+    tokens_locked * emission_rate * pool / pool_max_tokens, so
+    pool[t] = initial * prod_{s < t} (1 - emission_rate * tokens_locked[s] / pool_max_tokens),
+    clamped at 0 once a factor reaches 0. The trajectory is a cumulative sum
+    of log factors and is evaluated for any array of emission rates at once.
+    `tokens_locked` is the per-month series of tokens locked from revenue and
+    is assumed non-negative, which makes the pool non-increasing.
+    """
+
+    def __init__(
+        self,
+        tokens_locked,
+        pool_max_tokens: float,
+        initial_pool_tokens: Optional[float] = None,
+    ):
+        self.tokens_locked = np.asarray(tokens_locked, dtype=float)
+        self.pool_max_tokens = pool_max_tokens
+        self.initial_pool_tokens = (
+            pool_max_tokens if initial_pool_tokens is None else initial_pool_tokens
+        )
+
+    def trajectory(self, emission_rate) -> np.ndarray:
+        """Pool balance for months 0..n, with the rates' shape as leading axes."""
+        emission_rate = np.asarray(emission_rate, dtype=float)[..., None]
+        factors = 1 - emission_rate * self.tokens_locked / self.pool_max_tokens
+        with np.errstate(divide="ignore"):
+            log_factors = np.log(np.maximum(factors, 0))
+        log_survival = np.cumsum(log_factors, axis=-1)
+        pad = [(0, 0)] * (log_survival.ndim - 1) + [(1, 0)]
+        return self.initial_pool_tokens * np.exp(np.pad(log_survival, pad))
+
+    def emissions(self, emission_rate) -> np.ndarray:
+        """Monthly minting emission along the trajectory of each rate."""
+        pool = self.trajectory(emission_rate)[..., :-1]
+        return (
+            self.tokens_locked
+            * np.asarray(emission_rate, dtype=float)[..., None]
+            * pool
+            / self.pool_max_tokens
+        )
+
+    def month_below(self, threshold: float, emission_rate) -> np.ndarray:
+        """First month at which the pool is below `threshold`, or -1 if it never is."""
+        below = self.trajectory(emission_rate) < threshold
+        return np.where(below.any(axis=-1), below.argmax(axis=-1), -1)
+
+    def depleting_emission_rate(
+        self, month, threshold: float = 0.0, tolerance: float = 1e-12
+    ) -> np.ndarray:
+        """Smallest emission rate leaving at most `threshold` tokens at `month`.
+
+        `month` and `threshold` may be arrays and are solved together by
+        bisection, the pool at a fixed month being non-increasing in the rate.
+        The result is NaN where no rate can deplete the pool, i.e. when
+        nothing is locked before `month`.
+        """
+        month, threshold = np.broadcast_arrays(
+            np.asarray(month, dtype=int), np.asarray(threshold, dtype=float)
+        )
+        cumulative_max = np.maximum.accumulate(
+            np.concatenate([[0.0], self.tokens_locked])
+        )
+        # At this rate the largest factor before `month` is exactly zero.
+        high = np.divide(
+            self.pool_max_tokens,
+            cumulative_max[month],
+            out=np.full(month.shape, np.nan),
+            where=cumulative_max[month] > 0,
+        )
+        low = np.zeros(month.shape)
+        solvable = ~np.isnan(high)
+        high = np.where(solvable, high, 0.0)
+        while np.any(high - low > tolerance * np.maximum(high, 1)):
+            middle = (low + high) / 2
+            pool = np.take_along_axis(
+                self.trajectory(middle), month[..., None], axis=-1
+            )[..., 0]
+            depleted = pool <= threshold
+            high = np.where(depleted, middle, high)
+            low = np.where(depleted, low, middle)
+        return np.where(solvable, high, np.nan)
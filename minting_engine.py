@@ -0,0 +1,166 @@
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from data_pool import PoolSet
+from pool_ledger import FlowCause, PoolLedger
+
+# Locked tokens wait this long, then unlock over as many months again.
+LOCKING_YEARS = 1
+LOCKING_MONTHS = LOCKING_YEARS * 12
+
+
+@dataclass
+class MintingSimulationResult:
+    """Pool balances of a minting simulation, for every scenario at once."""
+
+    scenarios: List[str]
+    pool_names: List[str]
+    tokens: np.ndarray  # (scenarios, months + 1, pools), initial balances first
+    minting_emission: np.ndarray  # (scenarios, months)
+    tokens_unlocked: np.ndarray  # (scenarios, months)
+
+    def pool_history(self, scenario: str) -> pd.DataFrame:
+        """Returns one scenario's balances, one column per pool and one row per month."""
+        return pd.DataFrame(
+            self.tokens[self.scenarios.index(scenario)], columns=self.pool_names
+        )
+
+
+def run_minting_simulation(
+    revenue: pd.DataFrame,
+    scenarios: Sequence[str],
+    token_price: Sequence[float],
+    staking_emission,
+    emission_rate,
+    ratios: Dict[str, float],
+    initial_tokens: Dict[str, float],
+    max_tokens: Optional[Dict[str, float]] = None,
+    minting_pool: str = "Minting",
+    staking_pool: str = "Staking",
+    locking_months: int = LOCKING_MONTHS,
+    ledger: Optional[PoolLedger] = None,
+) -> MintingSimulationResult:
+    """Simulates the treasury, staking and minting pools for several revenue scenarios.
+
+    Each month the revenue of every scenario (a column of `revenue`) is
+    converted to tokens and locked, together with the minting pool's
+    emission, which is proportional to the pool's fill ratio. Tokens locked
+    in a month unlock linearly over `locking_months` months after a
+    `locking_months` delay and are redistributed to the pools according to
+    `ratios`. `staking_emission` (one series, or one per scenario) leaves the
+    staking pool. Balances are clipped to [0, max_tokens]; `max_tokens`
+    defaults to capping the minting pool at its initial balance.
+
+    The unlock schedule is read from a running prefix sum of the locked
+    tokens, so a month costs O(1) per scenario whatever `locking_months` is,
+    and all scenarios advance together in one `PoolSet`.
+
+    With a `ledger`, every flow is recorded with its cause under pools named
+    "<scenario>/<pool>", which are registered on the ledger.
+    """
+    scenarios = list(scenarios)
+    pool_names = list(initial_tokens)
+    if max_tokens is None:
+        max_tokens = {minting_pool: initial_tokens[minting_pool]}
+
+    revenue = revenue[scenarios].to_numpy(dtype=float).T
+    token_price = np.asarray(token_price, dtype=float)
+    n_months = min(revenue.shape[1], len(token_price))
+    tokens_locked_from_revenue = revenue[:, :n_months] / token_price[:n_months]
+    staking_emission = np.broadcast_to(
+        np.asarray(staking_emission, dtype=float)[..., :n_months],
+        tokens_locked_from_revenue.shape,
+    )
+    emission_rate = np.asarray(emission_rate, dtype=float)
+
+    n_scenarios = len(scenarios)
+    pools = PoolSet(pool_names, n_months, max_tokens, initial_tokens, n_scenarios)
+    ratio_vector = pools.ratio_vector(ratios)
+    minting_index = pools.index[minting_pool]
+    staking_index = pools.index[staking_pool]
+    minting_emission = np.zeros((n_scenarios, n_months))
+    tokens_unlocked = np.zeros((n_scenarios, n_months))
+    # locked_prefix[:, m] holds the tokens locked before month m.
+    locked_prefix = np.zeros((n_scenarios, n_months + 1))
+    if ledger is not None:
+        ledger_ids = np.array(
+            [
+                [
+                    ledger.register_pool(f"{scenario}/{name}", initial_tokens[name])
+                    for name in pool_names
+                ]
+                for scenario in scenarios
+            ]
+        )
+
+    for month in range(n_months):
+        minting_emission[:, month] = (
+            tokens_locked_from_revenue[:, month]
+            * emission_rate
+            * pools.get_current_tokens()[:, minting_index]
+            / pools.max_tokens[minting_index]
+        )
+        locked_prefix[:, month + 1] = (
+            locked_prefix[:, month]
+            + tokens_locked_from_revenue[:, month]
+            + minting_emission[:, month]
+        )
+        if locking_months > 0:
+            # Tokens locked in months [month - 2L + 1, month - L] unlock now.
+            window_end = max(month - locking_months + 1, 0)
+            window_start = max(month - 2 * locking_months + 1, 0)
+            tokens_unlocked[:, month] = (
+                locked_prefix[:, window_end] - locked_prefix[:, window_start]
+            ) / locking_months
+
+        pools.subtract_tokens(minting_emission[:, month], minting_pool)
+        pools.subtract_tokens(staking_emission[:, month], staking_pool)
+        pools.distribute_tokens(tokens_unlocked[:, month], ratio_vector)
+        pools.update_history()
+        if ledger is not None:
+            _record_month(
+                ledger, ledger_ids, pools, month, minting_index, staking_index
+            )
+
+    return MintingSimulationResult(
+        scenarios,
+        pool_names,
+        np.swapaxes(pools.tokens_history, 1, 2),
+        minting_emission,
+        tokens_unlocked,
+    )
+
+
+def _record_month(
+    ledger: PoolLedger,
+    ledger_ids: np.ndarray,
+    pools: PoolSet,
+    month: int,
+    minting_index: int,
+    staking_index: int,
+):
+    """Records one month's nonzero flows of every scenario by cause, as `data_pool.Pool` does."""
+    inflows = pools.inflows[..., month]
+    outflows = pools.outflows[..., month]
+    clamped = pools.tokens_history[..., month + 1] - (
+        pools.tokens_history[..., month] + inflows - outflows
+    )
+    for ids, amounts, cause in [
+        (
+            ledger_ids[:, minting_index],
+            -outflows[:, minting_index],
+            FlowCause.MINTING_EMISSION,
+        ),
+        (
+            ledger_ids[:, staking_index],
+            -outflows[:, staking_index],
+            FlowCause.STAKING_EMISSION,
+        ),
+        (ledger_ids, inflows, FlowCause.UNLOCK_REDISTRIBUTION),
+        (ledger_ids, clamped, FlowCause.CLAMP),
+    ]:
+        nonzero = amounts != 0
+        ledger.record_many(month, ids[nonzero], amounts[nonzero], cause)
@@ -0,0 +1,383 @@
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence, Union
+
+import numpy as np
+import pandas as pd
+
+from ICO_distribution import ICOOrchestrator
+from Liquidity_pool import LiquidityPool, LiquidityPoolArray
+from vesting_simulation import (
+    BATCH_BLOCK_SIZE,
+    MIN_BATCH_BLOCK_SIZE,
+    MIN_TOKENS_PER_ORDER,
+)
+
+# Share of a month's orders that must stay on the geometric price path (or be
+# mitigated, when sold order by order) for the next month to use blocks.
+MIN_GEOMETRIC_SHARE = 0.9
+
+
+@dataclass
+class MonteCarloResult:
+    """Per-path monthly outcomes of a Monte Carlo run, each shaped (paths, months)."""
+
+    tokens_sold: np.ndarray
+    token_price: np.ndarray
+    usdcs_to_buy: np.ndarray
+    price_after_mitigation: np.ndarray
+
+    def percentile_bands(
+        self, column: str, percentiles: Sequence[float] = (5, 25, 50, 75, 95)
+    ) -> pd.DataFrame:
+        """Returns the given percentiles of `column` across paths, one row per month."""
+        bands = np.percentile(getattr(self, column), percentiles, axis=0)
+        return pd.DataFrame(bands.T, columns=[f"p{p:g}" for p in percentiles])
+
+
+class MonteCarloMarketSimulator:
+    def __init__(
+        self,
+        orchestrator: ICOOrchestrator,
+        liquidity_pool: LiquidityPool,
+        columns_to_exclude: List[str],
+    ):
+        """Initializes the simulator; every path starts from `liquidity_pool`'s reserves."""
+        self.orchestrator = orchestrator
+        self.liquidity_pool = liquidity_pool
+        self.columns_to_exclude = columns_to_exclude
+
+    def compute_monthly_released_tokens(self):
+        """Computes the (months, participants) release matrix, excluding specified columns."""
+        df = self.orchestrator.create_participants_distribution_dataframe()
+        df = df[df.columns.difference(self.columns_to_exclude)]
+        self.participants = list(df.columns)
+        self.monthly_release_tokens = df.to_numpy(dtype=float)
+
+    def run_monte_carlo_simulation(
+        self,
+        n_paths: int,
+        average_selling_order: float,
+        max_price_impact: float,
+        with_mitigation: bool,
+        sell_probability: Union[float, Dict[str, float]] = 1.0,
+        order_size_sigma: float = 0.0,
+        buy_demand: float = 0.0,
+        buy_demand_sigma: float = 0.0,
+        seed: Optional[int] = None,
+        batched: bool = True,
+    ) -> MonteCarloResult:
+        """Simulates `n_paths` markets in lockstep, one constant-product pool per path.
+
+        Each month every participant sells its release with probability
+        `sell_probability` (a float, or a {participant: probability} dict that
+        defaults to 1.0), in orders whose USD size is lognormal with mean
+        `average_selling_order` and log-scale `order_size_sigma`. Buy-side
+        demand of lognormal USD size with mean `buy_demand` hits the pool at the
+        start of each month. Sell decisions, order sizes and buy demand use
+        separate RNG streams spawned from `seed`.
+
+        With `batched`, runs of mitigated orders are evaluated in vectorized
+        blocks along their geometric price path instead of one order at a
+        time; the random draws, and so the results, are the same. A month
+        whose orders mostly left that path is followed by a month sold order
+        by order, which is cheaper then.
+        """
+        sell_rng, order_rng, buy_rng = [
+            np.random.default_rng(s) for s in np.random.SeedSequence(seed).spawn(3)
+        ]
+        if isinstance(sell_probability, dict):
+            probabilities = np.array(
+                [sell_probability.get(p, 1.0) for p in self.participants]
+            )
+        else:
+            probabilities = np.full(len(self.participants), sell_probability)
+
+        n_months = len(self.monthly_release_tokens)
+        pools = LiquidityPoolArray.from_pool(self.liquidity_pool, n_paths)
+        tokens_sold = np.zeros((n_paths, n_months))
+        token_price = np.zeros((n_paths, n_months))
+        usdcs_to_buy = np.zeros((n_paths, n_months))
+        price_after_mitigation = np.zeros((n_paths, n_months))
+
+        use_blocks = batched and with_mitigation
+        for month, releases in enumerate(self.monthly_release_tokens):
+            if buy_demand > 0:
+                pools.buy_tokens(
+                    _lognormal(buy_rng, buy_demand, buy_demand_sigma, n_paths)
+                )
+
+            sells = sell_rng.random((n_paths, len(releases))) < probabilities
+            arguments = (
+                pools,
+                sells @ releases,
+                order_rng,
+                average_selling_order,
+                order_size_sigma,
+                max_price_impact,
+            )
+            (
+                tokens_sold[:, month],
+                token_price[:, month],
+                usdcs_to_buy[:, month],
+                price_after_mitigation[:, month],
+                geometric_share,
+            ) = (
+                self._sell_month_batched(*arguments)
+                if use_blocks
+                else self._sell_month_stepwise(*arguments, with_mitigation)
+            )
+            # Blocks only pay off when orders mostly stay on the geometric path.
+            use_blocks = (
+                batched and with_mitigation and geometric_share >= MIN_GEOMETRIC_SHARE
+            )
+
+        return MonteCarloResult(
+            tokens_sold, token_price, usdcs_to_buy, price_after_mitigation
+        )
+
+    def _sell_month_stepwise(
+        self,
+        pools: LiquidityPoolArray,
+        remaining: np.ndarray,
+        order_rng: np.random.Generator,
+        average_selling_order: float,
+        order_size_sigma: float,
+        max_price_impact: float,
+        with_mitigation: bool,
+    ):
+        """Sells each path's `remaining` tokens one order at a time, all paths in lockstep.
+
+        Returns the month's per-path totals and the share of orders that were mitigated.
+        """
+        n_paths = len(remaining)
+        tokens_sold = np.zeros(n_paths)
+        usdcs_to_buy = np.zeros(n_paths)
+        last_price = pools.calculate_price()
+        last_mitigated_price = np.zeros(n_paths)
+        active = remaining > 0
+        orders = mitigated_orders = 0
+        while active.any():
+            price_before_selling = pools.calculate_price()
+            order = _lognormal(
+                order_rng, average_selling_order, order_size_sigma, n_paths
+            )
+            tokens_to_sell = np.where(
+                active, np.minimum(remaining, order / price_before_selling), 0.0
+            )
+            pools.sell_tokens(tokens_to_sell, mask=active)
+            price_after_selling = pools.calculate_price()
+            price_impact = (
+                price_after_selling - price_before_selling
+            ) / price_before_selling
+
+            mitigate = active & (np.abs(price_impact) > max_price_impact)
+            orders += np.count_nonzero(active)
+            mitigated_orders += np.count_nonzero(mitigate)
+            usdc_to_buy = pools.maintain_price(
+                price_before_selling, max_price_impact, mask=mitigate
+            )
+            usdcs_to_buy += usdc_to_buy
+            if with_mitigation:
+                pools.buy_tokens(usdc_to_buy, mask=mitigate)
+
+            tokens_sold += tokens_to_sell
+            last_price = np.where(active, price_after_selling, last_price)
+            last_mitigated_price = np.where(
+                active, pools.calculate_price(), last_mitigated_price
+            )
+            remaining = remaining - tokens_to_sell
+            active &= (remaining > 0) & (tokens_to_sell >= MIN_TOKENS_PER_ORDER)
+        return (
+            tokens_sold,
+            last_price,
+            usdcs_to_buy,
+            last_mitigated_price,
+            mitigated_orders / max(orders, 1),
+        )
+
+    def _sell_month_batched(
+        self,
+        pools: LiquidityPoolArray,
+        remaining: np.ndarray,
+        order_rng: np.random.Generator,
+        average_selling_order: float,
+        order_size_sigma: float,
+        max_price_impact: float,
+    ):
+        """Mitigated selling with runs of orders evaluated along their geometric price path.
+
+        Paths never interact, and in the lockstep loop a path's i-th order
+        takes row i, column p of the month's draws, so each path keeps its own
+        order cursor into those rows. A buy-back resets the price to
+        `price_before_selling * (1 + max_price_impact)` whatever the order
+        size, so while a path is mitigated its prices before selling follow
+        price * growth**i, as in `TokenEconomySimulator._sell_mitigated_orders`.
+        Each pass evaluates a block of orders per path at once; the first
+        order leaving the path (final partial order, order under the
+        threshold, dust order) goes through the order-by-order step. The
+        order stream is left where the lockstep loop would leave it.
+
+        Returns the month's per-path totals and the share of orders evaluated
+        in blocks.
+        """
+        n_paths = len(remaining)
+        paths = np.arange(n_paths)
+        growth = 1 + max_price_impact
+        tokens_sold = np.zeros(n_paths)
+        usdcs_to_buy = np.zeros(n_paths)
+        last_price = pools.calculate_price()
+        last_mitigated_price = np.zeros(n_paths)
+        active = remaining > 0
+        cursors = np.zeros(n_paths, dtype=np.int64)
+        draws = np.empty((0, n_paths))
+        chunks = []  # (rows drawn before the chunk, generator state before it)
+
+        def orders_from(rows: int) -> np.ndarray:
+            nonlocal draws
+            if rows > len(draws):
+                chunks.append((len(draws), order_rng.bit_generator.state))
+                draws = np.vstack(
+                    [
+                        draws,
+                        _lognormal(
+                            order_rng,
+                            average_selling_order,
+                            order_size_sigma,
+                            (max(rows - len(draws), len(draws)), n_paths),
+                        ),
+                    ]
+                )
+            return draws
+
+        max_block_size = max(BATCH_BLOCK_SIZE // n_paths, MIN_BATCH_BLOCK_SIZE)
+        block_size = max_block_size
+        block_orders = 0
+        while active.any():
+            stepping = active
+            size = block_size
+            if block_size >= MIN_BATCH_BLOCK_SIZE:
+                price = pools.calculate_price()
+                size = int(
+                    min(
+                        block_size,
+                        np.max(remaining[active] * price[active])
+                        / average_selling_order
+                        + 1,
+                    )
+                )
+            if size >= MIN_BATCH_BLOCK_SIZE:
+                offsets = np.arange(size)[:, None]
+                draws = orders_from(int(cursors[active].max()) + size)
+                orders_usd = draws[np.minimum(cursors + offsets, len(draws) - 1), paths]
+                k = pools.usdc_reserve * pools.token_reserve
+                prices_before = price * growth**offsets
+                orders = orders_usd / prices_before
+                token_reserves = np.sqrt(k / prices_before) + orders
+                usdc_reserves = k / token_reserves
+                prices_after = usdc_reserves / token_reserves
+                price_impacts = (prices_after - prices_before) / prices_before
+                regular = (
+                    (np.cumsum(orders, axis=0) < remaining)
+                    & (np.abs(price_impacts) > max_price_impact)
+                    & (orders >= MIN_TOKENS_PER_ORDER)
+                )
+                regular_orders = np.where(
+                    regular.all(axis=0), size, np.argmin(regular, axis=0)
+                )
+                regular_orders = np.where(active, regular_orders, 0)
+                in_block = offsets < regular_orders
+                sold = np.sum(orders, axis=0, where=in_block)
+                usdcs_to_buy += np.sum(
+                    np.sqrt(k * prices_before * growth) - usdc_reserves,
+                    axis=0,
+                    where=in_block,
+                )
+                tokens_sold += sold
+                remaining = remaining - sold
+                cursors += regular_orders
+                block_orders += regular_orders.sum()
+
+                moved = regular_orders > 0
+                last = np.maximum(regular_orders - 1, 0)
+                last_price = np.where(moved, prices_after[last, paths], last_price)
+                usdc_reserve = np.sqrt(k * prices_before[last, paths] * growth)
+                pools.usdc_reserve = np.where(moved, usdc_reserve, pools.usdc_reserve)
+                pools.token_reserve = np.where(
+                    moved, k / usdc_reserve, pools.token_reserve
+                )
+                last_mitigated_price = np.where(
+                    moved, pools.calculate_price(), last_mitigated_price
+                )
+
+                stepping = active & (regular_orders < size)
+                block_size = (
+                    min(2 * size, max_block_size)
+                    if regular_orders[active].mean() * 2 >= size
+                    else max(size // 2, 1)
+                )
+                if not stepping.any():
+                    continue
+
+            price_before_selling = pools.calculate_price()
+            rows = cursors.max() + 1
+            order = orders_from(rows)[np.minimum(cursors, rows - 1), paths]
+            tokens_to_sell = np.where(
+                stepping, np.minimum(remaining, order / price_before_selling), 0.0
+            )
+            pools.sell_tokens(tokens_to_sell, mask=stepping)
+            price_after_selling = pools.calculate_price()
+            price_impact = (
+                price_after_selling - price_before_selling
+            ) / price_before_selling
+
+            mitigate = stepping & (np.abs(price_impact) > max_price_impact)
+            usdc_to_buy = pools.maintain_price(
+                price_before_selling, max_price_impact, mask=mitigate
+            )
+            usdcs_to_buy += usdc_to_buy
+            pools.buy_tokens(usdc_to_buy, mask=mitigate)
+
+            tokens_sold += tokens_to_sell
+            last_price = np.where(stepping, price_after_selling, last_price)
+            last_mitigated_price = np.where(
+                stepping, pools.calculate_price(), last_mitigated_price
+            )
+            remaining = remaining - tokens_to_sell
+            cursors += stepping
+            active &= (remaining > 0) & (
+                (tokens_to_sell >= MIN_TOKENS_PER_ORDER) | ~stepping
+            )
+            if size < MIN_BATCH_BLOCK_SIZE:
+                block_size = (
+                    min(2 * block_size, max_block_size)
+                    if (mitigate == stepping).all()
+                    else 1
+                )
+
+        # The lockstep loop draws one row per order of the longest path.
+        used = int(cursors.max(initial=0))
+        while chunks and used < len(draws):
+            rows_before, state = chunks.pop()
+            order_rng.bit_generator.state = state
+            draws = draws[:rows_before]
+        if used > len(draws):
+            _lognormal(
+                order_rng,
+                average_selling_order,
+                order_size_sigma,
+                (used - len(draws), n_paths),
+            )
+        return (
+            tokens_sold,
+            last_price,
+            usdcs_to_buy,
+            last_mitigated_price,
+            block_orders / max(cursors.sum(), 1),
+        )
+
+
+def _lognormal(rng: np.random.Generator, mean: float, sigma: float, size) -> np.ndarray:
+    """Draws lognormal samples with the given arithmetic mean and log-scale sigma."""
+    if sigma == 0:
+        return np.full(size, float(mean))
+    return rng.lognormal(np.log(mean) - sigma**2 / 2, sigma, size)
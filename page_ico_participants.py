@@ -0,0 +1,112 @@
+import pandas as pd
+import streamlit as st
+from st_aggrid import AgGrid, GridOptionsBuilder, GridUpdateMode
+
+from charts import pie_chart, stacked_area_chart
+
+
+def add_row(
+    description,
+    percent_of_tot_supply,
+    price_per_token,
+    tge_percent,
+    cliff_months,
+    distribution_months,
+):
+    new_row = pd.DataFrame(
+        {
+            "description": [description],
+            "percent_of_tot_supply": [percent_of_tot_supply],
+            "price_per_token": [price_per_token],
+            "tge_percent": [tge_percent],
+            "cliff_months": [cliff_months],
+            "distribution_months": [distribution_months],
+        }
+    )
+    st.session_state.df = pd.concat([st.session_state.df, new_row], ignore_index=True)
+
+
+def render(pipeline, client_side_charts: bool = False):
+    """Renders the ICO Participants page: participant editing and vesting charts."""
+    st.title("ICO Participants Data Entry")
+
+    with st.form(key="participant_form"):
+        description = st.text_input("Description")
+        percent_of_tot_supply = st.number_input(
+            "Percent of Total Supply", min_value=0.0, max_value=100.0, step=0.01
+        )
+        price_per_token = st.number_input("Price per Token", min_value=0.0, step=0.0001)
+        tge_percent = st.number_input(
+            "TGE Percent", min_value=0.0, max_value=100.0, step=0.01
+        )
+        cliff_months = st.number_input("Cliff Months", min_value=0, step=1)
+        distribution_months = st.number_input(
+            "Distribution Months", min_value=0, step=1
+        )
+        submit_button = st.form_submit_button(label="Add Participant")
+
+        if submit_button:
+            add_row(
+                description,
+                percent_of_tot_supply,
+                price_per_token,
+                tge_percent,
+                cliff_months,
+                distribution_months,
+            )
+            st.success(f"Added {description}")
+
+    st.write("Current Participants Data")
+
+    gb = GridOptionsBuilder.from_dataframe(st.session_state.df)
+    gb.configure_default_column(editable=True)
+    gb.configure_selection("single")
+    grid_options = gb.build()
+
+    grid_response = AgGrid(
+        st.session_state.df,
+        gridOptions=grid_options,
+        update_mode=GridUpdateMode.SELECTION_CHANGED | GridUpdateMode.VALUE_CHANGED,
+        allow_unsafe_jscode=True,
+        height=300,
+    )
+
+    st.session_state.df = grid_response["data"]
+    pipeline.set(participants=st.session_state.df)
+
+    selected_row = grid_response.get("selected_rows", [])
+    if selected_row is not None:
+        if st.button(f"Delete {selected_row.values[0][0]}"):
+            st.session_state.df = st.session_state.df.drop(
+                st.session_state.df.index[
+                    st.session_state.df["description"] == selected_row.values[0][0]
+                ]
+            ).reset_index(drop=True)
+            st.rerun()
+
+    if not st.session_state.df.empty:
+        participants_df = pipeline.get("financial_table")
+        vesting_schedule_df = pipeline.get("vesting_schedule")
+        st.write("Participants Financial DataFrame")
+        st.dataframe(participants_df)
+
+        st.write("Vesting Schedule DataFrame")
+        st.dataframe(vesting_schedule_df)
+
+        # Generate stacked area chart for vesting schedules
+        st.header("Vesting Schedules Stacked Area Chart")
+        stacked_area_chart(
+            vesting_schedule_df.cumsum(),
+            "Vesting Schedules Over Time",
+            "Months",
+            "Tokens Vested",
+            legend_title="Participants",
+            client_side=client_side_charts,
+        )
+
+        # Generate pie chart for token allocation
+        st.header("Token Allocation Pie Chart")
+        allocation_data = st.session_state.df.groupby("description")[
+            "percent_of_tot_supply"
+        ].sum()
+        pie_chart(allocation_data, "Token Allocation")
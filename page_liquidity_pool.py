@@ -0,0 +1,50 @@
+import streamlit as st
+
+from app_state import initial_listing_price
+from charts import line_chart
+
+
+def render(pipeline, client_side_charts: bool = False):
+    """Renders the Liquidity Pool Setup page: debt emission of the protocol."""
+    st.title("Liquidity Pool Setup")
+
+    if not st.session_state.df.empty:
+        initial_ioty = st.number_input(
+            "Initial ioty in the Liquidity Pool", value=300_000_000
+        )
+        initial_usdc = initial_ioty * initial_listing_price
+        st.text(
+            f"You would need {initial_usdc} in order to have a listing price of {initial_listing_price} for this initial liquidity provision"
+        )
+        initial_token_price = st.number_input("Average trading size", value=10_000.0)
+        token_price_decrease_rate = st.number_input(
+            "Maximum price impact threshhold", value=-0.0002, format="%.5f"
+        )
+        mitigation = st.checkbox("Apply mitigation", value=True)
+
+        pipeline.set(
+            initial_ioty=initial_ioty,
+            average_selling_order=initial_token_price,
+            max_price_impact=token_price_decrease_rate,
+            with_mitigation=mitigation,
+        )
+        debt_dataframe = pipeline.get("debt")
+        st.write(debt_dataframe)
+
+        line_chart(
+            [(None, debt_dataframe["usdcs_to_buy"], "orange")],
+            "Debt Emission of the Protocol in Dollar",
+            "Months",
+            "Dollars",
+            client_side=client_side_charts,
+        )
+        line_chart(
+            [(None, debt_dataframe["usdcs_to_buy"].cumsum(), "orange")],
+            "Cumulated Debt Emission of the Protocol in Dollar",
+            "Months",
+            "Dollars",
+            client_side=client_side_charts,
+        )
+
+    else:
+        st.write("Please set up ICO Participants first.")
@@ -0,0 +1,57 @@
+import streamlit as st
+
+from app_state import POOL_COLORS
+from charts import line_chart
+
+
+def render(pipeline, client_side_charts: bool = False):
+    """Renders the Minting page: pool balances under each revenue scenario."""
+    treasury_ratio = st.number_input(
+        "Treasury redirection ratio",
+        min_value=0.0,
+        max_value=1.0,
+        step=0.01,
+        value=0.2,
+    )
+    staking_ratio = st.number_input(
+        "Staking redirection ratio",
+        min_value=0.0,
+        max_value=1.0,
+        step=0.01,
+        value=0.4,
+    )
+    minting_ratio = st.number_input(
+        "Minting redirection ratio",
+        min_value=0.0,
+        max_value=1.0,
+        step=0.01,
+        value=0.4,
+    )
+    st.write(
+        f"the sum of the ratios is : {treasury_ratio + staking_ratio + minting_ratio}"
+    )
+
+    emission_rate = st.number_input(
+        "Emission Constant of the minting pool",
+        min_value=0.0,
+        max_value=1.0,
+        step=0.01,
+        value=0.1,
+    )
+    ratios = {
+        "Treasury": treasury_ratio,
+        "Staking": staking_ratio,
+        "Minting": minting_ratio,
+    }
+    pipeline.set(emission_rate=emission_rate, ratios=ratios)
+    minting_simulation = pipeline.get("minting")
+    for scenario in ["pessimistic", "moderate", "optimistic"]:
+        pools_data = minting_simulation.pool_history(scenario)
+        st.write(f"{scenario.capitalize()} Scenario")
+        line_chart(
+            [(pool, pools_data[pool], color) for pool, color in POOL_COLORS],
+            "Percentage of tokens to be staked over the total supply",
+            "Time (Months)",
+            "% supply",
+            client_side=client_side_charts,
+        )
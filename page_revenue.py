@@ -0,0 +1,70 @@
+import pandas as pd
+import streamlit as st
+
+from app_state import SCENARIO_COLORS
+from charts import line_chart
+
+
+def add_revenue_scenario(month, pessimistic, moderate, optimistic):
+    new_row = pd.DataFrame(
+        {
+            "month": [month],
+            "pessimistic": [pessimistic],
+            "moderate": [moderate],
+            "optimistic": [optimistic],
+        }
+    )
+    st.session_state.revenue_df = pd.concat(
+        [st.session_state.revenue_df, new_row], ignore_index=True
+    )
+
+
+def render(pipeline, client_side_charts: bool = False):
+    """Renders the Revenu page: revenue scenarios and gross profit."""
+    st.title("Revenue Scenarios")
+
+    # Upload file
+    uploaded_file = st.file_uploader("Upload CSV or Excel file", type=["csv", "xlsx"])
+
+    if uploaded_file:
+        if uploaded_file.name.endswith(".csv"):
+            st.session_state.revenue_df = pd.read_csv(uploaded_file)
+        elif uploaded_file.name.endswith(".xlsx"):
+            st.session_state.revenue_df = pd.read_excel(uploaded_file)
+        pipeline.set(revenue=st.session_state.revenue_df)
+
+    st.write("Current Revenue Scenarios")
+    st.write(st.session_state.revenue_df)
+    usdcs_to_buy = pd.DataFrame(
+        pipeline.get("debt")["usdcs_to_buy"].to_list() + [0] * 23
+    )
+    usdcs_to_buy = usdcs_to_buy[usdcs_to_buy[0] != 0]
+    scenario_moderate_data = st.session_state.revenue_df["moderate"] - usdcs_to_buy[0]
+    scenario_optimistic_data = (
+        st.session_state.revenue_df["optimistic"] - usdcs_to_buy[0]
+    )
+    scenario_pessimistic_data = (
+        st.session_state.revenue_df["pessimistic"] - usdcs_to_buy[0]
+    )
+
+    line_chart(
+        [
+            (label, st.session_state.revenue_df[scenario], color)
+            for scenario, label, color in SCENARIO_COLORS
+        ],
+        "Monthly Revenues by Scenario in Dollars",
+        "Time (Months)",
+        "Revenues in Dollars",
+        client_side=client_side_charts,
+    )
+    line_chart(
+        [
+            ("Moderate", scenario_moderate_data, "blue"),
+            ("Optimistic", scenario_optimistic_data, "green"),
+            ("Pessimistic", scenario_pessimistic_data, "red"),
+        ],
+        "Gross profit over time (Revenu VS Debt Emission)",
+        "Time (Months)",
+        "Dollars",
+        client_side=client_side_charts,
+    )
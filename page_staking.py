@@ -0,0 +1,51 @@
+import pandas as pd
+import streamlit as st
+
+from app_state import SCENARIO_COLORS
+from charts import line_chart
+
+
+def render(pipeline, client_side_charts: bool = False):
+    """Renders the Staking page: sustainable APRs and staking pool trajectories."""
+    apr_target = st.number_input(
+        "Target_apr", min_value=0.0, max_value=1.0, step=0.01, value=0.2
+    )
+
+    pipeline.set(yearly_target_apr=apr_target)
+
+    scenarios = pipeline.get("scenarios")
+    st.write("Highest APR keeping the staking pool non-negative")
+    st.dataframe(
+        pd.DataFrame(
+            {
+                "Scenario": scenarios,
+                "Sustainable APR": pipeline.get("sustainable_aprs"),
+            }
+        )
+    )
+
+    staking_data = pipeline.get("staking_data")
+
+    for column, title, ylabel in [
+        (
+            "percent_staked",
+            "Percentage of tokens to be staked over the total supply",
+            "% supply",
+        ),
+        ("staking_pool", "Staking pool status", "Ioty"),
+        (
+            "incentive_for_stakers_0",
+            "Monthly incentive distribution for stakers",
+            "Ioty",
+        ),
+    ]:
+        line_chart(
+            [
+                (label, staking_data[scenario][column], color)
+                for scenario, label, color in SCENARIO_COLORS
+            ],
+            title,
+            "Time (Months)",
+            ylabel,
+            client_side=client_side_charts,
+        )
@@ -0,0 +1,99 @@
+from concurrent.futures import ProcessPoolExecutor
+from copy import deepcopy
+from itertools import product
+from typing import Dict, List, Optional, Union
+
+import pandas as pd
+
+from ICO_distribution import ICOOrchestrator
+from Liquidity_pool import ConcentratedLiquidityPool, LiquidityPool
+from vesting_simulation import TokenEconomySimulator
+
+SWEEP_PARAMETERS = ["average_selling_order", "max_price_impact", "with_mitigation"]
+RESULT_COLUMNS = [
+    "tokens_sold",
+    "token_price",
+    "usdcs_to_buy",
+    "price_after_mitigation",
+]
+
+# State shared by every run of a worker process, set once by `_init_worker`.
+_worker_state = {}
+
+
+def expand_parameter_grid(grid: Dict[str, list]) -> List[Dict]:
+    """Expands a {parameter: values} grid into the list of all parameter sets."""
+    names = list(grid)
+    return [dict(zip(names, values)) for values in product(*grid.values())]
+
+
+def _init_worker(
+    liquidity_pool: Union[LiquidityPool, ConcentratedLiquidityPool],
+    monthly_release_tokens: pd.Series,
+    batched: bool,
+):
+    _worker_state.update(
+        liquidity_pool=liquidity_pool,
+        monthly_release_tokens=monthly_release_tokens,
+        batched=batched,
+    )
+
+
+def _run_parameter_set(parameters: Dict) -> Dict[str, List[float]]:
+    """Runs one vesting simulation on a fresh copy of the worker's liquidity pool."""
+    simulator = TokenEconomySimulator.from_release_tokens(
+        _worker_state["monthly_release_tokens"],
+        deepcopy(_worker_state["liquidity_pool"]),
+    )
+    return simulator.run_vesting_simulation(
+        parameters["average_selling_order"],
+        parameters["max_price_impact"],
+        parameters["with_mitigation"],
+        batched=_worker_state["batched"],
+    )
+
+
+def run_parameter_sweep(
+    orchestrator: ICOOrchestrator,
+    liquidity_pool: Union[LiquidityPool, ConcentratedLiquidityPool],
+    columns_to_exclude: List[str],
+    parameter_sets: Union[Dict[str, list], List[Dict]],
+    max_workers: Optional[int] = None,
+    batched: bool = True,
+    chunksize: int = 16,
+) -> pd.DataFrame:
+    """Runs `run_vesting_simulation` for every parameter set on a process pool.
+
+    `parameter_sets` is either a grid ({parameter: values}) or a list of
+    parameter dicts with the keys in `SWEEP_PARAMETERS`. Every run starts from
+    its own copy of `liquidity_pool`. Returns one row per parameter set and
+    month, with the parameters as the leading columns.
+    """
+    if isinstance(parameter_sets, dict):
+        parameter_sets = expand_parameter_grid(parameter_sets)
+    parameter_sets = list(parameter_sets)
+
+    simulator = TokenEconomySimulator(orchestrator, liquidity_pool, columns_to_exclude)
+    simulator.compute_monthly_released_tokens()
+    initargs = (deepcopy(liquidity_pool), simulator.monthly_release_tokens, batched)
+
+    if max_workers == 1:
+        _init_worker(*initargs)
+        results = [_run_parameter_set(p) for p in parameter_sets]
+    else:
+        with ProcessPoolExecutor(
+            max_workers=max_workers, initializer=_init_worker, initargs=initargs
+        ) as executor:
+            results = list(
+                executor.map(_run_parameter_set, parameter_sets, chunksize=chunksize)
+            )
+
+    table = {name: [] for name in SWEEP_PARAMETERS + ["month"] + RESULT_COLUMNS}
+    for parameters, result in zip(parameter_sets, results):
+        months = len(result["tokens_sold"])
+        for name in SWEEP_PARAMETERS:
+            table[name] += [parameters[name]] * months
+        table["month"] += range(months)
+        for column in RESULT_COLUMNS:
+            table[column] += result[column]
+    return pd.DataFrame(table)
@@ -0,0 +1,159 @@
+from bisect import bisect_left
+from enum import IntEnum
+from typing import Dict, List, NamedTuple, Union
+
+import numpy as np
+import pandas as pd
+
+
+class FlowCause(IntEnum):
+    OTHER = 0
+    MINTING_EMISSION = 1
+    STAKING_EMISSION = 2
+    UNLOCK_REDISTRIBUTION = 3
+    CLAMP = 4  # adjustment made when a balance is clamped to [0, max_tokens]
+
+
+EVENT_DTYPE = np.dtype(
+    [
+        ("month", np.int32),
+        ("pool", np.int16),
+        ("cause", np.int8),
+        ("amount", np.float64),
+    ]
+)
+
+
+class LedgerState(NamedTuple):
+    """Per-pool balances and cumulative (pool, cause) inflows and outflows."""
+
+    balances: np.ndarray
+    inflows: np.ndarray
+    outflows: np.ndarray
+
+
+class PoolLedger:
+    """Append-only log of pool flows, with a checkpoint of the running totals per month.
+
+    Events must be recorded in month order. Before the first event of each
+    month, the ledger saves every pool's balance and its cumulative inflows
+    and outflows per cause, so a query is a bisection on the checkpoint
+    months followed by one read. The balance of a pool at month m is its
+    balance before the flows of month m, i.e. `tokens_history[m]`.
+    """
+
+    def __init__(self, initial_capacity: int = 1024):
+        self.pool_names: List[str] = []
+        self.initial_tokens: List[float] = []
+        self.events = np.zeros(initial_capacity, dtype=EVENT_DTYPE)
+        self.n_events = 0
+        self.checkpoint_months: List[int] = []
+        self._checkpoints: List[LedgerState] = []
+
+    def register_pool(self, name: str, initial_tokens: float = 0.0) -> int:
+        """Adds a pool to the ledger and returns its id."""
+        if self.n_events:
+            raise ValueError("Pools must be registered before the first event")
+        self.pool_names.append(name)
+        self.initial_tokens.append(initial_tokens)
+        return len(self.pool_names) - 1
+
+    def record(
+        self,
+        month: int,
+        pool: Union[int, str],
+        amount: float,
+        cause: FlowCause = FlowCause.OTHER,
+    ):
+        """Appends one flow; positive amounts are inflows, negative ones outflows."""
+        self.record_many(month, [self._pool_id(pool)], [amount], cause)
+
+    def record_many(
+        self, month: int, pools, amounts, cause: FlowCause = FlowCause.OTHER
+    ):
+        """Appends one flow of the same month and cause per pool id in `pools`."""
+        pools = np.asarray(pools, dtype=np.intp)
+        amounts = np.broadcast_to(np.asarray(amounts, dtype=float), pools.shape)
+        pools, amounts = pools.ravel(), amounts.ravel()
+        if not len(pools):
+            return
+        if self.n_events == 0:
+            self._balances = np.array(self.initial_tokens, dtype=float)
+            self._inflows = np.zeros((len(self.pool_names), len(FlowCause)))
+            self._outflows = np.zeros_like(self._inflows)
+        elif month < self.checkpoint_months[-1]:
+            raise ValueError("Events must be recorded in month order")
+        if not self.checkpoint_months or month > self.checkpoint_months[-1]:
+            self.checkpoint_months.append(month)
+            self._checkpoints.append(
+                LedgerState(
+                    self._balances.copy(), self._inflows.copy(), self._outflows.copy()
+                )
+            )
+
+        end = self.n_events + len(pools)
+        if end > len(self.events):
+            self.events = np.resize(self.events, max(2 * len(self.events), end))
+        events = self.events[self.n_events : end]
+        events["month"] = month
+        events["pool"] = pools
+        events["cause"] = cause
+        events["amount"] = amounts
+        self.n_events = end
+        np.add.at(self._balances, pools, amounts)
+        np.add.at(self._inflows, (pools, cause), np.maximum(amounts, 0))
+        np.add.at(self._outflows, (pools, cause), np.maximum(-amounts, 0))
+
+    def _pool_id(self, pool: Union[int, str]) -> int:
+        return self.pool_names.index(pool) if isinstance(pool, str) else pool
+
+    def _state_at(self, month: int) -> LedgerState:
+        """Balances and cumulative (pool, cause) inflows and outflows before `month`."""
+        if self.n_events == 0:
+            n_pools, n_causes = len(self.pool_names), len(FlowCause)
+            return LedgerState(
+                np.array(self.initial_tokens, dtype=float),
+                np.zeros((n_pools, n_causes)),
+                np.zeros((n_pools, n_causes)),
+            )
+        # The first month with events at or after `month` saved the state
+        # before it; past the last one, every event is before `month`.
+        checkpoint = bisect_left(self.checkpoint_months, month)
+        if checkpoint == len(self._checkpoints):
+            return LedgerState(self._balances, self._inflows, self._outflows)
+        return self._checkpoints[checkpoint]
+
+    def balance(self, pool: Union[int, str], month: int) -> float:
+        """Balance of `pool` at the start of `month`."""
+        return float(self._state_at(month).balances[self._pool_id(pool)])
+
+    def _flows_by_cause(self, pool, start_month, end_month, direction: str):
+        """Differences of the `direction` ("inflows" or "outflows") totals."""
+        pool = self._pool_id(pool)
+        end_flows = getattr(self._state_at(end_month), direction)
+        flows = end_flows - getattr(self._state_at(start_month), direction)
+        return {cause.name: float(flows[pool, cause]) for cause in FlowCause}
+
+    def inflows_by_cause(
+        self, pool: Union[int, str], start_month: int, end_month: int
+    ) -> Dict[str, float]:
+        """Tokens added to `pool` per cause during months [start_month, end_month)."""
+        return self._flows_by_cause(pool, start_month, end_month, "inflows")
+
+    def outflows_by_cause(
+        self, pool: Union[int, str], start_month: int, end_month: int
+    ) -> Dict[str, float]:
+        """Tokens removed from `pool` per cause during months [start_month, end_month)."""
+        return self._flows_by_cause(pool, start_month, end_month, "outflows")
+
+    def events_dataframe(self) -> pd.DataFrame:
+        """Returns the event log with pool and cause names."""
+        events = self.events[: self.n_events]
+        return pd.DataFrame(
+            {
+                "month": events["month"],
+                "pool": [self.pool_names[p] for p in events["pool"]],
+                "cause": [FlowCause(c).name for c in events["cause"]],
+                "amount": events["amount"],
+            }
+        )
@@ -0,0 +1,434 @@
+import copy
+import dataclasses
+import functools
+import hashlib
+import inspect
+import os
+import pickle
+import sys
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field, fields
+from typing import Any, Callable, Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+
+def content_hash(value: Any) -> str:
+    """Returns a hex digest of `value`'s content, stable across equal objects.
+
+    DataFrames, Series and arrays are hashed from their data, labels and
+    dtypes; containers element by element; other objects from their type and
+    attributes, falling back to their pickle.
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    _update_hash(digest, value)
+    return digest.hexdigest()
+
+
+def _update_hash(digest, value):
+    digest.update(type(value).__qualname__.encode())
+    if value is None or isinstance(value, (bool, int, float, complex, str)):
+        digest.update(repr(value).encode())
+    elif isinstance(value, bytes):
+        digest.update(value)
+    elif isinstance(value, (np.ndarray, np.generic)):
+        array = np.asarray(value)
+        digest.update(f"{array.dtype.str}{array.shape}".encode())
+        if array.dtype.hasobject:
+            _update_hash(digest, array.tolist())
+        else:
+            digest.update(np.ascontiguousarray(array).tobytes())
+    elif isinstance(value, pd.DataFrame):
+        _update_hash(digest, list(value.columns))
+        _update_hash(digest, [str(dtype) for dtype in value.dtypes])
+        digest.update(
+            pd.util.hash_pandas_object(value, index=True).to_numpy().tobytes()
+        )
+    elif isinstance(value, (pd.Series, pd.Index)):
+        _update_hash(digest, (value.name, str(value.dtype)))
+        digest.update(pd.util.hash_pandas_object(value).to_numpy().tobytes())
+    elif isinstance(value, (list, tuple)):
+        digest.update(str(len(value)).encode())
+        for item in value:
+            _update_hash(digest, item)
+    elif isinstance(value, dict):
+        digest.update(str(len(value)).encode())
+        for key, item in sorted(
+            (content_hash(key), item) for key, item in value.items()
+        ):
+            digest.update(key.encode())
+            _update_hash(digest, item)
+    elif isinstance(value, (set, frozenset)):
+        for key in sorted(content_hash(item) for item in value):
+            digest.update(key.encode())
+    elif hasattr(value, "__dict__"):
+        _update_hash(digest, vars(value))
+    else:
+        digest.update(pickle.dumps(value))
+
+
+def estimate_size(value: Any, _seen: Optional[set] = None) -> int:
+    """Approximate memory footprint of `value` in bytes, following containers."""
+    if _seen is None:
+        _seen = set()
+    if id(value) in _seen:
+        return 0
+    _seen.add(id(value))
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        return int(value.memory_usage(index=True, deep=True).sum())
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    size = sys.getsizeof(value)
+    if isinstance(value, dict):
+        size += sum(
+            estimate_size(key, _seen) + estimate_size(item, _seen)
+            for key, item in value.items()
+        )
+    elif isinstance(value, (list, tuple, set, frozenset)):
+        size += sum(estimate_size(item, _seen) for item in value)
+    elif hasattr(value, "__dict__"):
+        size += estimate_size(vars(value), _seen)
+    return size
+
+
+@dataclass
+class CacheStats:
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    disk_hits: int = 0
+
+
+@dataclass
+class EntryStats:
+    """Bookkeeping of one cached result; `label` names the function that computed it."""
+
+    label: str
+    size: int
+    compute_seconds: float = 0.0
+    hits: int = 0
+    created: float = field(default_factory=time.time)
+    last_access: float = field(default_factory=time.time)
+
+
+# pandas >= 3 always copies on write, so a shallow copy is enough to keep a
+# caller's edits out of the stored object.
+_LAZY_COPIES = int(pd.__version__.split(".")[0]) >= 3
+
+
+def _freeze(value: Any, _seen: Optional[set] = None):
+    """Marks the arrays held by `value` read-only, following containers and dataclasses.
+
+    Only applied to the cache's own copies. pandas objects are protected by
+    `_share` instead.
+    """
+    if _seen is None:
+        _seen = set()
+    if id(value) in _seen:
+        return
+    _seen.add(id(value))
+    if isinstance(value, np.ndarray):
+        value.flags.writeable = False
+    elif isinstance(value, dict):
+        for item in value.values():
+            _freeze(item, _seen)
+    elif isinstance(value, (list, tuple)):
+        for item in value:
+            _freeze(item, _seen)
+    elif dataclasses.is_dataclass(value) and not isinstance(value, type):
+        _freeze(vars(value), _seen)
+
+
+def _share(value: Any):
+    """Returns a caller's copy of a stored value.
+
+    Read-only arrays and immutable scalars are shared, pandas objects are
+    copied, containers and dataclasses are rebuilt around their shared
+    contents, and any other object, which `_freeze` cannot protect, is
+    deep-copied, so the stored value is never reachable.
+    """
+    if value is None or isinstance(
+        value, (bool, int, float, complex, str, bytes, np.ndarray, np.generic)
+    ):
+        return value
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        return value.copy(deep=not _LAZY_COPIES)
+    if isinstance(value, dict):
+        return {key: _share(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_share(item) for item in value]
+    if isinstance(value, tuple):
+        items = [_share(item) for item in value]
+        return type(value)(*items) if hasattr(value, "_fields") else tuple(items)
+    if dataclasses.is_dataclass(value) and not isinstance(value, type):
+        clone = copy.copy(value)
+        vars(clone).update({key: _share(item) for key, item in vars(value).items()})
+        return clone
+    return copy.deepcopy(value)
+
+
+class ResultCache:
+    """Thread-safe LRU store of computed results keyed on the content of their inputs.
+
+    A module-level instance is shared by every Streamlit session of the
+    server process, so equal inputs are computed once per server. Entries are
+    write-once: storing under an existing key keeps the first value. The
+    cache keeps its own copy of each result with read-only arrays, and hands
+    out copies of the pandas objects in it, so callers cannot alter it. Entries are evicted least
+    recently used first once their estimated total size exceeds `max_bytes`;
+    a single result larger than the cap is returned but neither kept in
+    memory nor written to disk.
+
+    With a `directory`, results are also pickled there, one file per key, and
+    reloaded on a memory miss, so they survive restarts and are shared between
+    server processes; files are evicted oldest-accessed first beyond
+    `max_disk_bytes`.
+    """
+
+    def __init__(
+        self,
+        max_bytes: int = 256 * 2**20,
+        directory: Optional[str] = None,
+        max_disk_bytes: int = 2**30,
+    ):
+        self.max_bytes = max_bytes
+        self.directory = directory
+        self.max_disk_bytes = max_disk_bytes
+        self.nbytes = 0
+        self.stats = CacheStats()
+        self._entries = OrderedDict()  # key -> (value, EntryStats)
+        self._lock = threading.RLock()
+        self._computing: Dict[str, list] = {}  # key -> [lock, waiting threads]
+        if directory is not None:
+            os.makedirs(directory, exist_ok=True)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._entries
+
+    def get(self, key: str, default=None):
+        value = self._lookup(key)
+        if value is _MISSING:
+            with self._lock:
+                self.stats.misses += 1
+            return default
+        return value
+
+    def _lookup(self, key: str):
+        """Returns a caller's copy of the entry, from memory or disk, or _MISSING.
+
+        Hits are counted; misses are left to the caller.
+        """
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                return self._hit(*self._entries[key])
+        # Disk reads happen outside the lock, so other keys stay available.
+        value, entry = self._load(key)
+        if entry is None:
+            return _MISSING
+        with self._lock:
+            if key in self._entries:
+                value, entry = self._entries[key]
+            else:
+                self._insert(key, value, entry)
+            self.stats.disk_hits += 1
+            return self._hit(value, entry)
+
+    def _hit(self, value: Any, entry: EntryStats):
+        self.stats.hits += 1
+        entry.hits += 1
+        entry.last_access = time.time()
+        return _share(value)
+
+    def put(self, key: str, value: Any, label: str = "", compute_seconds: float = 0.0):
+        """Stores a copy of `value` under `key` unless already present.
+
+        Returns a caller's copy of the stored value.
+        """
+        with self._lock:
+            if key in self._entries:
+                return _share(self._entries[key][0])
+        # The stored copy is the cache's own, so freezing it leaves the
+        # caller's objects, and any inputs `value` refers to, writable.
+        value = copy.deepcopy(value)
+        _freeze(value)
+        entry = EntryStats(label, estimate_size(value), compute_seconds)
+        if entry.size > self.max_bytes:
+            return _share(value)
+        with self._lock:
+            if key in self._entries:
+                return _share(self._entries[key][0])
+            self._insert(key, value, entry)
+        self._dump(key, value, entry)
+        return _share(value)
+
+    def _insert(self, key: str, value: Any, entry: EntryStats):
+        if entry.size > self.max_bytes:
+            return
+        self._entries[key] = (value, entry)
+        self.nbytes += entry.size
+        while self.nbytes > self.max_bytes:
+            _, (_, evicted) = self._entries.popitem(last=False)
+            self.nbytes -= evicted.size
+            self.stats.evictions += 1
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.pkl")
+
+    def _load(self, key: str):
+        if self.directory is None:
+            return None, None
+        try:
+            with open(self._path(key), "rb") as f:
+                value, entry = pickle.load(f)
+        except FileNotFoundError:
+            return None, None
+        except Exception:
+            # A truncated or unreadable file is recomputed and rewritten;
+            # another process may have replaced or removed it meanwhile.
+            _remove(self._path(key))
+            return None, None
+        try:
+            os.utime(self._path(key))
+        except OSError:
+            pass
+        _freeze(value)
+        return value, entry
+
+    def _dump(self, key: str, value: Any, entry: EntryStats):
+        """Writes the entry to `directory`; a failed write only loses the disk copy."""
+        if self.directory is None or os.path.exists(self._path(key)):
+            return
+        try:
+            payload = pickle.dumps((value, entry), protocol=pickle.HIGHEST_PROTOCOL)
+        except (pickle.PicklingError, TypeError, AttributeError):
+            return
+        tmp_path = None
+        try:
+            with tempfile.NamedTemporaryFile(
+                dir=self.directory, suffix=".tmp", delete=False
+            ) as f:
+                tmp_path = f.name
+                f.write(payload)
+            os.replace(tmp_path, self._path(key))
+        except OSError:
+            if tmp_path is not None:
+                _remove(tmp_path)
+            return
+        self._evict_files()
+
+    def _evict_files(self):
+        """Removes the oldest-accessed files beyond `max_disk_bytes`.
+
+        Other threads and processes scan the same directory, so files may
+        vanish at any point.
+        """
+        files = []
+        try:
+            for item in os.scandir(self.directory):
+                if item.name.endswith(".pkl"):
+                    try:
+                        stat = item.stat()
+                    except OSError:
+                        continue
+                    files.append((stat.st_mtime, stat.st_size, item.path))
+        except OSError:
+            return
+        total = sum(size for _, size, _ in files)
+        for _, size, path in sorted(files):
+            if total <= self.max_disk_bytes:
+                break
+            total -= size
+            _remove(path)
+
+    def clear(self):
+        """Empties the in-memory store; files in `directory` are kept."""
+        with self._lock:
+            self._entries.clear()
+            self.nbytes = 0
+
+    def entry_stats(self) -> pd.DataFrame:
+        """One row per entry in memory, most recently used last."""
+        with self._lock:
+            rows = [
+                {"key": key, **asdict(entry)}
+                for key, (_, entry) in self._entries.items()
+            ]
+        return pd.DataFrame(
+            rows, columns=["key", *(f.name for f in fields(EntryStats))]
+        )
+
+    @contextmanager
+    def _computing_lock(self, key: str):
+        with self._lock:
+            slot = self._computing.setdefault(key, [threading.Lock(), 0])
+            slot[1] += 1
+        try:
+            with slot[0]:
+                yield
+        finally:
+            with self._lock:
+                slot[1] -= 1
+                if not slot[1]:
+                    del self._computing[key]
+
+    def memoize(self, func: Callable) -> Callable:
+        """Decorates `func` so calls with equal arguments reuse the cached result.
+
+        The key hashes the function's qualified name, the source of its module
+        and its bound arguments, defaults included, so positional and keyword
+        calls share entries and editing the module invalidates them (edits to
+        other modules it calls are not detected). Concurrent calls with equal
+        arguments run `func` once; the others wait for its result.
+        """
+        signature = inspect.signature(func)
+        name = f"{func.__module__}.{func.__qualname__}"
+        version = _source_digest(func)
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            arguments = signature.bind(*args, **kwargs)
+            arguments.apply_defaults()
+            key = content_hash((name, version, dict(arguments.arguments)))
+            result = self._lookup(key)
+            if result is not _MISSING:
+                return result
+            with self._computing_lock(key):
+                # Threads that waited for the same key find its result here.
+                result = self._lookup(key)
+                if result is not _MISSING:
+                    return result
+                with self._lock:
+                    self.stats.misses += 1
+                start = time.perf_counter()
+                result = func(*args, **kwargs)
+                return self.put(key, result, name, time.perf_counter() - start)
+
+        wrapper.cache = self
+        return wrapper
+
+
+def _remove(path: str):
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+def _source_digest(func: Callable) -> str:
+    try:
+        with open(inspect.getsourcefile(func), "rb") as f:
+            return hashlib.blake2b(f.read(), digest_size=16).hexdigest()
+    except (OSError, TypeError):
+        return ""
+
+
+_MISSING = object()
@@ -1,34 +1,105 @@
 from abc import ABC, abstractmethod
-from typing import List
+from functools import wraps
+from typing import Dict, List, Sequence, Tuple, Union
 import numpy as np
 
 
+def cached_series(method):
+    """Memoizes a `RevenueSource.calculate_*` method until one of its inputs changes.
+
+    The inputs are listed in the class's `cache_dependencies`. Cached arrays are
+    made read-only since every caller shares them; a result that shares memory
+    with one of the source's attributes is copied first, so the attribute stays
+    writable.
+    """
+
+    @wraps(method)
+    def wrapper(self):
+        cache = self._series_cache()
+        stats = self.__dict__["_cache_stats"]
+        name = method.__name__
+        if name in cache:
+            stats["hits"] += 1
+            return cache[name]
+        stats["misses"] += 1
+        series = method(self)
+        if isinstance(series, np.ndarray):
+            if any(
+                isinstance(value, np.ndarray) and np.may_share_memory(value, series)
+                for value in self.__dict__.values()
+            ):
+                series = series.copy()
+            series.flags.writeable = False
+        cache[name] = series
+        return series
+
+    return wrapper
+
+
 class RevenueSource(ABC):
+    """Revenue series as float64 arrays; lists are still accepted through `as_series`."""
+
+    # Maps each cached series to the attributes and series it is computed from.
+    # Reassigning one of them drops every series that depends on it.
+    cache_dependencies: Dict[str, Tuple[str, ...]] = {}
+
+    def __setattr__(self, name, value):
+        super().__setattr__(name, value)
+        if self.__dict__.get("_cache"):
+            self.invalidate_cache(name)
+
+    def _series_cache(self) -> Dict[str, np.ndarray]:
+        if "_cache" not in self.__dict__:
+            self.__dict__["_cache"] = {}
+            self.__dict__["_cache_stats"] = {"hits": 0, "misses": 0}
+        return self.__dict__["_cache"]
+
+    def invalidate_cache(self, name: str = None):
+        """Drops the series depending on `name`, or every cached series if it is None.
+
+        Call it after mutating an input in place (e.g. `source.units[3] = 10`);
+        reassigning an input invalidates automatically.
+        """
+        cache = self._series_cache()
+        if name is None:
+            cache.clear()
+            return
+        for series, dependencies in self.cache_dependencies.items():
+            if name in dependencies:
+                cache.pop(series, None)
+                self.invalidate_cache(series)
+
+    @property
+    def cache_stats(self) -> Dict[str, int]:
+        """Cache hit and miss counters of this source."""
+        self._series_cache()
+        return dict(self.__dict__["_cache_stats"])
+
     @abstractmethod
-    def calculate_revenues(self) -> List[float]:
-        """Generate a list of total revenues over time or scenarios."""
+    def calculate_revenues(self) -> np.ndarray:
+        """Generate a float64 array of total revenues over time or scenarios."""
         pass
 
     @abstractmethod
-    def calculate_immediate_revenues(self) -> List[float]:
+    def calculate_immediate_revenues(self) -> np.ndarray:
         """Calculate the immediate revenues over time or scenarios."""
         pass
 
     @abstractmethod
-    def calculate_reserve_revenues(self) -> List[float]:
+    def calculate_reserve_revenues(self) -> np.ndarray:
         """Calculate the reserve revenues over time or scenarios."""
         pass
 
     @abstractmethod
-    def calculate_tokens_to_be_locked(self) -> List[float]:
+    def calculate_tokens_to_be_locked(self) -> np.ndarray:
         """Calculate the number of tokens to be locked over time or scenarios."""
         pass
 
 
 class CostSource(ABC):
     @abstractmethod
-    def calculate_costs(self) -> List[float]:
-        """Generate a list of costs over time or scenarios."""
+    def calculate_costs(self) -> np.ndarray:
+        """Generate a float64 array of costs over time or scenarios."""
         pass
 
 
@@ -36,7 +107,7 @@ class FinancialCalculator:
     def __init__(self):
         self.revenue_sources: List[RevenueSource] = []
         self.cost_sources: List[CostSource] = []
-        self.tokens_locked_history: List[float] = []
+        self.tokens_locked_history: np.ndarray = np.zeros(0)
 
     def add_revenue_source(self, source: RevenueSource):
         """Adds a new revenue source to the calculator."""
@@ -46,104 +117,162 @@ class FinancialCalculator:
         """Adds a new cost source to the calculator."""
         self.cost_sources.append(source)
 
-    def total_revenues(self) -> List[float]:
-        """Calculates and returns the total revenues from all sources across all periods."""
-        if not self.revenue_sources:
-            return []
-
-        total = [0] * len(self.revenue_sources[0].calculate_revenues())
+    @property
+    def cache_stats(self) -> Dict[str, int]:
+        """Cache hit and miss counters summed over all revenue sources."""
+        stats = {"hits": 0, "misses": 0}
         for source in self.revenue_sources:
-            revenues = source.calculate_revenues()
-            total = [t + r for t, r in zip(total, revenues)]
-        return total
+            for key, count in source.cache_stats.items():
+                stats[key] += count
+        return stats
+
+    def revenue_matrix(self, series: str = "revenues") -> np.ndarray:
+        """Stacks one series of every revenue source into a (sources, periods) matrix.
+
+        Sources fed (scenarios, months) inputs stack into (sources, scenarios,
+        periods); sources with 1-D inputs broadcast across the scenarios.
+
+        `series` names a `calculate_*` method, e.g. "revenues",
+        "immediate_revenues", "reserve_revenues" or "tokens_to_be_locked".
+        """
+        return _stack_series(
+            [
+                getattr(source, f"calculate_{series}")()
+                for source in self.revenue_sources
+            ]
+        )
 
-    def total_immediate_revenues(self) -> List[float]:
-        """Calculates and returns the total immediate revenues from all sources across all periods."""
-        if not self.revenue_sources:
-            return []
+    def cost_matrix(self) -> np.ndarray:
+        """Stacks the costs of every cost source into a (sources, periods) matrix."""
+        return _stack_series([source.calculate_costs() for source in self.cost_sources])
 
-        total = [0] * len(self.revenue_sources[0].calculate_immediate_revenues())
-        for source in self.revenue_sources:
-            immediate_revenues = source.calculate_immediate_revenues()
-            total = [t + ir for t, ir in zip(total, immediate_revenues)]
-        return total
+    def total_revenues(self) -> np.ndarray:
+        """Calculates and returns the total revenues from all sources across all periods."""
+        return self.revenue_matrix("revenues").sum(axis=0)
 
-    def total_reserve_revenues(self) -> List[float]:
-        """Calculates and returns the total reserve revenues from all sources across all periods."""
-        if not self.revenue_sources:
-            return []
+    def total_immediate_revenues(self) -> np.ndarray:
+        """Calculates and returns the total immediate revenues from all sources across all periods."""
+        return self.revenue_matrix("immediate_revenues").sum(axis=0)
 
-        total = [0] * len(self.revenue_sources[0].calculate_reserve_revenues())
-        for source in self.revenue_sources:
-            reserve_revenues = source.calculate_reserve_revenues()
-            total = [t + rr for t, rr in zip(total, reserve_revenues)]
-        return total
+    def total_reserve_revenues(self) -> np.ndarray:
+        """Calculates and returns the total reserve revenues from all sources across all periods."""
+        return self.revenue_matrix("reserve_revenues").sum(axis=0)
 
-    def total_tokens_locked(self) -> List[float]:
+    def total_tokens_locked(self) -> np.ndarray:
         """Calculates and returns the total tokens to be locked from all sources across all periods."""
-        if not self.revenue_sources:
-            return []
-
-        total = [0] * len(self.revenue_sources[0].calculate_tokens_to_be_locked())
-        for source in self.revenue_sources:
-            tokens = source.calculate_tokens_to_be_locked()
-            total = [t + tk for t, tk in zip(total, tokens)]
-        return total
+        return self.revenue_matrix("tokens_to_be_locked").sum(axis=0)
 
-    def total_costs(self) -> List[float]:
+    def total_costs(self) -> np.ndarray:
         """Calculates and returns the total costs from all sources across all periods."""
-        if not self.cost_sources:
-            return []
+        return self.cost_matrix().sum(axis=0)
 
-        total = [0] * len(self.cost_sources[0].calculate_costs())
-        for source in self.cost_sources:
-            costs = source.calculate_costs()
-            total = [t + c for t, c in zip(total, costs)]
-        return total
-
-    def net_earnings(self) -> List[float]:
+    def net_earnings(self) -> np.ndarray:
         """Calculates and returns the net earnings (revenue minus costs) across all periods."""
         revenues = self.total_revenues()
         costs = self.total_costs()
-        return [r - c for r, c in zip(revenues, costs)]
+        length = min(revenues.shape[-1], costs.shape[-1])
+        return revenues[..., :length] - costs[..., :length]
 
-    def tokens_to_be_unlocked(self) -> List[float]:
-        """Calculates and returns the tokens to be unlocked over time."""
-        all_tokens_to_be_unlocked = []
-        for source in self.revenue_sources:
-            tokens_locked = source.calculate_tokens_to_be_locked()
-            unlocking_duration = source.locking_duration
-            tokens_unlocked = compute_tokens_to_be_unlocked(
-                tokens_locked, unlocking_duration
-            )
-            all_tokens_to_be_unlocked = (
-                [sum(x) for x in zip(all_tokens_to_be_unlocked, tokens_unlocked)]
-                if all_tokens_to_be_unlocked
-                else tokens_unlocked
-            )
-        return all_tokens_to_be_unlocked
+    def tokens_to_be_unlocked(self) -> np.ndarray:
+        """Calculates and returns the tokens to be unlocked over time.
 
-    def compute_locked_tokens_history(self) -> List[float]:
+        All sources are scheduled in a single prefix-sum pass, whatever their
+        locking durations. The result stops at the shortest source horizon.
+        """
+        if not self.revenue_sources:
+            return np.zeros(0)
+        locks = [
+            (as_series(source.calculate_tokens_to_be_locked()), source.locking_duration)
+            for source in self.revenue_sources
+        ]
+        scenarios = np.broadcast_shapes(*(tokens.shape[:-1] for tokens, _ in locks))
+        positions = np.concatenate([np.arange(tokens.shape[-1]) for tokens, _ in locks])
+        amounts = np.concatenate(
+            [
+                np.broadcast_to(tokens, scenarios + tokens.shape[-1:])
+                for tokens, _ in locks
+            ],
+            axis=-1,
+        )
+        durations = np.concatenate(
+            [np.full(tokens.shape[-1], duration) for tokens, duration in locks]
+        )
+        length = min(tokens.shape[-1] + duration for tokens, duration in locks)
+        return _schedule_unlocks(positions, amounts, durations, length)
+
+    def compute_locked_tokens_history(self) -> np.ndarray:
         tokens_locked = self.total_tokens_locked()
         tokens_unlocked = self.tokens_to_be_unlocked()
-        locked_tokens_history = []
-        current_locked = 0
-        for locked, unlocked in zip(tokens_locked, tokens_unlocked):
-            current_locked = current_locked + locked - unlocked
-            locked_tokens_history.append(current_locked)
+        length = min(tokens_locked.shape[-1], tokens_unlocked.shape[-1])
+        locked_tokens_history = np.cumsum(
+            tokens_locked[..., :length] - tokens_unlocked[..., :length], axis=-1
+        )
         self.tokens_locked_history = locked_tokens_history
         return locked_tokens_history
 
 
+def as_series(values) -> np.ndarray:
+    """Compatibility shim: converts a source's output (list or array) to a float64 array."""
+    return np.asarray(values, dtype=np.float64)
+
+
+def _aligned(*series) -> List[np.ndarray]:
+    """Converts series to arrays truncated to the shortest one, as `zip` did for lists."""
+    arrays = [as_series(values) for values in series]
+    length = min(array.shape[-1] for array in arrays)
+    return [array[..., :length] for array in arrays]
+
+
+def _stack_series(series: List) -> np.ndarray:
+    """Stacks series on a new leading axis, truncated to the shortest one.
+
+    Leading scenario axes must broadcast against each other; a ValueError is
+    raised otherwise.
+    """
+    if not series:
+        return np.zeros((0, 0))
+    arrays = [as_series(values) for values in series]
+    length = min(array.shape[-1] for array in arrays)
+    scenarios = np.broadcast_shapes(*(array.shape[:-1] for array in arrays))
+    return np.stack(
+        [
+            np.broadcast_to(array[..., :length], scenarios + (length,))
+            for array in arrays
+        ]
+    )
+
+
 def compute_tokens_to_be_unlocked(
-    tokens_to_be_locked: List[float], locking_duration: int
-) -> List[float]:
-    tokens_to_be_unlocked = [0] * (locking_duration + len(tokens_to_be_locked))
-    for i, token in enumerate(tokens_to_be_locked):
-        monthly_unlock = token / locking_duration
-        for month in range(locking_duration):
-            tokens_to_be_unlocked[i + month] += monthly_unlock
-    return tokens_to_be_unlocked
+    tokens_to_be_locked: List[float], locking_duration: Union[int, Sequence[int]]
+) -> np.ndarray:
+    """Spreads each lock evenly over its locking duration, starting the month it is locked.
+
+    `locking_duration` is either one duration for every lock or one per lock.
+    Locks may carry leading scenario axes, e.g. (scenarios, months).
+    Runs in O(n + d) with a difference array and a cumulative sum.
+    """
+    amounts = as_series(tokens_to_be_locked)
+    n_locks = amounts.shape[-1]
+    durations = np.broadcast_to(np.asarray(locking_duration, dtype=np.int64), n_locks)
+    length = n_locks + int(np.max(locking_duration, initial=0))
+    return _schedule_unlocks(np.arange(n_locks), amounts, durations, length)
+
+
+def stack_scenarios(data: Dict[str, Sequence[float]], scenarios: Sequence[str]):
+    """Stacks named scenario curves (e.g. `revenue_data`) into a (scenarios, months) array."""
+    return np.stack([as_series(data[scenario]) for scenario in scenarios])
+
+
+def _schedule_unlocks(
+    positions: np.ndarray, amounts: np.ndarray, durations: np.ndarray, length: int
+) -> np.ndarray:
+    """Sums `amounts[..., i] / durations[i]` over months [positions[i], positions[i] + durations[i])."""
+    monthly_unlock = np.moveaxis(amounts / durations, -1, 0)
+    size = max(length, int((positions + durations).max(initial=0)))
+    steps = np.zeros((size + 1,) + amounts.shape[:-1])
+    np.add.at(steps, positions, monthly_unlock)
+    np.add.at(steps, positions + durations, -monthly_unlock)
+    return np.moveaxis(np.cumsum(steps, axis=0)[:length], 0, -1)
 
 
 class MonthlyCost(CostSource):
@@ -155,6 +284,20 @@ class MonthlyCost(CostSource):
 
 
 class BaseRevenue(RevenueSource, ABC):
+    cache_dependencies = {
+        "calculate_revenues": ("units", "unit_price"),
+        "calculate_immediate_revenues": (
+            "calculate_revenues",
+            "proportion_immediate",
+        ),
+        "calculate_reserve_revenues": ("calculate_revenues", "proportion_immediate"),
+        "calculate_tokens_to_be_locked": (
+            "calculate_immediate_revenues",
+            "token_price",
+            "locking_duration",
+        ),
+    }
+
     def __init__(
         self,
         units: List[int],
@@ -166,30 +309,29 @@ class BaseRevenue(RevenueSource, ABC):
         self.units = units
         self.unit_price = unit_price
         self.proportion_immediate = proportion_immediate
-        self.token_price = token_price or [1.0] * len(units)
+        self.token_price = (
+            np.ones_like(as_series(units)) if token_price is None else token_price
+        )
         self.locking_duration = locking_duration
 
-    def calculate_revenues(self) -> List[float]:
-        return [float(unit * self.unit_price) for unit in self.units]
+    @cached_series
+    def calculate_revenues(self) -> np.ndarray:
+        return as_series(self.units) * self.unit_price
 
-    def calculate_immediate_revenues(self) -> List[float]:
-        return [
-            float(revenue * self.proportion_immediate)
-            for revenue in self.calculate_revenues()
-        ]
+    @cached_series
+    def calculate_immediate_revenues(self) -> np.ndarray:
+        return self.calculate_revenues() * self.proportion_immediate
 
-    def calculate_reserve_revenues(self) -> List[float]:
-        return [
-            float(revenue * (1 - self.proportion_immediate))
-            for revenue in self.calculate_revenues()
-        ]
+    @cached_series
+    def calculate_reserve_revenues(self) -> np.ndarray:
+        return self.calculate_revenues() * (1 - self.proportion_immediate)
 
-    def calculate_tokens_to_be_locked(self) -> List[float]:
-        immediate_revenues = self.calculate_immediate_revenues()
-        return [
-            float(ir / token_price / self.locking_duration)
-            for ir, token_price in zip(immediate_revenues, self.token_price)
-        ]
+    @cached_series
+    def calculate_tokens_to_be_locked(self) -> np.ndarray:
+        immediate_revenues, token_price = _aligned(
+            self.calculate_immediate_revenues(), self.token_price
+        )
+        return immediate_revenues / token_price / self.locking_duration
 
 
 class LicenseRevenue(BaseRevenue):
@@ -235,6 +377,24 @@ class MessageRevenue(BaseRevenue):
 
 
 class ServicesRevenue(BaseRevenue):
+    cache_dependencies = {
+        **BaseRevenue.cache_dependencies,
+        "calculate_revenues": (
+            "units",
+            "ping_wifi_proportion",
+            "instant_data_consult_proportion",
+            "data_storage_proportion",
+            "wifi_price",
+            "data_consult_price",
+            "data_storage_price",
+            "wifi_cost",
+            "data_consult_cost",
+            "data_storage_cost",
+        ),
+        "calculate_immediate_revenues": ("units",),
+        "calculate_reserve_revenues": ("calculate_revenues",),
+    }
+
     def __init__(
         self,
         objects: List[int],
@@ -263,32 +423,43 @@ class ServicesRevenue(BaseRevenue):
         self.data_consult_cost = data_consult_cost
         self.data_storage_cost = data_storage_cost
 
-    def calculate_revenues(self) -> List[float]:
-        revenue_wifi = [
-            obj * prop * (self.wifi_price - self.wifi_cost)
-            for obj, prop in zip(self.units, self.ping_wifi_proportion)
-        ]
-        revenue_data_consult = [
-            obj * prop * (self.data_consult_price - self.data_consult_cost)
-            for obj, prop in zip(self.units, self.instant_data_consult_proportion)
-        ]
-        revenue_data_storage = [
-            obj * prop * (self.data_storage_price - self.data_storage_cost)
-            for obj, prop in zip(self.units, self.data_storage_proportion)
-        ]
-        return [
-            w + c + s
-            for w, c, s in zip(revenue_wifi, revenue_data_consult, revenue_data_storage)
-        ]
+    @cached_series
+    def calculate_revenues(self) -> np.ndarray:
+        objects, ping_wifi, data_consult, data_storage = _aligned(
+            self.units,
+            self.ping_wifi_proportion,
+            self.instant_data_consult_proportion,
+            self.data_storage_proportion,
+        )
+        revenue_wifi = objects * ping_wifi * (self.wifi_price - self.wifi_cost)
+        revenue_data_consult = (
+            objects * data_consult * (self.data_consult_price - self.data_consult_cost)
+        )
+        revenue_data_storage = (
+            objects * data_storage * (self.data_storage_price - self.data_storage_cost)
+        )
+        return revenue_wifi + revenue_data_consult + revenue_data_storage
 
-    def calculate_immediate_revenues(self) -> List[float]:
-        return [0.0] * len(self.units)
+    @cached_series
+    def calculate_immediate_revenues(self) -> np.ndarray:
+        return np.zeros_like(as_series(self.units))
 
-    def calculate_reserve_revenues(self) -> List[float]:
+    @cached_series
+    def calculate_reserve_revenues(self) -> np.ndarray:
         return self.calculate_revenues()
 
 
 class NetworkRevenue(BaseRevenue):
+    cache_dependencies = {
+        "calculate_revenues": ("revenues",),
+        "calculate_immediate_revenues": ("revenues", "proportion_immediate"),
+        "calculate_reserve_revenues": ("revenues", "proportion_immediate"),
+        "calculate_tokens_to_be_locked": (
+            "calculate_immediate_revenues",
+            "token_price",
+        ),
+    }
+
     def __init__(
         self,
         light_objects: List[int],
@@ -309,47 +480,38 @@ class NetworkRevenue(BaseRevenue):
         self.proportion_immediate = proportion_immediate
         self.locking_duration = 12
 
-        self.light_revenue = [
-            float(obj * (light_price - light_cost)) for obj in light_objects
-        ]
-        self.silver_revenue = [
-            float(obj * (silver_price - silver_cost)) for obj in silver_objects
-        ]
-        self.gold_revenue = [
-            float(obj * (gold_price - gold_cost)) for obj in gold_objects
-        ]
-        self.premium_revenue = [
-            float(obj * (premium_price - premium_cost)) for obj in premium_objects
-        ]
+        self.light_revenue = as_series(light_objects) * (light_price - light_cost)
+        self.silver_revenue = as_series(silver_objects) * (silver_price - silver_cost)
+        self.gold_revenue = as_series(gold_objects) * (gold_price - gold_cost)
+        self.premium_revenue = as_series(premium_objects) * (
+            premium_price - premium_cost
+        )
 
-        self.revenues = [
-            l + s + g + p
-            for l, s, g, p in zip(
+        self.revenues = sum(
+            _aligned(
                 self.light_revenue,
                 self.silver_revenue,
                 self.gold_revenue,
                 self.premium_revenue,
             )
-        ]
-        self.unit_price = (
-            sum(self.revenues) / len(self.revenues) if self.revenues else 0.0
         )
+        self.unit_price = float(self.revenues.mean()) if self.revenues.size else 0.0
 
-    def calculate_revenues(self) -> List[float]:
+    @cached_series
+    def calculate_revenues(self) -> np.ndarray:
         return self.revenues
 
-    def calculate_immediate_revenues(self) -> List[float]:
-        return [float(revenue * self.proportion_immediate) for revenue in self.revenues]
+    @cached_series
+    def calculate_immediate_revenues(self) -> np.ndarray:
+        return self.revenues * self.proportion_immediate
 
-    def calculate_reserve_revenues(self) -> List[float]:
-        return [
-            float(revenue * (1 - self.proportion_immediate))
-            for revenue in self.revenues
-        ]
+    @cached_series
+    def calculate_reserve_revenues(self) -> np.ndarray:
+        return self.revenues * (1 - self.proportion_immediate)
 
-    def calculate_tokens_to_be_locked(self) -> List[float]:
-        immediate_revenues = self.calculate_immediate_revenues()
-        return [
-            float(ir / token_price)
-            for ir, token_price in zip(immediate_revenues, self.token_price)
-        ]
+    @cached_series
+    def calculate_tokens_to_be_locked(self) -> np.ndarray:
+        immediate_revenues, token_price = _aligned(
+            self.calculate_immediate_revenues(), self.token_price
+        )
+        return immediate_revenues / token_price
@@ -0,0 +1,374 @@
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List
+
+import numpy as np
+import pandas as pd
+
+from ICO_distribution import ICOOrchestrator, release_matrix
+from minting_engine import LOCKING_MONTHS
+from result_cache import content_hash
+from simulation_stages import (
+    compute_staking_data,
+    compute_sustainable_aprs,
+    simulate_debt,
+    simulate_minting,
+)
+
+
+@dataclass
+class Stage:
+    """A pipeline step: `func` is called with `inputs` as keyword arguments.
+
+    A stage with several `outputs` returns them as a tuple, in order.
+    """
+
+    name: str
+    func: Callable
+    inputs: List[str]
+    outputs: List[str]
+
+
+class SimulationPipeline:
+    """Lazily evaluated DAG of stages with dirty tracking.
+
+    Parameters and stage outputs are versioned by a counter that only moves
+    when their content hash changes. A stage re-runs when one of its inputs
+    has a newer version than the one it last ran with, and an output that
+    comes out identical keeps its version, so stages further down are not
+    re-run. Values are computed on demand by `get`, whatever order they are
+    requested in.
+    """
+
+    def __init__(self, stages: List[Stage], **parameters):
+        self.stages = {stage.name: stage for stage in stages}
+        self._producers = {}
+        for stage in stages:
+            for output in stage.outputs:
+                if output in self._producers:
+                    raise ValueError(f"{output} is produced by two stages")
+                self._producers[output] = stage
+        self._check_acyclic()
+        self._values: Dict[str, Any] = {}
+        self._hashes: Dict[str, str] = {}
+        self._versions: Dict[str, int] = {}
+        self._input_versions: Dict[str, tuple] = {}
+        self._clock = 0
+        self.run_counts = {stage.name: 0 for stage in stages}
+        self.set(**parameters)
+
+    def _check_acyclic(self):
+        visiting, done = set(), set()
+
+        def visit(stage):
+            if stage.name in done:
+                return
+            if stage.name in visiting:
+                raise ValueError(f"Stage {stage.name} depends on itself")
+            visiting.add(stage.name)
+            for name in stage.inputs:
+                if name in self._producers:
+                    visit(self._producers[name])
+            visiting.discard(stage.name)
+            done.add(stage.name)
+
+        for stage in self.stages.values():
+            visit(stage)
+
+    def _store(self, name: str, value, digest: str):
+        self._clock += 1
+        self._values[name] = value
+        self._hashes[name] = digest
+        self._versions[name] = self._clock
+
+    def set(self, **parameters):
+        """Updates parameters; only those whose content changed invalidate stages."""
+        for name, value in parameters.items():
+            if name in self._producers:
+                raise ValueError(
+                    f"{name} is an output of stage {self._producers[name].name}"
+                )
+            digest = content_hash(value)
+            if self._hashes.get(name) != digest:
+                self._store(name, value, digest)
+
+    def get(self, name: str):
+        """Returns a parameter or stage output, running the stages it depends on if needed."""
+        if name in self._producers:
+            self._refresh(self._producers[name])
+        elif name not in self._values:
+            raise KeyError(f"No parameter or stage output named {name}")
+        return self._values[name]
+
+    def _refresh(self, stage: Stage):
+        for name in stage.inputs:
+            self.get(name)
+        versions = tuple(self._versions[name] for name in stage.inputs)
+        if self._input_versions.get(stage.name) == versions:
+            return
+        result = stage.func(**{name: self._values[name] for name in stage.inputs})
+        results = result if len(stage.outputs) > 1 else (result,)
+        for output, value in zip(stage.outputs, results):
+            digest = content_hash(value)
+            if self._hashes.get(output) != digest:
+                self._store(output, value, digest)
+        self._input_versions[stage.name] = versions
+        self.run_counts[stage.name] += 1
+
+    def dirty_stages(self) -> List[str]:
+        """Stages that have never run or may re-run because an upstream value changed."""
+        dirty = {}
+
+        def is_dirty(stage):
+            if stage.name not in dirty:
+                last_versions = self._input_versions.get(stage.name)
+                dirty[stage.name] = (
+                    last_versions is None
+                    or any(
+                        is_dirty(self._producers[name])
+                        for name in stage.inputs
+                        if name in self._producers
+                    )
+                    or last_versions
+                    != tuple(self._versions.get(name) for name in stage.inputs)
+                )
+            return dirty[stage.name]
+
+        return [name for name, stage in self.stages.items() if is_dirty(stage)]
+
+
+class IncrementalOrchestrator:
+    """Stage keeping one ICOOrchestrator across runs.
+
+    Each run applies only the rows of `participants` that were added, changed
+    or removed since the previous run; the orchestrator is rebuilt only when
+    the total supply or listing price changes.
+    """
+
+    def __init__(self):
+        self.orchestrator = None
+        self.last_changes = None
+
+    def __call__(
+        self, participants: pd.DataFrame, total_supply: float, listing_price: float
+    ) -> ICOOrchestrator:
+        if self.orchestrator is None or (
+            self.orchestrator.total_supply,
+            self.orchestrator.listing_price,
+        ) != (total_supply, listing_price):
+            self.orchestrator = ICOOrchestrator(
+                total_supply=total_supply, listing_price=listing_price
+            )
+        self.last_changes = self.orchestrator.update_participants(participants)
+        return self.orchestrator
+
+
+class IncrementalParticipantTables:
+    """Stage keeping the participants' distribution table across runs.
+
+    Columns whose vesting schedule is unchanged are copied from the previous
+    table; only added or edited participants are computed. Orchestrators
+    with a beneficiary registry are rebuilt in full.
+    """
+
+    def __init__(self):
+        self.distribution = None
+        self.columns = {}  # schedule -> its column in `distribution`
+
+    def __call__(self, orchestrator: ICOOrchestrator):
+        participants = orchestrator.participants
+        if self.distribution is None or orchestrator.beneficiaries is not None:
+            distribution = orchestrator.create_participants_distribution_dataframe()
+        else:
+            schedules = [p.schedule for p in participants]
+            previous = self.distribution.to_numpy()
+            horizon = max((s.horizon for s in schedules), default=0)
+            matrix = np.zeros((horizon, len(schedules)))
+            reused = [i for i, s in enumerate(schedules) if s in self.columns]
+            new = [i for i, s in enumerate(schedules) if s not in self.columns]
+            # Every reused column is zero past its own horizon, so truncating
+            # or padding the previous rows keeps it intact.
+            rows = min(horizon, len(previous))
+            matrix[:rows, reused] = previous[
+                :rows, [self.columns[schedules[i]] for i in reused]
+            ]
+            matrix[:, new] = release_matrix([schedules[i] for i in new], horizon)
+            distribution = pd.DataFrame(
+                matrix, columns=[p.description for p in participants]
+            )
+        self.distribution = distribution
+        self.columns = {p.schedule: i for i, p in enumerate(participants)}
+        return orchestrator.create_participants_financial_dataframe(), distribution
+
+
+def _monthly_release_tokens(
+    orchestrator: ICOOrchestrator, columns_to_exclude: List[str]
+) -> pd.Series:
+    return pd.Series(orchestrator.monthly_release_totals(columns_to_exclude))
+
+
+def _initial_staking_pool(participants: pd.DataFrame, total_supply: float) -> float:
+    return (
+        participants[participants["description"] == "Staking"]["percent_of_tot_supply"]
+        * total_supply
+        / 100
+    ).values[0]
+
+
+def _staking_data(
+    debt, revenue, scenarios, yearly_target_apr, initial_ioty, initial_staking_pool
+) -> Dict[str, pd.DataFrame]:
+    return {
+        scenario: compute_staking_data(
+            debt,
+            revenue,
+            scenario,
+            yearly_target_apr,
+            initial_ioty,
+            initial_staking_pool,
+        )
+        for scenario in scenarios
+    }
+
+
+def _sustainable_aprs(
+    debt, revenue, scenarios, initial_ioty, initial_staking_pool
+) -> List[float]:
+    return compute_sustainable_aprs(
+        debt, revenue, scenarios, initial_ioty, initial_staking_pool
+    )
+
+
+def _minting(
+    revenue,
+    scenarios,
+    debt,
+    staking_data,
+    minting_staking_scenario,
+    emission_rate,
+    ratios,
+    initial_pool_tokens,
+    locking_months,
+):
+    return simulate_minting(
+        revenue,
+        scenarios,
+        debt["token_price"],
+        staking_data[minting_staking_scenario]["incentive_for_stakers_0"],
+        emission_rate,
+        ratios,
+        initial_pool_tokens,
+        locking_months,
+    )
+
+
+def ioty_stages() -> List[Stage]:
+    """Stages of the app's simulation, with a fresh incremental orchestrator."""
+    return [
+        Stage(
+            "orchestrator",
+            IncrementalOrchestrator(),
+            ["participants", "total_supply", "listing_price"],
+            ["orchestrator"],
+        ),
+        Stage(
+            "participant_tables",
+            IncrementalParticipantTables(),
+            ["orchestrator"],
+            ["financial_table", "vesting_schedule"],
+        ),
+        Stage(
+            "monthly_release_tokens",
+            _monthly_release_tokens,
+            ["orchestrator", "columns_to_exclude"],
+            ["monthly_release_tokens"],
+        ),
+        Stage(
+            "debt",
+            simulate_debt,
+            [
+                "monthly_release_tokens",
+                "listing_price",
+                "initial_ioty",
+                "average_selling_order",
+                "max_price_impact",
+                "with_mitigation",
+            ],
+            ["debt"],
+        ),
+        Stage(
+            "initial_staking_pool",
+            _initial_staking_pool,
+            ["participants", "total_supply"],
+            ["initial_staking_pool"],
+        ),
+        Stage(
+            "staking",
+            _staking_data,
+            [
+                "debt",
+                "revenue",
+                "scenarios",
+                "yearly_target_apr",
+                "initial_ioty",
+                "initial_staking_pool",
+            ],
+            ["staking_data"],
+        ),
+        Stage(
+            "sustainable_aprs",
+            _sustainable_aprs,
+            [
+                "debt",
+                "revenue",
+                "scenarios",
+                "initial_ioty",
+                "initial_staking_pool",
+            ],
+            ["sustainable_aprs"],
+        ),
+        Stage(
+            "minting",
+            _minting,
+            [
+                "revenue",
+                "scenarios",
+                "debt",
+                "staking_data",
+                "minting_staking_scenario",
+                "emission_rate",
+                "ratios",
+                "initial_pool_tokens",
+                "locking_months",
+            ],
+            ["minting"],
+        ),
+    ]
+
+
+def build_ioty_pipeline(**parameters) -> SimulationPipeline:
+    """Builds the participants -> vesting -> debt -> staking -> minting pipeline.
+
+    Parameters not given take the app's default values.
+    """
+    defaults = dict(
+        total_supply=3_000_000_000,
+        listing_price=0.03,
+        initial_ioty=300_000_000,
+        average_selling_order=10_000.0,
+        max_price_impact=-0.0002,
+        with_mitigation=True,
+        columns_to_exclude=["Liquidity", "Treasury/community", "Staking"],
+        scenarios=["pessimistic", "moderate", "optimistic"],
+        yearly_target_apr=0.2,
+        minting_staking_scenario="optimistic",
+        emission_rate=0.1,
+        ratios={"Treasury": 0.2, "Staking": 0.4, "Minting": 0.4},
+        initial_pool_tokens={
+            "Treasury": 3_000_000_000 * 0.15,
+            "Staking": 3_000_000_000 * 0.3,
+            "Minting": 3_000_000_000 * 0.15,
+        },
+        locking_months=LOCKING_MONTHS,
+    )
+    defaults.update(parameters)
+    return SimulationPipeline(ioty_stages(), **defaults)
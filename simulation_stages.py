@@ -0,0 +1,113 @@
+import os
+from typing import Dict, List, Sequence
+
+import pandas as pd
+
+from Liquidity_pool import LiquidityPool
+from minting_engine import (
+    LOCKING_MONTHS,
+    MintingSimulationResult,
+    run_minting_simulation,
+)
+from result_cache import ResultCache
+from staking import StakingCalculator, SustainableAprSolver
+from vesting_simulation import TokenEconomySimulator
+
+# Shared by every stage and every session of the server; results are keyed on
+# the content of the stage inputs. Setting IOTY_RESULT_CACHE_DIR also keeps
+# them on disk, shared between server processes and restarts.
+stage_cache = ResultCache(directory=os.environ.get("IOTY_RESULT_CACHE_DIR"))
+
+
+@stage_cache.memoize
+def simulate_debt(
+    monthly_release_tokens: pd.Series,
+    listing_price: float,
+    initial_ioty: float,
+    average_selling_order: float,
+    max_price_impact: float,
+    with_mitigation: bool,
+) -> pd.DataFrame:
+    """Sells `monthly_release_tokens` into a fresh pool listed at `listing_price`."""
+    simulator = TokenEconomySimulator.from_release_tokens(
+        monthly_release_tokens,
+        LiquidityPool(initial_ioty * listing_price, initial_ioty),
+    )
+    return pd.DataFrame(
+        simulator.run_vesting_simulation(
+            average_selling_order,
+            max_price_impact,
+            with_mitigation=with_mitigation,
+            batched=True,
+        )
+    )
+
+
+@stage_cache.memoize
+def compute_staking_data(
+    debt: pd.DataFrame,
+    revenue: pd.DataFrame,
+    scenario: str,
+    yearly_target_apr: float,
+    total_supply: float,
+    initial_staking_pool: float,
+    proportion_of_tokens_to_be_staked: float = 1,
+) -> pd.DataFrame:
+    """Runs `compute_incentive_for_stakers` for one revenue scenario."""
+    calculator = StakingCalculator(
+        debt["usdcs_to_buy"],
+        revenue[scenario],
+        debt["token_price"],
+        yearly_target_apr,
+    )
+    return calculator.compute_incentive_for_stakers(
+        proportion_of_tokens_to_be_staked, total_supply, initial_staking_pool
+    )
+
+
+@stage_cache.memoize
+def compute_sustainable_aprs(
+    debt: pd.DataFrame,
+    revenue: pd.DataFrame,
+    scenarios: Sequence[str],
+    total_supply: float,
+    initial_staking_pool: float,
+    proportion_of_tokens_to_be_staked: float = 1,
+) -> List[float]:
+    """Highest APR keeping the staking pool non-negative, per revenue scenario."""
+    solver = SustainableAprSolver(
+        StakingCalculator(
+            debt["usdcs_to_buy"],
+            revenue[list(scenarios)].T.to_numpy(),
+            debt["token_price"],
+            0.0,  # the solver searches the APR; the calculator's own is unused
+        ),
+        proportion_of_tokens_to_be_staked,
+        total_supply,
+        initial_staking_pool,
+    )
+    return list(solver.solve())
+
+
+@stage_cache.memoize
+def simulate_minting(
+    revenue: pd.DataFrame,
+    scenarios: Sequence[str],
+    token_price: pd.Series,
+    staking_emission: pd.Series,
+    emission_rate: float,
+    ratios: Dict[str, float],
+    initial_tokens: Dict[str, float],
+    locking_months: int = LOCKING_MONTHS,
+) -> MintingSimulationResult:
+    """Runs `run_minting_simulation` for the given scenarios."""
+    return run_minting_simulation(
+        revenue,
+        scenarios,
+        token_price,
+        staking_emission,
+        emission_rate,
+        ratios,
+        initial_tokens,
+        locking_months=locking_months,
+    )
@@ -1,5 +1,4 @@
-from itertools import accumulate
-
+import numpy as np
 import pandas as pd
 
 
@@ -13,43 +12,226 @@ class StakingCalculator:
         self.yearly_target_apr = yearly_target_apr
 
     def compute_tokens_to_be_staked(self, proportion_of_tokens_to_be_staked):
-        earnings = [r - d for r, d in zip(self.revenue, self.debt_usd)]
-        earning_in_tokens = [e / p for e, p in zip(earnings, self.token_price)]
-        tokens_to_buy = [-e for e in earning_in_tokens]
-        tokens_to_be_staked_inflationary = [
-            t * proportion_of_tokens_to_be_staked if t > 0 else 0 for t in tokens_to_buy
-        ]
-        tokens_to_be_bought_aligned = [
-            -t * proportion_of_tokens_to_be_staked if t < 0 else 0
-            for t in tokens_to_buy
-        ]
+        revenue = np.asarray(self.revenue, dtype=float)
+        debt_usd = np.asarray(self.debt_usd, dtype=float)
+        token_price = np.asarray(self.token_price, dtype=float)
+        length = min(revenue.shape[-1], debt_usd.shape[-1], token_price.shape[-1])
+        earnings = revenue[..., :length] - debt_usd[..., :length]
+        tokens_to_buy = -earnings / token_price[..., :length]
+        tokens_to_be_staked_inflationary = (
+            np.maximum(tokens_to_buy, 0) * proportion_of_tokens_to_be_staked
+        )
+        tokens_to_be_bought_aligned = (
+            np.maximum(-tokens_to_buy, 0) * proportion_of_tokens_to_be_staked
+        )
         return tokens_to_be_staked_inflationary, tokens_to_be_bought_aligned
 
-    def compute_incentive_for_stakers(
-        self, proportion_of_tokens_to_be_staked, total_supply, initial_staking_pool
+    def compute_incentive_series(
+        self,
+        proportion_of_tokens_to_be_staked,
+        total_supply,
+        initial_staking_pool,
+        yearly_target_apr=None,
+        compounding_depth: int = 5,
     ):
-        monthly_target_apr = self.yearly_target_apr / 12
+        """Computes the staking series for one or many APRs at once.
+
+        `yearly_target_apr` defaults to the calculator's APR and may be an
+        array; the results then gain its shape as leading axes, in front of
+        any scenario axes of the inputs. Compounding to `compounding_depth`
+        is the geometric sum incentive * (1 + a + ... + a**depth) with a the
+        monthly APR, and the staking pool is a cumulative sum.
+        """
+        if yearly_target_apr is None:
+            yearly_target_apr = self.yearly_target_apr
         tokens_to_be_staked_inflationary, tokens_to_be_bought_aligned = (
             self.compute_tokens_to_be_staked(proportion_of_tokens_to_be_staked)
         )
-        incentive_for_stakers = list(
-            accumulate(t * monthly_target_apr for t in tokens_to_be_staked_inflationary)
+        yearly_target_apr = np.asarray(yearly_target_apr, dtype=float)
+        yearly_target_apr = yearly_target_apr.reshape(
+            yearly_target_apr.shape + (1,) * tokens_to_be_staked_inflationary.ndim
+        )
+        return _incentive_series(
+            tokens_to_be_staked_inflationary,
+            tokens_to_be_bought_aligned,
+            yearly_target_apr,
+            total_supply,
+            initial_staking_pool,
+            compounding_depth,
+        )
+
+    def compute_incentive_for_stakers(
+        self,
+        proportion_of_tokens_to_be_staked,
+        total_supply,
+        initial_staking_pool,
+        compounding_depth: int = 5,
+    ):
+        series = self.compute_incentive_series(
+            proportion_of_tokens_to_be_staked,
+            total_supply,
+            initial_staking_pool,
+            compounding_depth=compounding_depth,
         )
         data = pd.DataFrame()
-        data["incentive_for_stakers_0"] = incentive_for_stakers
-        for i in range(1, 6):
+        data["incentive_for_stakers_0"] = series["incentive_for_stakers_0"]
+        for i in range(1, compounding_depth + 1):
             data[f"incentive_for_stakers_{i}"] = (
-                data[f"incentive_for_stakers_{i-1}"] * monthly_target_apr
+                series["incentive_for_stakers"] * series["monthly_target_apr"] ** i
             )
-            data["incentive_for_stakers_0"] += data[f"incentive_for_stakers_{i}"]
-        staking_pool = [initial_staking_pool - data["incentive_for_stakers_0"][0]]
-        for cumulative_incentive in data["incentive_for_stakers_0"][1:]:
-            new_staking_pool_value = staking_pool[-1] - cumulative_incentive
-            staking_pool.append(new_staking_pool_value)
-        data["tokens_to_be_staked_inflationary"] = (
-            data["incentive_for_stakers_0"] / self.yearly_target_apr
-        )
-        data["percent_staked"] = data["tokens_to_be_staked_inflationary"] / total_supply
-        data["tokens_to_be_bought_aligned"] = tokens_to_be_bought_aligned
-        data["staking_pool"] = staking_pool
+        for column in [
+            "tokens_to_be_staked_inflationary",
+            "percent_staked",
+            "tokens_to_be_bought_aligned",
+            "staking_pool",
+        ]:
+            data[column] = series[column]
         return data
+
+
+def _incentive_series(
+    tokens_to_be_staked_inflationary,
+    tokens_to_be_bought_aligned,
+    yearly_target_apr,
+    total_supply,
+    initial_staking_pool,
+    compounding_depth,
+):
+    """Staking series for an APR array already broadcastable against the token series."""
+    monthly_target_apr = yearly_target_apr / 12
+    incentive_for_stakers = np.cumsum(
+        tokens_to_be_staked_inflationary * monthly_target_apr, axis=-1
+    )
+    compounding = np.divide(
+        1 - monthly_target_apr ** (compounding_depth + 1),
+        1 - monthly_target_apr,
+        out=np.full_like(monthly_target_apr, compounding_depth + 1.0),
+        where=monthly_target_apr != 1,
+    )
+    total_incentive = incentive_for_stakers * compounding
+    with np.errstate(divide="ignore", invalid="ignore"):
+        tokens_staked = total_incentive / yearly_target_apr
+    return {
+        "incentive_for_stakers": incentive_for_stakers,
+        "monthly_target_apr": monthly_target_apr,
+        "incentive_for_stakers_0": total_incentive,
+        "tokens_to_be_staked_inflationary": tokens_staked,
+        "percent_staked": tokens_staked / total_supply,
+        "tokens_to_be_bought_aligned": np.broadcast_to(
+            tokens_to_be_bought_aligned, total_incentive.shape
+        ),
+        "staking_pool": initial_staking_pool - np.cumsum(total_incentive, axis=-1),
+    }
+
+
+class SustainableAprSolver:
+    """Finds, per revenue scenario, the highest APR that keeps the staking pool non-negative.
+
+    The calculator's revenue may be one series or a (scenarios, months) array.
+    The pool shrinks as the APR grows, so the threshold is bracketed with
+    a vectorized grid search run for every scenario at once. The threshold
+    and the evaluations at shared APRs are cached, so repeated queries with
+    other constraints do not recompute the model.
+    """
+
+    def __init__(
+        self,
+        calculator: StakingCalculator,
+        proportion_of_tokens_to_be_staked,
+        total_supply,
+        initial_staking_pool,
+        compounding_depth: int = 5,
+        apr_bounds=(0.0, 1.0),
+        tolerance: float = 1e-6,
+        grid_size: int = 17,
+    ):
+        self.calculator = calculator
+        self.total_supply = total_supply
+        self.initial_staking_pool = initial_staking_pool
+        self.compounding_depth = compounding_depth
+        self.apr_bounds = apr_bounds
+        self.tolerance = tolerance
+        self.grid_size = grid_size
+        self.tokens_to_be_staked_inflationary, self.tokens_to_be_bought_aligned = (
+            calculator.compute_tokens_to_be_staked(proportion_of_tokens_to_be_staked)
+        )
+        self._evaluations = {}
+        self._threshold = None
+        self._threshold_metrics = None
+
+    def _metrics(self, yearly_target_apr):
+        """Minimum staking pool and final percent staked for broadcastable APRs."""
+        series = _incentive_series(
+            self.tokens_to_be_staked_inflationary,
+            self.tokens_to_be_bought_aligned,
+            yearly_target_apr[..., None],
+            self.total_supply,
+            self.initial_staking_pool,
+            self.compounding_depth,
+        )
+        return {
+            "min_staking_pool": series["staking_pool"].min(axis=-1),
+            "final_percent_staked": series["percent_staked"][..., -1],
+        }
+
+    def evaluate(self, aprs):
+        """Returns the metrics of every scenario at each APR, shaped (aprs, scenarios).
+
+        Evaluations are cached per APR value.
+        """
+        aprs = [float(apr) for apr in np.atleast_1d(aprs)]
+        missing = [apr for apr in dict.fromkeys(aprs) if apr not in self._evaluations]
+        if missing:
+            scenario_axes = (1,) * (self.tokens_to_be_staked_inflationary.ndim - 1)
+            metrics = self._metrics(np.reshape(missing, (-1,) + scenario_axes))
+            for i, apr in enumerate(missing):
+                self._evaluations[apr] = {k: v[i] for k, v in metrics.items()}
+        return {
+            key: np.stack([self._evaluations[apr][key] for apr in aprs])
+            for key in ("min_staking_pool", "final_percent_staked")
+        }
+
+    def max_sustainable_apr(self):
+        """Highest APR within `apr_bounds` keeping the staking pool non-negative, per scenario.
+
+        NaN where even the lower bound empties the pool.
+        """
+        if self._threshold is not None:
+            return self._threshold
+        scenarios = self.tokens_to_be_staked_inflationary.shape[:-1]
+        low = np.full(scenarios, float(self.apr_bounds[0]))
+        high = np.full(scenarios, float(self.apr_bounds[1]))
+        steps = np.linspace(0, 1, self.grid_size)[
+            (slice(None),) + (None,) * len(scenarios)
+        ]
+        feasible_low = self._metrics(low)["min_staking_pool"] >= 0
+        while np.max(high - low, initial=0) > self.tolerance:
+            grid = low + (high - low) * steps
+            feasible = self._metrics(grid)["min_staking_pool"] >= 0
+            last_feasible = np.where(
+                feasible.all(axis=0),
+                self.grid_size - 1,
+                np.maximum(np.argmin(feasible, axis=0) - 1, 0),
+            )
+            next_point = np.minimum(last_feasible + 1, self.grid_size - 1)
+            low = np.take_along_axis(grid, last_feasible[None], axis=0)[0]
+            high = np.take_along_axis(grid, next_point[None], axis=0)[0]
+        self._threshold = np.where(feasible_low, low, np.nan)
+        return self._threshold
+
+    def solve(self, min_percent_staked: float = None):
+        """Highest sustainable APR per scenario, NaN where the constraints cannot be met.
+
+        With `min_percent_staked`, the share of the supply staked at the end of
+        the horizon must also reach that level; it grows with the APR, so only
+        the highest sustainable APR needs checking.
+        """
+        threshold = self.max_sustainable_apr()
+        if min_percent_staked is None:
+            return threshold
+        if self._threshold_metrics is None:
+            self._threshold_metrics = self._metrics(np.nan_to_num(threshold))
+        satisfied = (
+            self._threshold_metrics["final_percent_staked"] >= min_percent_staked
+        )
+        return np.where(satisfied, threshold, np.nan)
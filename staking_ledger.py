@@ -0,0 +1,160 @@
+from typing import List
+
+import numpy as np
+import pandas as pd
+
+
+class StakingLedger:
+    """Per-position staking accounts driven by a global reward-per-token accumulator.
+
+    Each month's reward raises `reward_per_token` by reward / total staked, so
+    accrual is O(1) whatever the number of positions. A position's pending
+    reward is amount * reward_per_token - reward_debt, where reward_debt is
+    reset whenever the position is settled. Positions live in preallocated
+    arrays indexed by position id and are created, claimed and closed in
+    batches; running totals of the claims and reward debts keep
+    `total_rewards` O(1) as well.
+    """
+
+    def __init__(self, reward_pool: float, initial_capacity: int = 1024):
+        self.reward_pool = reward_pool
+        self.month = 0
+        self.total_staked = 0.0
+        self.reward_per_token = 0.0
+        self.undistributed_rewards = 0.0
+        self.reward_pool_history: List[float] = []
+        self.rewards_history: List[float] = []
+        self.total_claimed = 0.0
+        self.total_reward_debt = 0.0
+        self.n_positions = 0
+        self.amounts = np.zeros(initial_capacity)
+        self.reward_debt = np.zeros(initial_capacity)
+        self.claimed = np.zeros(initial_capacity)
+        self.entry_month = np.zeros(initial_capacity, dtype=np.int32)
+        self.unlock_month = np.zeros(initial_capacity, dtype=np.int32)
+
+    def _reserve(self, n_new: int):
+        capacity = len(self.amounts)
+        if self.n_positions + n_new <= capacity:
+            return
+        new_capacity = max(2 * capacity, self.n_positions + n_new)
+        for name in (
+            "amounts",
+            "reward_debt",
+            "claimed",
+            "entry_month",
+            "unlock_month",
+        ):
+            array = getattr(self, name)
+            grown = np.zeros(new_capacity, dtype=array.dtype)
+            grown[: self.n_positions] = array[: self.n_positions]
+            setattr(self, name, grown)
+
+    def stake(self, amounts, lock_months=0) -> np.ndarray:
+        """Opens one position per amount in the current month and returns their ids."""
+        amounts = np.atleast_1d(np.asarray(amounts, dtype=float))
+        ids = np.arange(self.n_positions, self.n_positions + len(amounts))
+        self._reserve(len(amounts))
+        self.amounts[ids] = amounts
+        self.reward_debt[ids] = amounts * self.reward_per_token
+        self.total_reward_debt += self.reward_debt[ids].sum()
+        self.entry_month[ids] = self.month
+        self.unlock_month[ids] = self.month + np.asarray(lock_months)
+        self.n_positions += len(amounts)
+        self.total_staked += amounts.sum()
+        return ids
+
+    def pending_rewards(self, position_ids=None) -> np.ndarray:
+        """Rewards accrued and not yet claimed, for the given positions or all of them."""
+        if position_ids is None:
+            position_ids = slice(0, self.n_positions)
+        return (
+            self.amounts[position_ids] * self.reward_per_token
+            - self.reward_debt[position_ids]
+        )
+
+    def claim(self, position_ids) -> np.ndarray:
+        """Pays out the pending rewards of the given positions, in sorted id order."""
+        position_ids = np.unique(position_ids)
+        paid = self.pending_rewards(position_ids)
+        self.claimed[position_ids] += paid
+        self.total_claimed += paid.sum()
+        self.total_reward_debt -= self.reward_debt[position_ids].sum()
+        self.reward_debt[position_ids] = (
+            self.amounts[position_ids] * self.reward_per_token
+        )
+        self.total_reward_debt += self.reward_debt[position_ids].sum()
+        return paid
+
+    def unstake(self, position_ids):
+        """Closes the given positions, paying their rewards.
+
+        Returns (principal, rewards) per position, in sorted id order. Positions still locked are
+        left open and return zeros.
+        """
+        position_ids = np.unique(position_ids)
+        unlocked = self.unlock_month[position_ids] <= self.month
+        principal = np.where(unlocked, self.amounts[position_ids], 0.0)
+        rewards = np.zeros(len(position_ids))
+        closing = position_ids[unlocked]
+        rewards[unlocked] = self.claim(closing)
+        self.total_reward_debt -= self.reward_debt[closing].sum()
+        self.amounts[closing] = 0.0
+        self.reward_debt[closing] = 0.0
+        self.total_staked -= principal.sum()
+        return principal, rewards
+
+    def distribute(self, reward: float):
+        """Spreads one month's reward over the staked tokens and moves to the next month.
+
+        Rewards emitted while nothing is staked are kept in `undistributed_rewards`.
+        """
+        self.reward_pool -= reward
+        if self.total_staked > 0:
+            self.reward_per_token += reward / self.total_staked
+        else:
+            self.undistributed_rewards += reward
+        self.reward_pool_history.append(self.reward_pool)
+        self.rewards_history.append(self.total_rewards())
+        self.month += 1
+
+    def replay_incentives(self, staking_data: pd.DataFrame, lock_months=0):
+        """Feeds the ledger from a `StakingCalculator.compute_incentive_for_stakers` result.
+
+        Every month, the growth of `tokens_to_be_staked_inflationary` is staked
+        as one position, then that month's incentive is distributed.
+        """
+        staked = staking_data["tokens_to_be_staked_inflationary"].to_numpy()
+        new_stakes = np.diff(staked, prepend=0.0)
+        incentives = staking_data["incentive_for_stakers_0"].to_numpy()
+        for new_stake, incentive in zip(new_stakes, incentives):
+            if new_stake > 0:
+                self.stake(new_stake, lock_months)
+            self.distribute(incentive)
+
+    def reconcile(self, staking_data: pd.DataFrame) -> pd.DataFrame:
+        """Compares the ledger with a `StakingCalculator.compute_incentive_for_stakers` result.
+
+        Returns, per month, the rewards accrued to the ledger's positions
+        (`total_rewards` at the end of the month) next to the cumulative
+        incentive the calculator paid to stakers, and their difference.
+        Months covered by only one side have a NaN difference.
+        """
+        ledger_rewards = pd.Series(self.rewards_history, dtype=float)
+        incentive_for_stakers = staking_data["incentive_for_stakers_0"].cumsum()
+        incentive_for_stakers = pd.Series(incentive_for_stakers.to_numpy(), dtype=float)
+        return pd.DataFrame(
+            {
+                "ledger_rewards": ledger_rewards,
+                "incentive_for_stakers": incentive_for_stakers,
+                "difference": ledger_rewards - incentive_for_stakers,
+            }
+        )
+
+    def total_rewards(self) -> float:
+        """Rewards owed to positions so far, claimed or pending."""
+        return float(
+            self.total_claimed
+            + self.reward_per_token * self.total_staked
+            - self.total_reward_debt
+        )
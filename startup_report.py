@@ -0,0 +1,44 @@
+import logging
+import time
+from contextlib import contextmanager
+from typing import Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+# Report of the server's first script run, shared by every session; Streamlit
+# keeps imported modules across reruns and sessions.
+cold_start: Optional[Dict[str, float]] = None
+
+
+class StartupReport:
+    """Wall-clock durations of the named steps of one script run."""
+
+    def __init__(self, run_start: Optional[float] = None):
+        self.run_start = time.perf_counter() if run_start is None else run_start
+        self.durations: Dict[str, float] = {}
+
+    @contextmanager
+    def measure(self, step: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.durations[step] = (
+                self.durations.get(step, 0.0) + time.perf_counter() - start
+            )
+
+    def finish(self) -> Dict[str, float]:
+        """Closes the run and returns its timings in seconds.
+
+        The first run of the process is logged and kept as `cold_start`.
+        """
+        global cold_start
+        report = dict(self.durations)
+        report["run total"] = time.perf_counter() - self.run_start
+        if cold_start is None:
+            cold_start = report
+            logger.info(
+                "Cold start: %s",
+                ", ".join(f"{step} {seconds:.3f}s" for step, seconds in report.items()),
+            )
+        return report
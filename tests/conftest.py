@@ -0,0 +1,23 @@
+import pandas as pd
+import pytest
+
+from ICO_distribution import ICOOrchestrator, ICOParticipant
+from initial_data_ioty import participant_data, revenue_data
+
+
+@pytest.fixture
+def participants() -> pd.DataFrame:
+    return pd.DataFrame(participant_data)
+
+
+@pytest.fixture
+def revenue() -> pd.DataFrame:
+    return pd.DataFrame(revenue_data)
+
+
+@pytest.fixture
+def orchestrator() -> ICOOrchestrator:
+    orchestrator = ICOOrchestrator(total_supply=3_000_000_000, listing_price=0.03)
+    for row in participant_data:
+        orchestrator.add_participant(ICOParticipant(**row))
+    return orchestrator
@@ -0,0 +1,58 @@
+import subprocess
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+pytest.importorskip("streamlit")
+
+import app_state
+from initial_data_ioty import participant_data, revenue_data
+from simulation_pipeline import build_ioty_pipeline
+
+
+class SessionState(dict):
+    __getattr__ = dict.__getitem__
+    __setattr__ = dict.__setitem__
+
+
+def test_importing_the_app_state_leaves_the_models_unloaded():
+    code = (
+        "import sys, app_state; "
+        "assert not {'simulation_pipeline', 'initial_data_ioty'} & set(sys.modules)"
+    )
+    subprocess.run(
+        [sys.executable, "-c", code], check=True, cwd=Path(__file__).parents[1]
+    )
+
+
+def test_lazy_pipeline_matches_an_eager_build(monkeypatch):
+    session = SessionState()
+    monkeypatch.setattr(app_state.st, "session_state", session)
+    pipeline = app_state.get_pipeline()
+    assert app_state.get_pipeline() is pipeline
+    pd.testing.assert_frame_equal(session.df, pd.DataFrame(participant_data))
+
+    eager = build_ioty_pipeline(
+        participants=pd.DataFrame(participant_data),
+        revenue=pd.DataFrame(revenue_data),
+        total_supply=app_state.total_supply,
+        listing_price=app_state.initial_listing_price,
+    )
+    np.testing.assert_allclose(
+        pipeline.get("minting").tokens, eager.get("minting").tokens
+    )
+
+    session.df = session.df.iloc[1:].reset_index(drop=True)
+    assert app_state.get_pipeline() is pipeline
+    pd.testing.assert_frame_equal(
+        pipeline.get("vesting_schedule"),
+        build_ioty_pipeline(
+            participants=session.df,
+            revenue=pd.DataFrame(revenue_data),
+            total_supply=app_state.total_supply,
+            listing_price=app_state.initial_listing_price,
+        ).get("vesting_schedule"),
+    )
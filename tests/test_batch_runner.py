@@ -0,0 +1,116 @@
+import json
+import sys
+
+import pandas as pd
+import pytest
+
+from batch_runner import load_scenarios, run_batch, run_scenario
+from initial_data_ioty import participant_data, revenue_data
+from simulation_pipeline import build_ioty_pipeline
+
+
+def write_scenarios(tmp_path, content):
+    path = tmp_path / "scenarios.json"
+    path.write_text(json.dumps(content))
+    return str(path)
+
+
+def test_scenarios_merge_defaults_and_match_the_pipeline(tmp_path):
+    path = write_scenarios(
+        tmp_path,
+        {
+            "defaults": {"emission_rate": 0.2},
+            "scenarios": [{"name": "base"}, {"name": "apr", "yearly_target_apr": 0.3}],
+        },
+    )
+    scenarios = load_scenarios(path)
+    assert scenarios[1] == {
+        "name": "apr",
+        "emission_rate": 0.2,
+        "yearly_target_apr": 0.3,
+    }
+
+    tables = run_scenario(scenarios[1])
+    pipeline = build_ioty_pipeline(
+        participants=pd.DataFrame(participant_data),
+        revenue=pd.DataFrame(revenue_data),
+        emission_rate=0.2,
+        yearly_target_apr=0.3,
+    )
+    pd.testing.assert_frame_equal(
+        tables["minting"][tables["minting"]["revenue_scenario"] == "moderate"]
+        .drop(columns=["month", "revenue_scenario"])
+        .reset_index(drop=True),
+        pipeline.get("minting").pool_history("moderate"),
+    )
+
+
+def test_duplicate_names_are_rejected_before_running(tmp_path):
+    path = write_scenarios(tmp_path, [{"name": "a"}, {"name": "b"}, {"name": "a"}])
+    with pytest.raises(ValueError, match="Duplicate scenario names"):
+        load_scenarios(path)
+    with pytest.raises(ValueError, match="Duplicate scenario names"):
+        run_batch([{"name": "a"}, {"name": "a"}], str(tmp_path), "csv", 1)
+    assert [item.name for item in tmp_path.iterdir()] == ["scenarios.json"]
+
+
+def test_batch_writes_one_partition_per_scenario(tmp_path):
+    summary = run_batch(
+        [{"name": "a"}, {"name": "b", "emission_rate": 0.5}],
+        str(tmp_path / "out"),
+        "csv",
+        max_workers=1,
+    )
+    assert list(summary["scenario"]) == ["a", "b"]
+    for name in ["a", "b"]:
+        debt = pd.read_csv(
+            tmp_path / "out" / "debt" / f"scenario={name}" / "part-0.csv"
+        )
+        assert len(debt) > 0
+
+
+@pytest.mark.parametrize("output_format", ["parquet", "feather"])
+def test_columnar_partitions_round_trip(tmp_path, output_format):
+    pytest.importorskip("pyarrow")
+    scenario = {"name": "b", "emission_rate": 0.5}
+    run_batch([scenario], str(tmp_path), output_format, max_workers=1)
+    read = pd.read_parquet if output_format == "parquet" else pd.read_feather
+    for table_name, expected in run_scenario(scenario).items():
+        path = tmp_path / table_name / "scenario=b" / f"part-0.{output_format}"
+        pd.testing.assert_frame_equal(read(path), expected)
+
+
+def test_columnar_formats_require_pyarrow(tmp_path, monkeypatch):
+    monkeypatch.setitem(sys.modules, "pyarrow", None)
+    with pytest.raises(ImportError, match="requires pyarrow"):
+        run_batch([{"name": "a"}], str(tmp_path / "out"), "feather", 1)
+    assert not (tmp_path / "out").exists()
+
+
+def test_yaml_scenarios_match_json(tmp_path):
+    pytest.importorskip("yaml")
+    content = {
+        "defaults": {"emission_rate": 0.2, "with_mitigation": False},
+        "scenarios": [{"name": "base"}, {"name": "apr", "yearly_target_apr": 0.3}],
+    }
+    path = tmp_path / "scenarios.yaml"
+    path.write_text(
+        "defaults:\n"
+        "  emission_rate: 0.2\n"
+        "  with_mitigation: false\n"
+        "scenarios:\n"
+        "  - name: base\n"
+        "  - name: apr\n"
+        "    yearly_target_apr: 0.3\n"
+    )
+    assert load_scenarios(str(path)) == load_scenarios(
+        write_scenarios(tmp_path, content)
+    )
+
+
+def test_yaml_scenarios_require_pyyaml(tmp_path, monkeypatch):
+    monkeypatch.setitem(sys.modules, "yaml", None)
+    path = tmp_path / "scenarios.yml"
+    path.write_text("- name: a\n")
+    with pytest.raises(ImportError, match="requires PyYAML"):
+        load_scenarios(str(path))
@@ -0,0 +1,31 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+pytest.importorskip("streamlit")
+
+from charts import _shared_rows, minmax_indices
+
+
+def test_minmax_keeps_the_spikes_a_stride_drops():
+    values = np.zeros(100_001)
+    values[12_345] = 5.0
+    values[67_891] = -3.0
+    step = -(-len(values) // 2_000)
+    assert values[::step].max() == 0.0 and values[::step].min() == 0.0
+
+    rows = minmax_indices(values, 2_000)
+    assert len(rows) <= 2_002
+    assert rows[0] == 0 and rows[-1] == len(values) - 1
+    assert values[rows].max() == 5.0 and values[rows].min() == -3.0
+    np.testing.assert_array_equal(minmax_indices(values[:500], 2_000), np.arange(500))
+
+
+def test_area_chart_rows_keep_every_column_extremes():
+    months = 50_000
+    data = pd.DataFrame({"a": np.ones(months), "b": np.ones(months)})
+    data.loc[101, "a"] = 10.0
+    data.loc[40_003, "b"] = 20.0
+    rows = _shared_rows(data, 1_000)
+    assert {101, 40_003} <= set(rows)
+    assert data.iloc[rows].max().tolist() == [10.0, 20.0]
@@ -0,0 +1,93 @@
+import math
+
+import numpy as np
+import pytest
+
+from Liquidity_pool import ConcentratedLiquidityPool, LiquidityPool
+from vesting_simulation import TokenEconomySimulator
+
+EXCLUDED = ["Liquidity", "Treasury/community", "Staking"]
+
+
+def wide_range_pool(usdc: float, tokens: float, width: float = 1e4):
+    """A fee-free range position that trades like a constant-product pool inside its range."""
+    price = usdc / tokens
+    pool = ConcentratedLiquidityPool(price, fee_rate=0.0)
+    pool.add_position(price / width, price * width, math.sqrt(usdc * tokens))
+    return pool
+
+
+def test_trades_match_constant_product_inside_the_range():
+    reference = LiquidityPool(9e6, 3e8)
+    pool = wide_range_pool(9e6, 3e8)
+    for tokens, usdc in [(1e6, 0.0), (5e7, 2e5), (0.0, -1e5), (3e8, 0.0)]:
+        assert pool.sell_tokens(tokens) == pytest.approx(reference.sell_tokens(tokens))
+        assert pool.buy_tokens(usdc) == pytest.approx(reference.buy_tokens(usdc))
+        assert pool.calculate_price() == pytest.approx(reference.calculate_price())
+        price = pool.calculate_price()
+        assert pool.maintain_price(price, 0.01) == pytest.approx(
+            reference.maintain_price(price, 0.01)
+        )
+
+
+def test_swaps_report_the_amount_executed_when_ticks_run_out():
+    pool = wide_range_pool(9e6, 3e8, width=2)
+    sold = pool.sell_tokens(1e12)
+    assert 0 < sold < 1e12
+    assert pool.calculate_price() == pytest.approx(0.03 / 2, rel=1e-3)
+    assert pool.sell_tokens(1.0) == 0.0
+
+    pool = wide_range_pool(9e6, 3e8, width=2)
+    spent = pool.buy_tokens(1e12)
+    assert 0 < spent < 1e12
+    assert pool.buy_tokens(1.0) == 0.0
+
+
+@pytest.mark.parametrize("with_mitigation", [True, False])
+def test_vesting_simulation_matches_constant_product(orchestrator, with_mitigation):
+    results = []
+    for pool in [LiquidityPool(9e6, 3e8), wide_range_pool(9e6, 3e8)]:
+        simulator = TokenEconomySimulator(orchestrator, pool, EXCLUDED)
+        simulator.compute_monthly_released_tokens()
+        results.append(
+            simulator.run_vesting_simulation(10_000.0, -0.0002, with_mitigation)
+        )
+    for column, values in results[0].items():
+        np.testing.assert_allclose(results[1][column], values, rtol=1e-6)
+
+
+def test_vesting_simulation_counts_only_the_tokens_the_pool_took(orchestrator):
+    simulator = TokenEconomySimulator(
+        orchestrator, wide_range_pool(9e6, 3e8, width=1.5), EXCLUDED
+    )
+    simulator.compute_monthly_released_tokens()
+    result = simulator.run_vesting_simulation(1e6, -0.0002, with_mitigation=False)
+    released = simulator.monthly_release_tokens.to_numpy()
+    assert sum(result["tokens_sold"]) < released.sum()
+    assert all(sold <= r + 1e-6 for sold, r in zip(result["tokens_sold"], released))
+
+
+def test_fees_go_to_the_ranges_a_swap_crosses():
+    pool = ConcentratedLiquidityPool(0.03, fee_rate=0.003)
+    wide = pool.add_position(0.02, 0.04, 5e7)
+    below = pool.add_position(0.025, 0.03, 3e7)
+    untouched_low = pool.add_position(0.01, 0.015, 4e7)
+    untouched_high = pool.add_position(0.035, 0.05, 4e7)
+
+    tokens_in = pool.sell_tokens(6e7)
+    assert tokens_in == 6e7
+    assert 0.02 < pool.calculate_price() < 0.025
+    token_fees = [pool.position_fees(p)[0] for p in range(4)]
+    assert sum(token_fees) == pytest.approx(0.003 * tokens_in, rel=1e-9)
+    assert token_fees[wide] > token_fees[below] > 0
+    assert pool.position_fees(untouched_low) == (0.0, 0.0)
+    assert pool.position_fees(untouched_high) == (0.0, 0.0)
+
+    usdc_in = pool.buy_tokens(1.8e6)
+    assert usdc_in == 1.8e6
+    assert 0.03 < pool.calculate_price() < 0.035
+    usdc_fees = [pool.position_fees(p)[1] for p in range(4)]
+    assert sum(usdc_fees) == pytest.approx(0.003 * usdc_in, rel=1e-9)
+    assert [pool.position_fees(p)[0] for p in range(4)] == pytest.approx(token_fees)
+    assert pool.position_fees(untouched_low) == (0.0, 0.0)
+    assert pool.position_fees(untouched_high) == (0.0, 0.0)
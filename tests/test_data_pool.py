@@ -0,0 +1,56 @@
+import numpy as np
+
+from data_pool import Pool, PoolSet, distribute_tokens_to_pools
+
+NAMES = ["Treasury", "Staking", "Minting"]
+MAX_TOKENS = {"Minting": 500.0}
+INITIAL_TOKENS = {"Treasury": 100.0, "Staking": 300.0, "Minting": 500.0}
+RATIOS = {"Treasury": 0.2, "Staking": 0.4, "Minting": 0.4}
+
+
+def flows(n_steps, seed):
+    rng = np.random.default_rng(seed)
+    return rng.uniform(0, 200, n_steps), rng.uniform(0, 150, (n_steps, 2))
+
+
+def loop_history(n_steps, seed):
+    pools = {
+        name: Pool(name, MAX_TOKENS.get(name, float("inf")), INITIAL_TOKENS[name])
+        for name in NAMES
+    }
+    unlocked, outflows = flows(n_steps, seed)
+    for step in range(n_steps):
+        pools["Staking"].subtract_tokens(outflows[step, 0])
+        pools["Minting"].subtract_tokens(outflows[step, 1])
+        distribute_tokens_to_pools(unlocked[step], pools, RATIOS)
+        for pool in pools.values():
+            pool.update_history()
+    return np.array([pools[name].tokens_history for name in NAMES])
+
+
+def test_pool_set_matches_pools():
+    pools = PoolSet(NAMES, 40, MAX_TOKENS, INITIAL_TOKENS)
+    unlocked, outflows = flows(40, 0)
+    for step in range(40):
+        pools.subtract_tokens(outflows[step], ["Staking", "Minting"])
+        pools.distribute_tokens(unlocked[step], RATIOS)
+        pools.update_history()
+    np.testing.assert_allclose(pools.tokens_history, loop_history(40, 0))
+    np.testing.assert_allclose(pools.to_dataframe().to_numpy().T, pools.tokens_history)
+
+
+def test_pool_set_scenarios_match_separate_runs():
+    pools = PoolSet(NAMES, 40, MAX_TOKENS, INITIAL_TOKENS, n_scenarios=3)
+    scenario_flows = [flows(40, seed) for seed in range(3)]
+    unlocked = np.array([u for u, _ in scenario_flows])
+    outflows = np.array([o for _, o in scenario_flows])
+    for step in range(40):
+        pools.subtract_tokens(outflows[:, step, 0], "Staking")
+        pools.subtract_tokens(outflows[:, step, 1], "Minting")
+        pools.distribute_tokens(unlocked[:, step], pools.ratio_vector(RATIOS))
+        pools.update_history()
+    for seed in range(3):
+        np.testing.assert_allclose(pools.tokens_history[seed], loop_history(40, seed))
+        np.testing.assert_allclose(
+            pools.to_dataframe(seed).to_numpy().T, pools.tokens_history[seed]
+        )
@@ -0,0 +1,196 @@
+import numpy as np
+import pytest
+
+from ICO_distribution import (
+    ICOParticipant,
+    ReleaseAggregate,
+    VestingSchedule,
+    release_matrix,
+)
+
+
+def dense_plan(total_tokens, tge_percent, cliff_months, distribution_months):
+    """The list-based plan `distribute_with_cliff` built before schedules."""
+    distribution = [0] * (cliff_months + distribution_months + 1)
+    tge_tokens = total_tokens * (tge_percent / 100)
+    monthly = (
+        (total_tokens - tge_tokens) / distribution_months
+        if distribution_months > 0
+        else 0
+    )
+    distribution[0] = tge_tokens
+    for i in range(cliff_months + 1, cliff_months + distribution_months + 1):
+        distribution[i] = monthly
+    return distribution
+
+
+SCHEDULES = [
+    (1e6, 10.0, 6, 18),
+    (5e5, 0.0, 0, 12),
+    (2e6, 100.0, 0, 0),
+    (3e6, 25.0, 12, 0),
+    (7.5e5, 5.0, 3, 1),
+]
+
+
+@pytest.mark.parametrize("args", SCHEDULES)
+def test_schedule_matches_dense_plan(args):
+    schedule = VestingSchedule(*args)
+    plan = np.array(dense_plan(*args), dtype=float)
+    months = np.arange(schedule.horizon + 5)
+    padded = np.pad(plan, (0, 5))
+
+    np.testing.assert_allclose(schedule.to_array(), plan)
+    np.testing.assert_allclose(schedule.released_in_month(months), padded)
+    np.testing.assert_allclose(schedule.unlocked_by_month(months), np.cumsum(padded))
+    for month in [0, args[2], schedule.horizon - 1, schedule.horizon + 3]:
+        assert schedule.released_in_month(month) == pytest.approx(padded[month])
+        assert schedule.unlocked_by_month(month) == pytest.approx(
+            np.cumsum(padded)[month]
+        )
+
+
+def test_release_matrix_pads_every_plan(orchestrator):
+    matrix = orchestrator.create_participants_distribution_matrix()
+    horizon = max(len(p.distribution_plan) for p in orchestrator.participants)
+    assert matrix.shape == (horizon, len(orchestrator.participants))
+    for column, p in enumerate(orchestrator.participants):
+        expected = dense_plan(
+            p.total_supply, p.tge_percent, p.cliff_months, p.distribution_months
+        )
+        np.testing.assert_allclose(
+            matrix[:, column], np.pad(expected, (0, horizon - len(expected)))
+        )
+    np.testing.assert_allclose(
+        release_matrix([VestingSchedule(*args) for args in SCHEDULES], 40)[:, 0],
+        np.pad(dense_plan(*SCHEDULES[0]), (0, 40 - 25)),
+    )
+
+
+def wallets(n_wallets=500, seed=3):
+    import pandas as pd
+
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame(
+        {
+            "round": rng.choice(["Seed", "Private", "Public"], n_wallets),
+            "amount": rng.uniform(1e3, 1e6, n_wallets),
+            "tge_percent": rng.choice([0.0, 5.0, 10.0, 100.0], n_wallets),
+            "cliff_months": rng.integers(0, 13, n_wallets),
+            "distribution_months": rng.integers(0, 37, n_wallets),
+            "start_month": rng.integers(0, 7, n_wallets),
+            "price_per_token": rng.uniform(0.01, 0.03, n_wallets),
+        }
+    )
+
+
+def test_registry_matches_per_wallet_schedules():
+    from ICO_distribution import BeneficiaryRegistry
+
+    df = wallets()
+    registry = BeneficiaryRegistry.from_dataframe(df)
+    horizon = registry.horizon + 4
+    expected = np.zeros((horizon, len(registry.round_names)))
+    for row in df.itertuples():
+        schedule = VestingSchedule(
+            row.amount, row.tge_percent, row.cliff_months, row.distribution_months
+        )
+        column = registry.round_names.index(row.round)
+        expected[row.start_month :, column] += schedule.to_array(
+            horizon - row.start_month
+        )
+
+    np.testing.assert_allclose(registry.release_by_round(horizon), expected, atol=1e-6)
+    np.testing.assert_allclose(
+        registry.unlocked_by_round(horizon), np.cumsum(expected, axis=0), atol=1e-6
+    )
+    np.testing.assert_allclose(
+        registry.round_totals(),
+        df.groupby("round")["amount"].sum()[registry.round_names],
+    )
+    np.testing.assert_allclose(
+        registry.round_collected_usd(),
+        (df["amount"] * df["price_per_token"])
+        .groupby(df["round"])
+        .sum()[registry.round_names],
+    )
+
+
+def test_orchestrator_appends_registry_rounds(orchestrator):
+    from ICO_distribution import BeneficiaryRegistry
+
+    plain = orchestrator.create_participants_distribution_dataframe()
+    orchestrator.beneficiaries = BeneficiaryRegistry.from_dataframe(wallets())
+    df = orchestrator.create_participants_distribution_dataframe()
+    rounds = orchestrator.beneficiaries.release_by_round(len(df))
+
+    assert list(df.columns) == (
+        list(plain.columns) + orchestrator.beneficiaries.round_names
+    )
+    np.testing.assert_allclose(df.iloc[:, len(plain.columns) :].to_numpy(), rounds)
+    np.testing.assert_allclose(
+        df.iloc[: len(plain), : len(plain.columns)].to_numpy(), plain.to_numpy()
+    )
+    np.testing.assert_allclose(
+        orchestrator.monthly_release_totals(exclude=["Liquidity"]),
+        df.drop(columns=["Liquidity"]).sum(axis=1),
+    )
+
+
+def test_release_aggregate_matches_the_matrix_after_edits():
+    rng = np.random.default_rng(0)
+    schedules = [
+        VestingSchedule(
+            rng.uniform(1e5, 1e9),
+            float(rng.choice([0.0, 7.5, 33.3])),
+            int(rng.integers(0, 13)),
+            int(rng.integers(0, 37)),
+        )
+        for _ in range(50)
+    ]
+    aggregate = ReleaseAggregate()
+    kept = []
+    for _ in range(20):
+        for schedule in schedules:
+            aggregate.add(schedule)
+        kept = list(rng.choice(len(schedules), 10, replace=False))
+        for i, schedule in enumerate(schedules):
+            if i not in kept:
+                aggregate.remove(schedule)
+        np.testing.assert_allclose(
+            aggregate.to_array(40),
+            release_matrix([schedules[i] for i in kept], 40).sum(axis=1),
+            rtol=1e-12,
+            atol=1e-5,
+        )
+        for i in kept:
+            aggregate.remove(schedules[i])
+        assert not aggregate.to_units(40).any()
+
+
+def test_release_totals_match_the_dataframe_after_updates(orchestrator, participants):
+    edited = participants.copy()
+    edited.loc[edited["description"] == "Private", "cliff_months"] = 9
+    for table in [edited, participants, edited.iloc[2:], participants]:
+        orchestrator.update_participants(table)
+        df = orchestrator.create_participants_distribution_dataframe()
+        for exclude in [[], ["Liquidity"], list(df.columns)]:
+            totals = orchestrator.monthly_release_totals(exclude=exclude)
+            np.testing.assert_allclose(
+                totals, df.drop(columns=exclude).sum(axis=1), atol=1e-5
+            )
+        assert not orchestrator.monthly_release_totals(exclude=list(df.columns)).any()
+
+
+def test_release_totals_follow_direct_edits_of_participants(orchestrator):
+    removed = orchestrator.participants.pop(1)
+    extra = ICOParticipant("Extra", 2.0, 0.01, 10.0, 3, 30)
+    extra.calculate_financials(orchestrator.total_supply, orchestrator.listing_price)
+    orchestrator.participants.append(extra)
+    orchestrator.participants[0] = removed
+    df = orchestrator.create_participants_distribution_dataframe()
+    np.testing.assert_allclose(
+        orchestrator.monthly_release_totals(), df.sum(axis=1), atol=1e-5
+    )
+    del orchestrator.participants[:]
+    assert len(orchestrator.monthly_release_totals()) == 0
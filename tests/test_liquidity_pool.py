@@ -0,0 +1,49 @@
+import numpy as np
+
+from Liquidity_pool import LiquidityPool, LiquidityPoolArray
+from vesting_simulation import TokenEconomySimulator
+
+
+def test_pool_array_matches_scalar_pools():
+    rng = np.random.default_rng(0)
+    reserves = rng.uniform(1e5, 1e7, size=(2, 16))
+    pools = [LiquidityPool(usdc, tokens) for usdc, tokens in reserves.T]
+    array = LiquidityPoolArray(reserves[0].copy(), reserves[1].copy())
+    for _ in range(50):
+        sells = rng.uniform(0, 1e5, 16)
+        mask = rng.random(16) < 0.7
+        sold = array.sell_tokens(sells, mask=mask)
+        price_before = array.calculate_price()
+        buys = array.maintain_price(price_before, 0.01, mask=mask)
+        bought = array.buy_tokens(buys, mask=mask)
+        for i, pool in enumerate(pools):
+            if mask[i]:
+                assert sold[i] == pool.sell_tokens(sells[i])
+                assert np.isclose(
+                    pool.maintain_price(price_before[i], 0.01), buys[i], rtol=1e-12
+                )
+                assert bought[i] == pool.buy_tokens(buys[i])
+            else:
+                assert buys[i] == sold[i] == bought[i] == 0
+    np.testing.assert_allclose(array.usdc_reserve, [p.usdc_reserve for p in pools])
+    np.testing.assert_allclose(array.token_reserve, [p.token_reserve for p in pools])
+
+
+def test_from_pool_copies_reserves():
+    array = LiquidityPoolArray.from_pool(LiquidityPool(9e6, 3e8), 4)
+    array.sell_tokens(np.array([1e6, 0, 0, 0]))
+    np.testing.assert_allclose(array.calculate_price()[1:], 0.03)
+    assert array.calculate_price()[0] < 0.03
+
+
+def test_pool_array_can_stand_in_for_a_scalar_pool():
+    releases = [5e6, 2e7, 0.0, 1e7]
+    results = []
+    for pool in [
+        LiquidityPool(9e6, 3e8),
+        LiquidityPoolArray.from_pool(LiquidityPool(9e6, 3e8), 1),
+    ]:
+        simulator = TokenEconomySimulator.from_release_tokens(releases, pool)
+        results.append(simulator.run_vesting_simulation(50_000.0, 0.001, True))
+    for column, values in results[0].items():
+        np.testing.assert_allclose(np.hstack(results[1][column]), values, rtol=1e-12)
@@ -0,0 +1,50 @@
+import numpy as np
+import pytest
+
+from data_pool import MintingEmissionSolver, Pool, compute_incentive_emission
+
+MAX_TOKENS = 4.5e8
+
+
+def stepped(tokens_locked, emission_rate):
+    """Steps the minting pool month by month, as the app's loop does without inflows."""
+    pool = Pool("Minting", max_tokens=MAX_TOKENS, initial_tokens=MAX_TOKENS)
+    emissions = []
+    for locked in tokens_locked:
+        emissions.append(
+            compute_incentive_emission(
+                locked, pool.get_current_tokens(), MAX_TOKENS, emission_rate
+            )
+        )
+        pool.subtract_tokens(emissions[-1])
+        pool.update_history()
+    return np.array(pool.tokens_history), np.array(emissions)
+
+
+@pytest.fixture
+def tokens_locked():
+    return np.random.default_rng(0).uniform(0, 5e7, 60)
+
+
+def test_trajectory_matches_stepping(tokens_locked):
+    rates = np.array([0.0, 0.1, 1.0, 3.0, 10.0])
+    solver = MintingEmissionSolver(tokens_locked, MAX_TOKENS)
+    trajectories = solver.trajectory(rates)
+    emissions = solver.emissions(rates)
+    for i, rate in enumerate(rates):
+        history, expected = stepped(tokens_locked, rate)
+        np.testing.assert_allclose(trajectories[i], history, rtol=1e-9, atol=1e-3)
+        np.testing.assert_allclose(emissions[i], expected, rtol=1e-9, atol=1e-3)
+
+
+def test_depleting_rate_matches_stepping(tokens_locked):
+    solver = MintingEmissionSolver(tokens_locked, MAX_TOKENS)
+    months = np.array([12, 36, 60])
+    rates = solver.depleting_emission_rate(months, threshold=MAX_TOKENS / 10)
+    for month, rate in zip(months, rates):
+        assert stepped(tokens_locked, rate)[0][month] <= MAX_TOKENS / 10 * (1 + 1e-9)
+        assert stepped(tokens_locked, rate * (1 - 1e-6))[0][month] > MAX_TOKENS / 10
+    assert solver.month_below(MAX_TOKENS / 10, rates[1]) <= 36
+    assert np.isnan(
+        MintingEmissionSolver(np.zeros(5), MAX_TOKENS).depleting_emission_rate(3)
+    )
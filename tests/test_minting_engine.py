@@ -0,0 +1,74 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from data_pool import Pool, compute_incentive_emission, distribute_tokens_to_pools
+from initial_data_ioty import revenue_data
+from minting_engine import LOCKING_MONTHS, run_minting_simulation
+
+SCENARIOS = ["pessimistic", "moderate", "optimistic"]
+RATIOS = {"Treasury": 0.2, "Staking": 0.4, "Minting": 0.4}
+INITIAL_TOKENS = {"Treasury": 4.5e8, "Staking": 9e8, "Minting": 4.5e8}
+
+
+def loop_scenario(revenue, token_price, staking_emission, emission_rate, locking):
+    """`compute_distribution_scenario` as it ran in streamlit_ioty, with explicit inputs."""
+    pools = {
+        "Treasury": Pool("Treasury", initial_tokens=INITIAL_TOKENS["Treasury"]),
+        "Staking": Pool("Staking", initial_tokens=INITIAL_TOKENS["Staking"]),
+        "Minting": Pool(
+            "Minting",
+            max_tokens=INITIAL_TOKENS["Minting"],
+            initial_tokens=INITIAL_TOKENS["Minting"],
+        ),
+    }
+    simulation_length = min(len(revenue), len(token_price))
+    tokens_to_be_unlocked = [0] * (simulation_length + locking)
+    total_tokens_locked = [0] * (simulation_length + locking)
+    for month in range(simulation_length):
+        total_tokens_locked[month] += revenue[month] / token_price[month]
+        minting_emission = compute_incentive_emission(
+            total_tokens_locked[month],
+            pools["Minting"].get_current_tokens(),
+            INITIAL_TOKENS["Minting"],
+            emission_rate,
+        )
+        pools["Minting"].subtract_tokens(minting_emission)
+        pools["Staking"].subtract_tokens(staking_emission[month])
+        total_tokens_locked[month] += minting_emission
+        for i in range(locking):
+            if month + locking + i < simulation_length + locking:
+                tokens_to_be_unlocked[month + locking + i] += (
+                    total_tokens_locked[month] / locking
+                )
+        distribute_tokens_to_pools(tokens_to_be_unlocked[month], pools, RATIOS)
+        for pool in pools.values():
+            pool.update_history()
+    return pools
+
+
+@pytest.mark.parametrize("locking", [1, LOCKING_MONTHS, 30])
+@pytest.mark.parametrize("emission_rate", [0.1, 2.0])
+def test_engine_matches_per_scenario_loop(locking, emission_rate):
+    revenue = pd.DataFrame(revenue_data)
+    token_price = np.linspace(0.03, 0.06, len(revenue) - 5)
+    staking_emission = np.random.default_rng(0).uniform(0, 3e7, len(revenue))
+    result = run_minting_simulation(
+        revenue,
+        SCENARIOS,
+        token_price,
+        staking_emission,
+        emission_rate,
+        RATIOS,
+        INITIAL_TOKENS,
+        locking_months=locking,
+    )
+    for scenario in SCENARIOS:
+        pools = loop_scenario(
+            revenue[scenario], token_price, staking_emission, emission_rate, locking
+        )
+        history = result.pool_history(scenario)
+        for name, pool in pools.items():
+            np.testing.assert_allclose(
+                history[name], pool.tokens_history, rtol=1e-9, err_msg=name
+            )
@@ -0,0 +1,130 @@
+import numpy as np
+import pytest
+
+import monte_carlo
+from Liquidity_pool import LiquidityPool, LiquidityPoolArray
+from monte_carlo import MonteCarloMarketSimulator, MonteCarloResult
+from vesting_simulation import TokenEconomySimulator
+
+COLUMNS = ["tokens_sold", "token_price", "usdcs_to_buy", "price_after_mitigation"]
+
+
+@pytest.fixture
+def simulator(orchestrator):
+    simulator = MonteCarloMarketSimulator(
+        orchestrator,
+        LiquidityPool(300_000_000 * 0.03, 300_000_000),
+        ["Liquidity", "Treasury/community", "Staking"],
+    )
+    simulator.compute_monthly_released_tokens()
+    return simulator
+
+
+@pytest.mark.parametrize(
+    "options",
+    [
+        {},
+        {"order_size_sigma": 0.5, "sell_probability": 0.7},
+        {"buy_demand": 50_000.0, "buy_demand_sigma": 0.3, "order_size_sigma": 0.2},
+        {"max_price_impact": 0.001, "order_size_sigma": 0.3},
+        {"with_mitigation": False, "order_size_sigma": 0.3},
+    ],
+)
+def test_batched_matches_order_by_order(simulator, options):
+    parameters = {
+        "n_paths": 32,
+        "average_selling_order": 10_000.0,
+        "max_price_impact": -0.0002,
+        "with_mitigation": True,
+        "seed": 7,
+        **options,
+    }
+    stepwise = simulator.run_monte_carlo_simulation(batched=False, **parameters)
+    batched = simulator.run_monte_carlo_simulation(batched=True, **parameters)
+    for column in COLUMNS:
+        np.testing.assert_allclose(
+            getattr(batched, column), getattr(stepwise, column), rtol=1e-9
+        )
+
+
+def test_single_path_without_noise_matches_vesting_simulation(simulator):
+    reference = TokenEconomySimulator(
+        simulator.orchestrator,
+        LiquidityPool(300_000_000 * 0.03, 300_000_000),
+        simulator.columns_to_exclude,
+    )
+    reference.compute_monthly_released_tokens()
+    expected = reference.run_vesting_simulation(10_000.0, -0.0002, True)
+    result = simulator.run_monte_carlo_simulation(1, 10_000.0, -0.0002, True, seed=0)
+    for column in COLUMNS:
+        np.testing.assert_allclose(
+            getattr(result, column)[0], expected[column], rtol=1e-9
+        )
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_batched_months_leave_the_order_stream_where_the_loop_does(simulator, seed):
+    # Paths of very different lengths make the draws grow in several chunks,
+    # and a threshold near the typical impact sends orders off the geometric
+    # path, so the rewinding is exercised.
+    rng = np.random.default_rng(seed)
+    remaining = rng.choice([0.0, 1e3, 2e6, 3e7], size=16) * rng.uniform(0.5, 1.5, 16)
+    generators = [np.random.default_rng(seed), np.random.default_rng(seed)]
+    pools = [
+        LiquidityPoolArray.from_pool(LiquidityPool(9e6, 3e8), 16) for _ in generators
+    ]
+    for month in range(3):
+        stepwise = simulator._sell_month_stepwise(
+            pools[0], remaining, generators[0], 10_000.0, 0.5, 0.0004, True
+        )
+        batched = simulator._sell_month_batched(
+            pools[1], remaining, generators[1], 10_000.0, 0.5, 0.0004
+        )
+        assert generators[1].bit_generator.state == generators[0].bit_generator.state
+        for expected, result in zip(stepwise[:4], batched[:4]):
+            np.testing.assert_allclose(result, expected, rtol=1e-9)
+        np.testing.assert_allclose(pools[1].usdc_reserve, pools[0].usdc_reserve)
+    assert generators[1].random() == generators[0].random()
+
+
+@pytest.mark.parametrize("min_share", [0.0, 1.01])
+def test_switching_between_blocks_and_steps_keeps_the_results(
+    simulator, monkeypatch, min_share
+):
+    parameters = dict(
+        n_paths=8,
+        average_selling_order=10_000.0,
+        max_price_impact=-0.0002,
+        with_mitigation=True,
+        order_size_sigma=0.5,
+        sell_probability=0.7,
+        seed=3,
+    )
+    stepwise = simulator.run_monte_carlo_simulation(batched=False, **parameters)
+    monkeypatch.setattr(monte_carlo, "MIN_GEOMETRIC_SHARE", min_share)
+    batched = simulator.run_monte_carlo_simulation(batched=True, **parameters)
+    for column in COLUMNS:
+        np.testing.assert_allclose(
+            getattr(batched, column), getattr(stepwise, column), rtol=1e-9
+        )
+
+
+def test_percentile_bands_are_per_month_percentiles_across_paths():
+    values = np.arange(30.0).reshape(5, 6) ** 2
+    result = MonteCarloResult(values, -values, values, values)
+    bands = result.percentile_bands("token_price", percentiles=(0, 50, 100))
+    assert list(bands.columns) == ["p0", "p50", "p100"]
+    np.testing.assert_allclose(bands["p0"], -values[-1])
+    np.testing.assert_allclose(bands["p50"], -values[2])
+    np.testing.assert_allclose(bands["p100"], -values[0])
+    assert list(result.percentile_bands("usdcs_to_buy").columns) == [
+        "p5",
+        "p25",
+        "p50",
+        "p75",
+        "p95",
+    ]
+    np.testing.assert_allclose(
+        result.percentile_bands("usdcs_to_buy", percentiles=(12.5,))["p12.5"],
+        [np.percentile(values[:, month], 12.5) for month in range(6)],
+    )
@@ -0,0 +1,36 @@
+import pytest
+
+pytest.importorskip("streamlit")
+
+import page_minting
+
+
+class RecordingPipeline:
+    def __init__(self):
+        self.parameters = {}
+
+    def set(self, **parameters):
+        self.parameters.update(parameters)
+
+    def get(self, name):
+        raise StopIteration  # the charts are not under test
+
+
+def test_the_ratio_inputs_reach_the_pipeline(monkeypatch):
+    inputs = {
+        "Treasury redirection ratio": 0.1,
+        "Staking redirection ratio": 0.6,
+        "Minting redirection ratio": 0.3,
+        "Emission Constant of the minting pool": 0.25,
+    }
+    monkeypatch.setattr(
+        page_minting.st, "number_input", lambda label, **kwargs: inputs[label]
+    )
+    monkeypatch.setattr(page_minting.st, "write", lambda *args: None)
+    pipeline = RecordingPipeline()
+    with pytest.raises(StopIteration):
+        page_minting.render(pipeline)
+    assert pipeline.parameters == {
+        "emission_rate": 0.25,
+        "ratios": {"Treasury": 0.1, "Staking": 0.6, "Minting": 0.3},
+    }
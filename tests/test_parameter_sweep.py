@@ -0,0 +1,35 @@
+import numpy as np
+import pytest
+
+from Liquidity_pool import LiquidityPool
+from parameter_sweep import RESULT_COLUMNS, run_parameter_sweep
+from vesting_simulation import TokenEconomySimulator
+
+EXCLUDED = ["Liquidity", "Treasury/community", "Staking"]
+GRID = {
+    "average_selling_order": [5_000.0, 20_000.0],
+    "max_price_impact": [-0.0002, 0.001],
+    "with_mitigation": [True, False],
+}
+
+
+@pytest.mark.parametrize("max_workers", [1, 2])
+def test_sweep_matches_individual_simulations(orchestrator, max_workers):
+    pool = LiquidityPool(300_000_000 * 0.03, 300_000_000)
+    table = run_parameter_sweep(
+        orchestrator, pool, EXCLUDED, GRID, max_workers=max_workers, chunksize=2
+    )
+    assert len(table.groupby(list(GRID))) == 8
+    for (order, impact, mitigation), rows in table.groupby(list(GRID)):
+        simulator = TokenEconomySimulator(
+            orchestrator, LiquidityPool(300_000_000 * 0.03, 300_000_000), EXCLUDED
+        )
+        simulator.compute_monthly_released_tokens()
+        expected = simulator.run_vesting_simulation(
+            order, impact, bool(mitigation), batched=True
+        )
+        assert rows["month"].tolist() == list(range(len(expected["tokens_sold"])))
+        for column in RESULT_COLUMNS:
+            np.testing.assert_allclose(rows[column], expected[column], rtol=1e-12)
+    # The caller's pool is left untouched.
+    assert pool == LiquidityPool(300_000_000 * 0.03, 300_000_000)
@@ -0,0 +1,101 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from data_pool import Pool
+from initial_data_ioty import revenue_data
+from minting_engine import run_minting_simulation
+from pool_ledger import FlowCause, PoolLedger
+from tests.test_minting_engine import INITIAL_TOKENS, RATIOS, SCENARIOS
+
+
+def replayed(ledger, pool, start_month, end_month, cause=None):
+    """Sums the logged amounts of a window by scanning the whole event log."""
+    events = ledger.events_dataframe()
+    window = events[
+        (events["pool"] == pool)
+        & (events["month"] >= start_month)
+        & (events["month"] < end_month)
+    ]
+    if cause is not None:
+        window = window[window["cause"] == cause.name]
+    return window["amount"]
+
+
+def test_queries_match_a_replay_of_the_log():
+    rng = np.random.default_rng(0)
+    ledger = PoolLedger(initial_capacity=8)
+    pools = [Pool(name, 50.0, 20.0, ledger) for name in ["a", "b"]]
+    for month in range(30):
+        if month % 7 == 3:
+            continue  # a month without flows
+        for pool in pools:
+            for _ in range(rng.integers(1, 4)):
+                pool.add_tokens(rng.uniform(0, 10), FlowCause.UNLOCK_REDISTRIBUTION)
+                pool.subtract_tokens(rng.uniform(0, 10), FlowCause.STAKING_EMISSION)
+            pool.update_history()
+        if month % 7 == 2:
+            for pool in pools:
+                pool.update_history()
+
+    for pool in pools:
+        for month in range(len(pool.tokens_history) + 2):
+            expected = 20.0 + replayed(ledger, pool.name, 0, month).sum()
+            assert ledger.balance(pool.name, month) == pytest.approx(expected)
+        np.testing.assert_allclose(
+            [ledger.balance(pool.name, m) for m in range(len(pool.tokens_history))],
+            pool.tokens_history,
+        )
+        for start, end in [(0, 5), (3, 17), (10, 40)]:
+            amounts = replayed(ledger, pool.name, start, end, FlowCause.CLAMP)
+            assert ledger.inflows_by_cause(pool.name, start, end)[
+                "CLAMP"
+            ] == pytest.approx(amounts.clip(lower=0).sum())
+            assert ledger.outflows_by_cause(pool.name, start, end)[
+                "STAKING_EMISSION"
+            ] == pytest.approx(
+                -replayed(
+                    ledger, pool.name, start, end, FlowCause.STAKING_EMISSION
+                ).sum()
+            )
+
+
+def test_minting_simulation_records_every_scenario():
+    revenue = pd.DataFrame(revenue_data)
+    token_price = np.linspace(0.03, 0.06, len(revenue))
+    staking_emission = np.full(len(revenue), 2e7)
+    ledger = PoolLedger()
+    result = run_minting_simulation(
+        revenue,
+        SCENARIOS,
+        token_price,
+        staking_emission,
+        2.0,
+        RATIOS,
+        INITIAL_TOKENS,
+        ledger=ledger,
+    )
+    n_months = len(result.minting_emission[0])
+    for s, scenario in enumerate(SCENARIOS):
+        history = result.pool_history(scenario)
+        for name in history:
+            np.testing.assert_allclose(
+                [ledger.balance(f"{scenario}/{name}", m) for m in range(n_months + 1)],
+                history[name],
+                atol=1e-6,
+            )
+        outflows = ledger.outflows_by_cause(f"{scenario}/Minting", 0, n_months)
+        assert outflows["MINTING_EMISSION"] == pytest.approx(
+            result.minting_emission[s].sum()
+        )
+        inflows = ledger.inflows_by_cause(f"{scenario}/Staking", 12, 24)
+        assert inflows["UNLOCK_REDISTRIBUTION"] == pytest.approx(
+            0.4 * result.tokens_unlocked[s, 12:24].sum()
+        )
+    assert ledger.outflows_by_cause("optimistic/Staking", 0, n_months)[
+        "STAKING_EMISSION"
+    ] == pytest.approx(staking_emission.sum())
+    events = ledger.events_dataframe()
+    assert (events["amount"] != 0).all()
+    unlocks = events[events["cause"] == "UNLOCK_REDISTRIBUTION"]
+    assert len(unlocks) == np.count_nonzero(result.tokens_unlocked) * 3
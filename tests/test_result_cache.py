@@ -0,0 +1,152 @@
+import os
+import threading
+import time
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from result_cache import ResultCache, content_hash
+
+
+@dataclass
+class Result:
+    table: pd.DataFrame
+    values: np.ndarray
+    inputs: np.ndarray
+
+
+def test_least_recently_used_entries_are_evicted_first():
+    cache = ResultCache(max_bytes=2_500)
+    for key in "abc":
+        cache.put(key, np.zeros(100))
+    cache.get("a")
+    cache.put("d", np.zeros(100))
+    assert [key in cache for key in "abcd"] == [True, False, True, True]
+    assert cache.stats.evictions == 1
+    assert cache.nbytes == 2_400
+
+    assert cache.put("big", np.zeros(1_000)).shape == (1_000,)
+    assert "big" not in cache and len(cache) == 3
+
+
+def test_concurrent_calls_compute_once_and_count_one_miss():
+    cache = ResultCache()
+    calls = []
+
+    @cache.memoize
+    def slow(x):
+        calls.append(x)
+        time.sleep(0.05)
+        return pd.DataFrame({"v": [x]})
+
+    barrier = threading.Barrier(8)
+    results = []
+
+    def call():
+        barrier.wait()
+        results.append(slow(1))
+
+    threads = [threading.Thread(target=call) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert calls == [1]
+    assert (cache.stats.misses, cache.stats.hits) == (1, 7)
+    assert all(result.equals(results[0]) for result in results)
+    assert len({id(result) for result in results}) == 8
+
+
+def test_callers_cannot_alter_stored_results():
+    cache = ResultCache()
+    inputs = np.arange(3.0)
+
+    @cache.memoize
+    def compute(x):
+        return {
+            "df": pd.DataFrame({"v": x}),
+            "result": Result(pd.DataFrame({"w": x * 2}), x * 3, x),
+        }
+
+    first = compute(inputs)
+    first["df"].loc[0, "v"] = 999
+    first["result"].table.loc[0, "w"] = 999
+    first["df"]["extra"] = 1
+    again = compute(inputs)
+    pd.testing.assert_frame_equal(again["df"], pd.DataFrame({"v": inputs}))
+    assert again["result"].table["w"].tolist() == [0.0, 2.0, 4.0]
+    with pytest.raises(ValueError):
+        again["result"].values[0] = 999
+    assert inputs.flags.writeable
+    inputs[0] = 5.0
+    assert again["result"].inputs[0] == 0.0
+
+
+def test_results_survive_on_disk(tmp_path):
+    directory = str(tmp_path)
+    ResultCache(directory=directory).put("a", pd.DataFrame({"v": [1.0]}))
+    reloaded = ResultCache(directory=directory)
+    assert reloaded.get("a")["v"].tolist() == [1.0]
+    assert (reloaded.stats.disk_hits, reloaded.stats.hits) == (1, 1)
+    assert "a" in reloaded
+
+    with open(os.path.join(directory, "b.pkl"), "wb") as f:
+        f.write(b"truncated")
+    assert reloaded.get("b") is None
+    assert not os.path.exists(os.path.join(directory, "b.pkl"))
+    assert reloaded.stats.misses == 1
+
+
+def test_disk_files_are_evicted_and_write_errors_ignored(tmp_path):
+    directory = tmp_path / "cache"
+    cache = ResultCache(directory=str(directory), max_disk_bytes=2_500)
+    for i, key in enumerate("abc"):
+        cache.put(key, np.zeros(100))
+        os.utime(directory / f"{key}.pkl", (i, i))
+    cache.put("d", np.zeros(100))
+    assert sorted(os.listdir(directory)) == ["c.pkl", "d.pkl"]
+
+    for name in os.listdir(directory):
+        os.remove(directory / name)
+    directory.rmdir()
+    assert cache.put("e", np.ones(2)).tolist() == [1.0, 1.0]
+    assert ResultCache(directory=str(tmp_path / "missing")).get("e") is None
+
+
+def test_content_hash_ignores_identity():
+    assert content_hash(pd.DataFrame({"v": [1.0]})) == content_hash(
+        pd.DataFrame({"v": [1.0]})
+    )
+    assert content_hash(np.zeros(3)) != content_hash(np.zeros(4))
+
+
+class Ledger:
+    def __init__(self):
+        self.entries = [1.0, 2.0]
+
+
+def test_plain_objects_are_handed_out_as_copies():
+    cache = ResultCache()
+
+    @cache.memoize
+    def build(n):
+        return {"ledger": Ledger(), "names": {"a", "b"}, "n": n}
+
+    first = build(1)
+    first["ledger"].entries.append(999.0)
+    first["names"].add("c")
+    again = build(1)
+    assert again["ledger"].entries == [1.0, 2.0]
+    assert again["names"] == {"a", "b"}
+    assert again["ledger"] is not first["ledger"]
+
+
+def test_results_over_the_cap_are_not_written_to_disk(tmp_path):
+    cache = ResultCache(max_bytes=1_000, directory=str(tmp_path))
+    assert cache.put("big", np.zeros(1_000)).shape == (1_000,)
+    assert "big" not in cache
+    assert os.listdir(tmp_path) == []
+    cache.put("small", np.zeros(10))
+    assert os.listdir(tmp_path) == ["small.pkl"]
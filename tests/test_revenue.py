@@ -0,0 +1,205 @@
+import numpy as np
+import pytest
+
+from revenue import (
+    BaseRevenue,
+    FinancialCalculator,
+    compute_tokens_to_be_unlocked,
+)
+
+
+def loop_unlocks(tokens_to_be_locked, locking_duration):
+    """The nested loop `compute_tokens_to_be_unlocked` ran before the prefix sums."""
+    tokens_to_be_unlocked = [0] * (locking_duration + len(tokens_to_be_locked))
+    for i, token in enumerate(tokens_to_be_locked):
+        monthly_unlock = token / locking_duration
+        for month in range(locking_duration):
+            tokens_to_be_unlocked[i + month] += monthly_unlock
+    return tokens_to_be_unlocked
+
+
+def loop_calculator(calculator):
+    """Per-source unlocks zipped together, then the running locked balance."""
+    unlocked = []
+    for source in calculator.revenue_sources:
+        tokens = loop_unlocks(
+            list(source.calculate_tokens_to_be_locked()), source.locking_duration
+        )
+        unlocked = [sum(x) for x in zip(unlocked, tokens)] if unlocked else tokens
+    history, current = [], 0
+    for locked, released in zip(calculator.total_tokens_locked(), unlocked):
+        current = current + locked - released
+        history.append(current)
+    return unlocked, history
+
+
+@pytest.mark.parametrize("duration", [1, 12, 36, 1095])
+def test_uniform_lock_matches_loop(duration):
+    locks = np.random.default_rng(duration).uniform(0, 1e4, 200)
+    np.testing.assert_allclose(
+        compute_tokens_to_be_unlocked(locks, duration),
+        loop_unlocks(locks, duration),
+        atol=1e-6,
+    )
+
+
+def test_mixed_and_scenario_locks_match_loop():
+    rng = np.random.default_rng(0)
+    locks = rng.uniform(0, 1e4, (3, 60))
+    durations = rng.integers(1, 40, 60)
+    expected = np.zeros((3, 60 + durations.max()))
+    for i, duration in enumerate(durations):
+        single = np.zeros(60)
+        single[i] = 1.0
+        unlocks = np.array(loop_unlocks(single, duration))
+        expected[:, : len(unlocks)] += locks[:, i : i + 1] * unlocks
+    np.testing.assert_allclose(
+        compute_tokens_to_be_unlocked(locks, durations), expected, atol=1e-8
+    )
+
+
+def test_calculator_matches_zipped_loop():
+    rng = np.random.default_rng(1)
+    calculator = FinancialCalculator()
+    for months, duration in [(48, 12), (60, 36), (40, 1)]:
+        calculator.add_revenue_source(
+            BaseRevenue(
+                rng.integers(0, 1000, months).tolist(),
+                5.0,
+                0.6,
+                rng.uniform(0.01, 0.1, months),
+                duration,
+            )
+        )
+    unlocked, history = loop_calculator(calculator)
+    np.testing.assert_allclose(calculator.tokens_to_be_unlocked(), unlocked, atol=1e-6)
+    np.testing.assert_allclose(
+        calculator.compute_locked_tokens_history(), history, atol=1e-6
+    )
+
+
+def test_cached_series_recompute_only_after_input_changes():
+    source = BaseRevenue([10, 20, 30], 2.0, 0.5, [1.0, 2.0, 4.0], 2)
+    calculator = FinancialCalculator()
+    calculator.add_revenue_source(source)
+
+    first = calculator.total_tokens_locked()
+    calculator.total_immediate_revenues()
+    calculator.net_earnings()
+    assert calculator.cache_stats == source.cache_stats
+    misses = source.cache_stats["misses"]
+    assert misses == 3
+    calculator.total_tokens_locked()
+    assert source.cache_stats["misses"] == misses
+
+    source.unit_price = 4.0
+    np.testing.assert_allclose(calculator.total_tokens_locked(), 2 * first)
+    assert source.cache_stats["misses"] == misses + 3
+
+    source.token_price = [2.0, 4.0, 8.0]
+    np.testing.assert_allclose(calculator.total_tokens_locked(), first)
+    assert source.cache_stats["misses"] == misses + 4
+
+
+def test_cached_series_leave_source_inputs_writable():
+    from revenue import NetworkRevenue
+
+    source = NetworkRevenue([10, 20], [1, 2], [0, 1], [1, 0], [0.5, 0.5], 0.5)
+    before = source.calculate_revenues().copy()
+    assert not source.calculate_revenues().flags.writeable
+
+    source.revenues[0] += 100.0
+    source.invalidate_cache("revenues")
+    np.testing.assert_allclose(source.calculate_revenues(), before + [100.0, 0.0])
+
+
+def test_mismatched_lengths_truncate_like_zip():
+    from revenue import NetworkRevenue, ServicesRevenue
+
+    base = BaseRevenue([10, 20, 30, 40], 2.0, 0.5, [1.0, 2.0], 2)
+    np.testing.assert_allclose(base.calculate_tokens_to_be_locked(), [5.0, 5.0])
+
+    services = ServicesRevenue(
+        [10, 20, 30], [0.5, 0.5], [0.1, 0.2, 0.3], [1.0] * 3, 2, 3, 4, 1, 1, 1, 0, [1]
+    )
+    np.testing.assert_allclose(services.calculate_revenues(), [5 + 2 + 30, 10 + 8 + 60])
+
+    network = NetworkRevenue([1, 1, 1], [1, 1], [0, 0, 0], [0, 0, 0], [1.0], 1.0)
+    np.testing.assert_allclose(network.calculate_revenues(), [0.93 + 1.92] * 2)
+    np.testing.assert_allclose(network.calculate_tokens_to_be_locked(), [2.85])
+
+    calculator = FinancialCalculator()
+    calculator.add_revenue_source(base)
+    calculator.add_revenue_source(network)
+    np.testing.assert_allclose(calculator.total_revenues(), [20 + 2.85, 40 + 2.85])
+
+    # Scenario axes that do not broadcast cannot be truncated like months.
+    calculator.add_revenue_source(BaseRevenue(np.ones((3, 4)), 1.0, 0.5))
+    calculator.add_revenue_source(BaseRevenue(np.ones((2, 4)), 1.0, 0.5))
+    with pytest.raises(ValueError):
+        calculator.total_revenues()
+
+
+SCENARIOS = ["pessimistic", "moderate", "optimistic"]
+
+
+def scenario_sources(units, token_price):
+    from revenue import (
+        DeviceCreationRevenue,
+        LicenseRevenue,
+        MessageRevenue,
+        NetworkRevenue,
+        ServicesRevenue,
+    )
+
+    months = units.shape[-1]
+    return [
+        LicenseRevenue(units / 100, 500.0, 120.0, 0.4),
+        DeviceCreationRevenue(units, 2.0, 0.7, token_price),
+        MessageRevenue(units * 50, 0.001, token_price),
+        NetworkRevenue(units, units / 2, units / 10, units / 50, token_price, 0.3),
+        ServicesRevenue(
+            units,
+            np.full(months, 0.5),
+            np.linspace(0.1, 0.3, months),
+            np.full(months, 0.2),
+            0.05,
+            0.2,
+            0.1,
+            0.01,
+            0.05,
+            0.02,
+            0.0,
+            token_price,
+        ),
+    ]
+
+
+def test_scenario_batch_matches_each_scenario():
+    from initial_data_ioty import revenue_data
+    from revenue import stack_scenarios
+
+    units = stack_scenarios(revenue_data, SCENARIOS)
+    token_price = np.linspace(0.03, 0.09, units.shape[-1]) * [[0.5], [1.0], [2.0]]
+    batch = FinancialCalculator()
+    for source in scenario_sources(units, token_price):
+        batch.add_revenue_source(source)
+
+    for row, scenario in enumerate(SCENARIOS):
+        single = FinancialCalculator()
+        for source in scenario_sources(units[row], token_price[row]):
+            single.add_revenue_source(source)
+        for total in [
+            "total_revenues",
+            "total_immediate_revenues",
+            "total_reserve_revenues",
+            "total_tokens_locked",
+            "tokens_to_be_unlocked",
+            "compute_locked_tokens_history",
+        ]:
+            np.testing.assert_allclose(
+                getattr(batch, total)()[row],
+                getattr(single, total)(),
+                atol=1e-6,
+                err_msg=f"{scenario} {total}",
+            )
@@ -0,0 +1,121 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from ICO_distribution import ICOOrchestrator
+from initial_data_ioty import participant_data, revenue_data
+from simulation_pipeline import (
+    IncrementalParticipantTables,
+    SimulationPipeline,
+    Stage,
+    build_ioty_pipeline,
+)
+
+
+def toy_pipeline():
+    return SimulationPipeline(
+        [
+            Stage("total", lambda x, y: x + y, ["x", "y"], ["total"]),
+            Stage("sign", lambda total: total >= 0, ["total"], ["sign"]),
+            Stage(
+                "label",
+                lambda sign, name: f"{name}:{sign}",
+                ["sign", "name"],
+                ["label"],
+            ),
+        ],
+        x=1,
+        y=2,
+        name="n",
+    )
+
+
+def test_unchanged_outputs_stop_the_recompute():
+    pipeline = toy_pipeline()
+    assert pipeline.get("label") == "n:True"
+    assert pipeline.dirty_stages() == []
+
+    pipeline.set(x=1)
+    assert pipeline.dirty_stages() == []
+    pipeline.set(x=5)
+    assert pipeline.dirty_stages() == ["total", "sign", "label"]
+    assert pipeline.get("label") == "n:True"
+    assert pipeline.run_counts == {"total": 2, "sign": 2, "label": 1}
+
+    pipeline.set(name="m")
+    assert pipeline.dirty_stages() == ["label"]
+    assert pipeline.get("label") == "m:True"
+    assert pipeline.run_counts == {"total": 2, "sign": 2, "label": 2}
+
+    with pytest.raises(ValueError):
+        pipeline.set(total=3)
+    with pytest.raises(KeyError):
+        pipeline.get("unknown")
+
+
+def test_cycles_and_duplicate_outputs_are_rejected():
+    with pytest.raises(ValueError):
+        SimulationPipeline(
+            [Stage("a", len, ["b"], ["a"]), Stage("b", len, ["a"], ["b"])]
+        )
+    with pytest.raises(ValueError):
+        SimulationPipeline(
+            [Stage("a", len, ["x"], ["y"]), Stage("b", len, ["x"], ["y"])]
+        )
+
+
+@pytest.fixture
+def pipeline():
+    pipeline = build_ioty_pipeline(
+        participants=pd.DataFrame(participant_data),
+        revenue=pd.DataFrame(revenue_data),
+    )
+    for output in ["minting", "sustainable_aprs", "vesting_schedule"]:
+        pipeline.get(output)
+    return pipeline
+
+
+def test_changing_the_apr_reruns_only_staking_and_minting(pipeline):
+    counts = dict(pipeline.run_counts)
+    pipeline.set(yearly_target_apr=0.3)
+    assert pipeline.dirty_stages() == ["staking", "minting"]
+    pipeline.get("minting")
+    pipeline.get("sustainable_aprs")
+    assert {name: pipeline.run_counts[name] - counts[name] for name in counts} == {
+        name: int(name in ("staking", "minting")) for name in counts
+    }
+
+
+def test_incremental_edits_match_a_fresh_pipeline(pipeline):
+    participants = pd.DataFrame(participant_data)
+    participants.loc[participants["description"] == "Private", "cliff_months"] = 9
+    pipeline.set(participants=participants)
+    assert "initial_staking_pool" in pipeline.dirty_stages()
+    counts = dict(pipeline.run_counts)
+    result = pipeline.get("minting")
+    assert pipeline.run_counts["staking"] == counts["staking"] + 1
+    assert pipeline.run_counts["sustainable_aprs"] == counts["sustainable_aprs"]
+
+    fresh = build_ioty_pipeline(
+        participants=participants, revenue=pd.DataFrame(revenue_data)
+    )
+    np.testing.assert_allclose(result.tokens, fresh.get("minting").tokens)
+    pd.testing.assert_frame_equal(
+        pipeline.get("vesting_schedule"), fresh.get("vesting_schedule")
+    )
+
+
+def test_participant_tables_are_updated_incrementally(participants):
+    stage = IncrementalParticipantTables()
+    orchestrator = ICOOrchestrator(total_supply=3e9, listing_price=0.03)
+    edited = participants.copy()
+    edited.loc[edited["description"] == "Private", "distribution_months"] = 60
+    for table in [participants, edited, edited.iloc[::-1], participants.iloc[1:]]:
+        orchestrator.update_participants(table)
+        financial, distribution = stage(orchestrator)
+        pd.testing.assert_frame_equal(
+            distribution, orchestrator.create_participants_distribution_dataframe()
+        )
+        pd.testing.assert_frame_equal(
+            financial, orchestrator.create_participants_financial_dataframe()
+        )
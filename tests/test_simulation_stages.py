@@ -0,0 +1,57 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from initial_data_ioty import revenue_data
+from simulation_stages import (
+    compute_staking_data,
+    compute_sustainable_aprs,
+    stage_cache,
+)
+from staking import StakingCalculator, SustainableAprSolver
+
+SCENARIOS = ["pessimistic", "moderate", "optimistic"]
+
+
+@pytest.fixture
+def debt():
+    months = len(revenue_data["month"])
+    rng = np.random.default_rng(0)
+    return pd.DataFrame(
+        {
+            "usdcs_to_buy": rng.uniform(0, 3e5, months),
+            "token_price": np.linspace(0.03, 0.05, months),
+        }
+    )
+
+
+def test_stage_results_match_direct_runs_and_are_reused(debt):
+    revenue = pd.DataFrame(revenue_data)
+    staking = compute_staking_data(debt, revenue, "moderate", 0.2, 3e9, 9e8)
+    expected = StakingCalculator(
+        debt["usdcs_to_buy"], revenue["moderate"], debt["token_price"], 0.2
+    ).compute_incentive_for_stakers(1, 3e9, 9e8)
+    pd.testing.assert_frame_equal(staking, expected)
+
+    hits = stage_cache.stats.hits
+    again = compute_staking_data(debt.copy(), revenue.copy(), "moderate", 0.2, 3e9, 9e8)
+    pd.testing.assert_frame_equal(again, staking)
+    assert again is not staking
+    assert stage_cache.stats.hits == hits + 1
+    assert not compute_staking_data(debt, revenue, "moderate", 0.3, 3e9, 9e8).equals(
+        staking
+    )
+
+
+def test_sustainable_aprs_do_not_depend_on_the_target_apr(debt):
+    revenue = pd.DataFrame(revenue_data)
+    aprs = compute_sustainable_aprs(debt, revenue, SCENARIOS, 3e9, 9e8)
+    calculator = StakingCalculator(
+        debt["usdcs_to_buy"],
+        revenue[SCENARIOS].T.to_numpy(),
+        debt["token_price"],
+        0.5,
+    )
+    np.testing.assert_array_equal(
+        aprs, SustainableAprSolver(calculator, 1, 3e9, 9e8).solve()
+    )
@@ -0,0 +1,103 @@
+from itertools import accumulate
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from staking import StakingCalculator, SustainableAprSolver
+
+MONTHS = 48
+TOTAL_SUPPLY = 3_000_000_000
+INITIAL_STAKING_POOL = 300_000_000
+
+
+def loop_incentives(calculator, proportion, total_supply, initial_staking_pool):
+    """The column-by-column DataFrame `compute_incentive_for_stakers` built before."""
+    monthly_target_apr = calculator.yearly_target_apr / 12
+    staked, bought = calculator.compute_tokens_to_be_staked(proportion)
+    data = pd.DataFrame()
+    data["incentive_for_stakers_0"] = list(
+        accumulate(t * monthly_target_apr for t in staked)
+    )
+    for i in range(1, 6):
+        data[f"incentive_for_stakers_{i}"] = (
+            data[f"incentive_for_stakers_{i-1}"] * monthly_target_apr
+        )
+        data["incentive_for_stakers_0"] += data[f"incentive_for_stakers_{i}"]
+    staking_pool = [initial_staking_pool - data["incentive_for_stakers_0"][0]]
+    for cumulative_incentive in data["incentive_for_stakers_0"][1:]:
+        staking_pool.append(staking_pool[-1] - cumulative_incentive)
+    data["tokens_to_be_staked_inflationary"] = (
+        data["incentive_for_stakers_0"] / calculator.yearly_target_apr
+    )
+    data["percent_staked"] = data["tokens_to_be_staked_inflationary"] / total_supply
+    data["tokens_to_be_bought_aligned"] = bought
+    data["staking_pool"] = staking_pool
+    return data
+
+
+def inputs(scenarios=(), seed=0):
+    rng = np.random.default_rng(seed)
+    revenue = rng.uniform(0, 2e6, scenarios + (MONTHS,))
+    debt_usd = rng.uniform(0, 2e6, MONTHS)
+    token_price = np.linspace(0.03, 0.1, MONTHS)
+    return debt_usd, revenue, token_price
+
+
+@pytest.mark.parametrize("apr", [0.05, 0.2, 1.5])
+def test_closed_form_matches_loop(apr):
+    calculator = StakingCalculator(*inputs(), apr)
+    result = calculator.compute_incentive_for_stakers(
+        0.5, TOTAL_SUPPLY, INITIAL_STAKING_POOL
+    )
+    expected = loop_incentives(calculator, 0.5, TOTAL_SUPPLY, INITIAL_STAKING_POOL)
+    pd.testing.assert_frame_equal(result[expected.columns], expected, rtol=1e-9)
+
+
+def test_apr_sweep_matches_single_aprs():
+    aprs = np.array([0.01, 0.1, 0.3])
+    calculator = StakingCalculator(*inputs(scenarios=(4,)), 0.0)
+    series = calculator.compute_incentive_series(
+        0.5, TOTAL_SUPPLY, INITIAL_STAKING_POOL, aprs
+    )
+    assert series["staking_pool"].shape == (3, 4, MONTHS)
+    debt_usd, revenue, token_price = inputs(scenarios=(4,))
+    for i, apr in enumerate(aprs):
+        for scenario in range(4):
+            single = StakingCalculator(debt_usd, revenue[scenario], token_price, apr)
+            expected = loop_incentives(single, 0.5, TOTAL_SUPPLY, INITIAL_STAKING_POOL)
+            for column in ["incentive_for_stakers_0", "staking_pool"]:
+                np.testing.assert_allclose(
+                    series[column][i, scenario], expected[column], rtol=1e-9
+                )
+
+
+def test_solver_matches_a_fine_apr_scan():
+    calculator = StakingCalculator(*inputs(scenarios=(6,), seed=2), 0.0)
+    solver = SustainableAprSolver(
+        calculator, 0.5, TOTAL_SUPPLY, INITIAL_STAKING_POOL, apr_bounds=(0.0, 5.0)
+    )
+    solved = solver.solve()
+
+    aprs = np.linspace(0.0, 5.0, 5001)
+    pools = calculator.compute_incentive_series(
+        0.5, TOTAL_SUPPLY, INITIAL_STAKING_POOL, aprs
+    )["staking_pool"].min(axis=-1)
+    feasible = pools >= 0
+    for scenario in range(6):
+        if not feasible[0, scenario]:
+            assert np.isnan(solved[scenario])
+            continue
+        scanned = aprs[feasible[:, scenario]].max()
+        assert scanned <= solved[scenario] + 1e-6
+        assert solved[scenario] < scanned + 1e-3
+
+    np.testing.assert_array_equal(solver.solve(), solved)
+    # evaluate() runs every APR on every scenario; keep each scenario's own APR.
+    percent = np.diagonal(
+        solver.evaluate(np.nan_to_num(solved))["final_percent_staked"]
+    )
+    np.testing.assert_array_equal(
+        np.isnan(solver.solve(min_percent_staked=np.nanmedian(percent))),
+        np.isnan(solved) | (percent < np.nanmedian(percent)),
+    )
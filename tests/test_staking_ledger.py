@@ -0,0 +1,55 @@
+import numpy as np
+import pytest
+
+from staking import StakingCalculator
+from staking_ledger import StakingLedger
+from tests.test_staking import INITIAL_STAKING_POOL, TOTAL_SUPPLY, inputs
+
+
+def staking_data(apr=0.2):
+    calculator = StakingCalculator(*inputs(), apr)
+    return calculator.compute_incentive_for_stakers(
+        0.5, TOTAL_SUPPLY, INITIAL_STAKING_POOL
+    )
+
+
+def test_replayed_incentives_reconcile_with_the_calculator():
+    data = staking_data()
+    ledger = StakingLedger(INITIAL_STAKING_POOL)
+    ledger.replay_incentives(data)
+
+    report = ledger.reconcile(data)
+    assert len(report) == len(data)
+    np.testing.assert_allclose(
+        report["ledger_rewards"], report["incentive_for_stakers"], rtol=1e-9
+    )
+    np.testing.assert_allclose(ledger.reward_pool_history, data["staking_pool"])
+
+    report = ledger.reconcile(data.iloc[:10])
+    assert len(report) == len(data)
+    assert report["difference"].iloc[10:].isna().all()
+
+
+def test_accumulator_matches_per_position_accrual():
+    rng = np.random.default_rng(0)
+    ledger = StakingLedger(1e9, initial_capacity=4)
+    owed = {}
+    for month in range(24):
+        ids = ledger.stake(rng.uniform(1, 100, 5), lock_months=rng.integers(0, 6, 5))
+        owed.update({i: 0.0 for i in ids})
+        if month % 3 == 2:
+            ledger.claim(rng.choice(ledger.n_positions, 8))
+        if month % 4 == 3:
+            ledger.unstake(rng.choice(ledger.n_positions, 8))
+        reward = rng.uniform(0, 1e3)
+        staked = ledger.amounts[: ledger.n_positions]
+        for i, amount in enumerate(staked):
+            owed[i] += reward * amount / staked.sum()
+        ledger.distribute(reward)
+
+    expected = np.array([owed[i] for i in range(ledger.n_positions)])
+    np.testing.assert_allclose(
+        ledger.claimed[: ledger.n_positions] + ledger.pending_rewards(), expected
+    )
+    assert ledger.total_rewards() == pytest.approx(expected.sum())
+    assert ledger.undistributed_rewards == 0.0
@@ -0,0 +1,34 @@
+import time
+
+import pytest
+
+import startup_report
+from startup_report import StartupReport
+
+
+def test_steps_accumulate_and_survive_errors():
+    report = StartupReport()
+    with report.measure("imports"):
+        time.sleep(0.01)
+    with report.measure("imports"):
+        time.sleep(0.01)
+    with pytest.raises(RuntimeError):
+        with report.measure("render"):
+            raise RuntimeError
+    assert report.durations["imports"] >= 0.02
+    assert set(report.durations) == {"imports", "render"}
+
+
+def test_only_the_first_run_is_kept_as_cold_start(monkeypatch):
+    monkeypatch.setattr(startup_report, "cold_start", None)
+    first = StartupReport(time.perf_counter() - 1.0)
+    with first.measure("imports"):
+        pass
+    report = first.finish()
+    assert report["run total"] >= 1.0
+    assert report["run total"] >= report["imports"]
+    assert startup_report.cold_start is report
+
+    second = StartupReport().finish()
+    assert startup_report.cold_start is report
+    assert second["run total"] < 1.0
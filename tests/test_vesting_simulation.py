@@ -0,0 +1,61 @@
+import numpy as np
+import pytest
+
+from Liquidity_pool import LiquidityPool
+from vesting_simulation import TokenEconomySimulator
+
+EXCLUDED = ["Liquidity", "Treasury/community", "Staking"]
+
+
+def run(orchestrator, batched, with_mitigation):
+    simulator = TokenEconomySimulator(
+        orchestrator, LiquidityPool(300_000_000 * 0.03, 300_000_000), EXCLUDED
+    )
+    simulator.compute_monthly_released_tokens()
+    return simulator.run_vesting_simulation(
+        10_000.0, -0.0002, with_mitigation=with_mitigation, batched=batched
+    )
+
+
+@pytest.mark.parametrize("with_mitigation", [True, False])
+def test_batched_matches_per_order_execution(orchestrator, with_mitigation):
+    per_order = run(orchestrator, batched=False, with_mitigation=with_mitigation)
+    batched = run(orchestrator, batched=True, with_mitigation=with_mitigation)
+    for column, values in per_order.items():
+        np.testing.assert_allclose(batched[column], values, rtol=1e-9, atol=1e-6)
+
+
+def test_release_tokens_constructor_matches_the_orchestrator_path(orchestrator):
+    expected = run(orchestrator, batched=True, with_mitigation=True)
+    simulator = TokenEconomySimulator.from_release_tokens(
+        orchestrator.monthly_release_totals(exclude=EXCLUDED),
+        LiquidityPool(300_000_000 * 0.03, 300_000_000),
+    )
+    result = simulator.run_vesting_simulation(
+        10_000.0, -0.0002, with_mitigation=True, batched=True
+    )
+    for column, values in expected.items():
+        np.testing.assert_allclose(result[column], values, rtol=1e-9, atol=1e-6)
+
+
+@pytest.mark.parametrize("max_price_impact", [-0.0002, 2.4e-5])
+def test_unmitigated_batches_match_the_loop_on_large_releases(max_price_impact):
+    # About 13,000 orders of 100 USDC in the first month; with 2.4e-5 the
+    # threshold is first breached mid-month.
+    results = []
+    for batched in [False, True]:
+        simulator = TokenEconomySimulator.from_release_tokens(
+            [5e7, 2.5e7], LiquidityPool(9e6, 3e8)
+        )
+        results.append(
+            simulator.run_vesting_simulation(
+                100.0, max_price_impact, with_mitigation=False, batched=batched
+            )
+        )
+        results.append(simulator.liquidity_pool)
+    per_order, loop_pool, batched, batched_pool = results
+    assert per_order["usdcs_to_buy"][0] != 0
+    for column, values in per_order.items():
+        np.testing.assert_allclose(batched[column], values, rtol=1e-9)
+    assert batched_pool.token_reserve == pytest.approx(3e8 + 7.5e7, rel=1e-12)
+    assert batched_pool.usdc_reserve == pytest.approx(loop_pool.usdc_reserve, rel=1e-12)
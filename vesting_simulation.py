@@ -1,22 +1,91 @@
-from typing import List, Dict
+import math
+from typing import List, Dict, Optional, Sequence, Union
+
+import numpy as np
 
 from ICO_distribution import ICOOrchestrator
-from Liquidity_pool import LiquidityPool
+from Liquidity_pool import ConcentratedLiquidityPool, LiquidityPool
+
+# Number of selling orders evaluated per vectorized block in batched mode.
+BATCH_BLOCK_SIZE = 65_536
+# Shorter runs of mitigated orders are cheaper to walk one by one.
+MIN_BATCH_BLOCK_SIZE = 8
+# Orders smaller than this end the month's selling (mirrors the loop's break).
+MIN_TOKENS_PER_ORDER = 1e-6
+# Newton iterations allowed for a block of unmitigated orders, and the relative
+# residual under which the block's reserves count as solved.
+MAX_PATH_ITERATIONS = 20
+PATH_TOLERANCE = 1e-13
+# Bound on -log of the block's cumulative slope, keeping its inverse finite.
+MAX_PATH_LOG_DECAY = 300.0
+
+
+def _usdc_reserve_path(usdc_reserve: float, order_usdc: float, size: int):
+    """USDC reserves before each of `size` unmitigated orders, and after the last.
+
+    An order worth `order_usdc` at the current price maps the reserve u to
+    h(u) = u² / (u + order_usdc) at constant k. The whole block is solved at
+    once by Newton's method: the correction δ follows the linear recurrence
+    δ' = h'(u) δ - residual, which cumulative products and sums solve. Starts
+    from u₀ - a·j + a·ln(u₀ / (u₀ - a·j)), the continuous approximation, and
+    returns the longest prefix that converged (at least one order).
+    """
+    a = order_usdc
+    linear = np.maximum(usdc_reserve - a * np.arange(size + 1), a)
+    path = linear + a * np.log(usdc_reserve / linear)
+    for _ in range(MAX_PATH_ITERATIONS):
+        before = path[:-1]
+        residual = path[1:] - before**2 / (before + a)
+        if np.all(np.abs(residual) <= PATH_TOLERANCE * path[1:]):
+            return path
+        log_slopes = np.concatenate(
+            [[0.0], np.cumsum(np.log1p(-((a / (before + a)) ** 2)))]
+        )
+        keep = max(
+            int(np.searchsorted(-log_slopes, MAX_PATH_LOG_DECAY, side="right")), 2
+        )
+        if keep < len(path):
+            path = path[:keep]
+            continue
+        slopes = np.exp(log_slopes[1:])
+        path[1:] -= slopes * np.cumsum(residual / slopes)
+    before = path[:-1]
+    residual = path[1:] - before**2 / (before + a)
+    solved = np.abs(residual) <= PATH_TOLERANCE * path[1:]
+    if not solved[0]:
+        return np.array([usdc_reserve, usdc_reserve**2 / (usdc_reserve + a)])
+    return path[: (len(solved) if solved.all() else int(np.argmin(solved))) + 1]
 
 
 class TokenEconomySimulator:
     def __init__(
         self,
-        orchestrator: ICOOrchestrator,
-        liquidity_pool: LiquidityPool,
+        orchestrator: Optional[ICOOrchestrator],
+        liquidity_pool: Union[LiquidityPool, ConcentratedLiquidityPool],
         columns_to_exclude: List[str],
+        monthly_release_tokens: Optional[Sequence[float]] = None,
     ):
-        """Initializes the simulator with necessary components and state variables."""
+        """Initializes the simulator with necessary components and state variables.
+
+        `monthly_release_tokens`, when given, stands for the result of
+        `compute_monthly_released_tokens`.
+        """
         self.orchestrator = orchestrator
         self.liquidity_pool = liquidity_pool
         self.columns_to_exclude = columns_to_exclude
+        if monthly_release_tokens is not None:
+            self.monthly_release_tokens = monthly_release_tokens
         self.reset_state()
 
+    @classmethod
+    def from_release_tokens(
+        cls,
+        monthly_release_tokens: Sequence[float],
+        liquidity_pool: Union[LiquidityPool, ConcentratedLiquidityPool],
+    ):
+        """Builds a simulator selling the given tokens each month, without an orchestrator."""
+        return cls(None, liquidity_pool, [], monthly_release_tokens)
+
     def reset_state(self):
         """Resets or initializes the state for simulation."""
         self.tokens_sold = [0]
@@ -39,7 +108,8 @@ class TokenEconomySimulator:
         tokens_to_sell = min(
             released_tokens, average_selling_order / price_before_selling
         )
-        self.liquidity_pool.sell_tokens(tokens_to_sell)
+        # A concentrated pool sells less once its lowest tick is reached.
+        tokens_to_sell = self.liquidity_pool.sell_tokens(tokens_to_sell)
         price_after_selling = self.liquidity_pool.calculate_price()
         price_impact = (
             price_after_selling - price_before_selling
@@ -60,7 +130,7 @@ class TokenEconomySimulator:
                 price_before_selling, max_price_impact
             )
             if with_mitigation:
-                self.liquidity_pool.buy_tokens(usdc_to_buy)
+                usdc_to_buy = self.liquidity_pool.buy_tokens(usdc_to_buy)
             new_mitigated_price = self.liquidity_pool.calculate_price()
             return usdc_to_buy, new_mitigated_price
         else:
@@ -88,9 +158,213 @@ class TokenEconomySimulator:
             self.price_after_mitigation.append(new_mitigated_price)
             self.usdc_to_buy_list.append(usdcs_to_buy)
             released_tokens -= tokens_to_sell
-            if tokens_to_sell < 1e-6:
+            if tokens_to_sell < MIN_TOKENS_PER_ORDER:
                 break
 
+    def execute_batched_transaction_step(
+        self,
+        released_tokens: float,
+        average_selling_order: float,
+        max_price_impact: float,
+        with_mitigation: bool,
+    ):
+        """Executes a month's selling orders in one pass and records them as a single aggregated order.
+
+        Produces the same summary aggregates as `execute_transaction_step` without
+        walking the orders one by one through the liquidity pool. Pools other than
+        a constant-product `LiquidityPool` fall back to `execute_transaction_step`.
+        """
+        if not isinstance(self.liquidity_pool, LiquidityPool):
+            # The closed forms below rely on a single constant-product curve.
+            self.execute_transaction_step(
+                released_tokens,
+                average_selling_order,
+                max_price_impact,
+                with_mitigation,
+            )
+            return
+        if released_tokens <= 0:
+            return
+        if with_mitigation:
+            totals = self._sell_mitigated_orders(
+                released_tokens, average_selling_order, max_price_impact
+            )
+        else:
+            totals = self._sell_unmitigated_orders(
+                released_tokens, average_selling_order, max_price_impact
+            )
+        tokens_sold, last_price, usdcs_to_buy, last_mitigated_price = totals
+        self.tokens_sold.append(tokens_sold)
+        self.token_price.append(last_price)
+        self.usdc_to_buy_list.append(usdcs_to_buy)
+        self.price_after_mitigation.append(last_mitigated_price)
+
+    def _sell_unmitigated_orders(
+        self,
+        released_tokens: float,
+        average_selling_order: float,
+        max_price_impact: float,
+    ):
+        """Sells the released tokens without buying back.
+
+        Every order preserves k and nothing is bought back, so all the released
+        tokens are sold and the pool ends at (x₀ + released, k / (x₀ + released)).
+        Only the buy-backs the threshold calls for depend on the individual
+        orders; their reserves are evaluated in vectorized blocks by
+        `_usdc_reserve_path`, and the final partial order goes through a
+        regular step.
+        """
+        pool = self.liquidity_pool
+        k = pool.usdc_reserve * pool.token_reserve
+        initial_token_reserve = pool.token_reserve
+        usdc_reserve, token_reserve = pool.usdc_reserve, pool.token_reserve
+        growth = math.sqrt(1 + max_price_impact)
+        tokens_sold = usdcs_to_buy = 0.0
+        block_size = BATCH_BLOCK_SIZE
+        while released_tokens > 0:
+            final_usdc_reserve = k / (token_reserve + released_tokens)
+            size = int(
+                min(
+                    block_size,
+                    (usdc_reserve - final_usdc_reserve) / average_selling_order + 2,
+                )
+            )
+            regular_orders = 0
+            if size >= MIN_BATCH_BLOCK_SIZE:
+                path = _usdc_reserve_path(usdc_reserve, average_selling_order, size)
+                size = len(path) - 1
+                before, after = path[:-1], path[1:]
+                orders = average_selling_order * k / before**2
+                regular = (np.cumsum(orders) < released_tokens) & (
+                    orders >= MIN_TOKENS_PER_ORDER
+                )
+                regular_orders = size if regular.all() else int(np.argmin(regular))
+
+            if regular_orders:
+                block = slice(0, regular_orders)
+                breached = np.abs((after[block] / before[block]) ** 2 - 1) > (
+                    max_price_impact
+                )
+                usdcs_to_buy += float(
+                    np.sum((before[block] * growth - after[block])[breached])
+                )
+                block_tokens = float(np.sum(orders[block]))
+                tokens_sold += block_tokens
+                released_tokens -= block_tokens
+                token_reserve += block_tokens
+                usdc_reserve = k / token_reserve
+            if regular_orders and regular_orders == size:
+                block_size = min(2 * size, BATCH_BLOCK_SIZE)
+                continue
+
+            price_before_selling = usdc_reserve / token_reserve
+            tokens_to_sell = min(
+                released_tokens, average_selling_order / price_before_selling
+            )
+            token_reserve += tokens_to_sell
+            usdc_reserve = k / token_reserve
+            price_impact = (
+                usdc_reserve / token_reserve - price_before_selling
+            ) / price_before_selling
+            if abs(price_impact) > max_price_impact:
+                usdcs_to_buy += (
+                    math.sqrt(k * price_before_selling * (1 + max_price_impact))
+                    - usdc_reserve
+                )
+            tokens_sold += tokens_to_sell
+            released_tokens -= tokens_to_sell
+            if tokens_to_sell < MIN_TOKENS_PER_ORDER:
+                break
+        pool.token_reserve = initial_token_reserve + tokens_sold
+        pool.usdc_reserve = k / pool.token_reserve
+        price_after_selling = pool.calculate_price()
+        return tokens_sold, price_after_selling, usdcs_to_buy, price_after_selling
+
+    def _sell_mitigated_orders(
+        self,
+        released_tokens: float,
+        average_selling_order: float,
+        max_price_impact: float,
+    ):
+        """Sells the released tokens, buying back after every order that breaches the threshold.
+
+        Sells and buy-backs both preserve k, and a buy-back resets the price to
+        `price_before_selling * (1 + max_price_impact)`, so a run of mitigated
+        orders follows a geometric price path that is evaluated in vectorized
+        blocks. Orders that leave that path (the final partial order, an order
+        under the threshold, a dust order) go through the regular substeps.
+        """
+        growth = 1 + max_price_impact
+        tokens_sold = usdcs_to_buy = 0.0
+        last_price = last_mitigated_price = None
+        block_size = BATCH_BLOCK_SIZE
+        while released_tokens > 0:
+            pool = self.liquidity_pool
+            price = pool.calculate_price()
+            size = int(
+                min(block_size, released_tokens * price / average_selling_order + 1)
+            )
+            regular_orders = 0
+            if size >= MIN_BATCH_BLOCK_SIZE:
+                k = pool.usdc_reserve * pool.token_reserve
+                prices_before = price * growth ** np.arange(size)
+                orders = average_selling_order / prices_before
+                token_reserves = np.sqrt(k / prices_before) + orders
+                usdc_reserves = k / token_reserves
+                prices_after = usdc_reserves / token_reserves
+                price_impacts = (prices_after - prices_before) / prices_before
+                regular = (
+                    (np.cumsum(orders) < released_tokens)
+                    & (np.abs(price_impacts) > max_price_impact)
+                    & (orders >= MIN_TOKENS_PER_ORDER)
+                )
+                regular_orders = size if regular.all() else int(np.argmin(regular))
+                block_size = (
+                    min(2 * size, BATCH_BLOCK_SIZE)
+                    if regular_orders == size
+                    else max(regular_orders, 1)
+                )
+
+            if regular_orders:
+                block = slice(0, regular_orders)
+                usdcs_to_buy += float(
+                    np.sum(
+                        np.sqrt(k * prices_before[block] * growth)
+                        - usdc_reserves[block]
+                    )
+                )
+                block_tokens = float(np.sum(orders[block]))
+                tokens_sold += block_tokens
+                released_tokens -= block_tokens
+                last_price = float(prices_after[regular_orders - 1])
+                pool.usdc_reserve = math.sqrt(
+                    k * prices_before[regular_orders - 1] * growth
+                )
+                pool.token_reserve = k / pool.usdc_reserve
+                last_mitigated_price = pool.calculate_price()
+            if regular_orders and regular_orders == size:
+                continue
+
+            tokens_to_sell, last_price, price_impact, price_before_selling = (
+                self.compute_and_sell_token_substep(
+                    released_tokens, average_selling_order
+                )
+            )
+            usdc_to_buy, last_mitigated_price = self.compute_usdcs_to_buy_and_mitigate(
+                price_impact, max_price_impact, True, price_before_selling
+            )
+            usdcs_to_buy += usdc_to_buy
+            tokens_sold += tokens_to_sell
+            released_tokens -= tokens_to_sell
+            if tokens_to_sell < MIN_TOKENS_PER_ORDER:
+                break
+            block_size = (
+                min(2 * block_size, BATCH_BLOCK_SIZE)
+                if abs(price_impact) > max_price_impact
+                else 1
+            )
+        return tokens_sold, last_price, usdcs_to_buy, last_mitigated_price
+
     def get_transaction_summary(self) -> Dict[str, List[float]]:
         """Returns a summary of transactions."""
         return {
@@ -105,8 +379,18 @@ class TokenEconomySimulator:
         average_selling_order: float,
         max_price_impact: float,
         with_mitigation: bool,
+        batched: bool = False,
     ) -> Dict[str, List[float]]:
-        """Runs the full vesting simulation over all monthly release tokens."""
+        """Runs the full vesting simulation over all monthly release tokens.
+
+        With `batched`, each month's orders are executed in one pass by
+        `execute_batched_transaction_step` instead of one at a time.
+        """
+        execute_step = (
+            self.execute_batched_transaction_step
+            if batched
+            else self.execute_transaction_step
+        )
         result = {
             "tokens_sold": [],
             "token_price": [],
@@ -115,7 +399,7 @@ class TokenEconomySimulator:
         }
         for released_tokens in self.monthly_release_tokens:
             self.reset_state()
-            self.execute_transaction_step(
+            execute_step(
                 released_tokens,
                 average_selling_order,
                 max_price_impact,